@@ -1,58 +1,209 @@
-from flask import Flask
-from flask_login import LoginManager
-from app.extensions import db
-from app.models import User
-from flasgger import Swagger
+"""Application factory.
+
+Importing this package only defines functions: no app is built, no
+database is touched, no directories are created and not even Flask or
+SQLAlchemy is imported.
+
+create_app() builds a configured app. Blueprints are imported and
+registered there, and Swagger is set up on the first docs request
+(app/docs.py). Schema creation is the explicit `flask --app run init-db`
+command (or scripts/migrate.py).
+"""
 import os
-from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 # Assumes app/__init__.py is one level deep from root
 dotenv_path = os.path.join(os.path.dirname(basedir), '.env')
 
-if os.path.exists(dotenv_path):
-    load_dotenv(dotenv_path, override=True)
-else:
-    load_dotenv(override=True)
-
-app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-this-for-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///chore_chart.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.path.join('app', 'static', 'uploads')
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-# Mail Config
-app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER')
-app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
-app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
-app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() in ['true', 'on', '1']
-app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER')
-app.config['MAIL_API_KEY'] = os.environ.get('MAIL_API_KEY')
-
-swagger = Swagger(app)
-db.init_app(app)
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'auth.login'
-
-@login_manager.user_loader
+
+def load_environment():
+    from dotenv import load_dotenv
+
+    if os.path.exists(dotenv_path):
+        load_dotenv(dotenv_path, override=True)
+    else:
+        load_dotenv(override=True)
+
+
+def load_config(app):
+    app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-this-for-production')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///chore_chart.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = os.path.join('app', 'static', 'uploads')
+
+    # Mail Config
+    app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER')
+    app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
+    app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
+    app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+    app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() in ['true', 'on', '1']
+    app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER')
+    app.config['MAIL_API_KEY'] = os.environ.get('MAIL_API_KEY')
+    app.config['MAIL_API_URL'] = os.environ.get('MAIL_API_URL', 'https://api.brevo.com/v3/smtp/email')
+    app.config['MAIL_TIMEOUT'] = int(os.environ.get('MAIL_TIMEOUT', 30))
+    app.config['MAIL_CONNECTION_POOLING'] = os.environ.get('MAIL_CONNECTION_POOLING', 'True').lower() in ['true', 'on', '1']
+    app.config['MAIL_POOL_SIZE'] = int(os.environ.get('MAIL_POOL_SIZE', 4))
+    app.config['MAIL_POOL_IDLE_SECONDS'] = int(os.environ.get('MAIL_POOL_IDLE_SECONDS', 60))
+    app.config['MAIL_BATCH_SIZE'] = int(os.environ.get('MAIL_BATCH_SIZE', 50))
+
+    # Mail outbox worker
+    app.config['MAIL_WORKER_IN_PROCESS'] = os.environ.get('MAIL_WORKER_IN_PROCESS', 'True').lower() in ['true', 'on', '1']
+    app.config['MAIL_WORKER_CONCURRENCY'] = int(os.environ.get('MAIL_WORKER_CONCURRENCY', 4))
+    app.config['MAIL_WORKER_POLL_SECONDS'] = float(os.environ.get('MAIL_WORKER_POLL_SECONDS', 2))
+    app.config['MAIL_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_MAX_ATTEMPTS', 5))
+    app.config['MAIL_RETRY_BASE_SECONDS'] = int(os.environ.get('MAIL_RETRY_BASE_SECONDS', 30))
+    app.config['MAIL_RETRY_MAX_SECONDS'] = int(os.environ.get('MAIL_RETRY_MAX_SECONDS', 3600))
+    app.config['MAIL_LEASE_SECONDS'] = int(os.environ.get('MAIL_LEASE_SECONDS', 300))
+
+    # Opt-in orjson response encoding (falls back to the standard encoder if orjson is missing)
+    app.config['FAST_JSON'] = os.environ.get('FAST_JSON', 'False').lower() in ['true', 'on', '1']
+
+    # Server-side response cache: local (in-process LRU), redis, or none
+    app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'local')
+    app.config['CACHE_URL'] = os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379/0')
+    app.config['CACHE_DEFAULT_TTL'] = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    app.config['CACHE_LOCK_SECONDS'] = float(os.environ.get('CACHE_LOCK_SECONDS', 10))
+    app.config['CACHE_TIMEOUT'] = float(os.environ.get('CACHE_TIMEOUT', 2))
+
+    # Database engine: SQLite connect pragmas, pool sizing for server databases
+    app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    app.config['SQLITE_CACHE_SIZE'] = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # negative = KiB
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'True').lower() in ['true', 'on', '1']
+
+    # Request/SQL metrics at /metrics (Prometheus), slow query log, sampled traces
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'True').lower() in ['true', 'on', '1']
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config['METRICS_SLOW_QUERY_MS'] = float(os.environ.get('METRICS_SLOW_QUERY_MS', 250))
+    app.config['METRICS_TRACE_SAMPLE_RATE'] = float(os.environ.get('METRICS_TRACE_SAMPLE_RATE', 0.01))
+    app.config['METRICS_TRACE_BUFFER'] = int(os.environ.get('METRICS_TRACE_BUFFER', 100))
+
+    # Logged-in user cache; 0 disables it and loads the user on every request
+    app.config['SESSION_USER_CACHE_TTL'] = float(os.environ.get('SESSION_USER_CACHE_TTL', 60))
+    app.config['SESSION_USER_CACHE_SIZE'] = int(os.environ.get('SESSION_USER_CACHE_SIZE', 1024))
+
+    # Live updates at /api/events (Server-Sent Events)
+    app.config['EVENTS_BUFFER_SIZE'] = int(os.environ.get('EVENTS_BUFFER_SIZE', 1000))
+    app.config['EVENTS_MAX_CLIENTS'] = int(os.environ.get('EVENTS_MAX_CLIENTS', 500))
+    app.config['EVENTS_HEARTBEAT_SECONDS'] = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15))
+    app.config['EVENTS_STREAM_SECONDS'] = float(os.environ.get('EVENTS_STREAM_SECONDS', 300))  # 0 = no limit
+
+    # ?since= sync looks back this much further to catch transactions in flight
+    app.config['SYNC_SAFETY_SECONDS'] = float(os.environ.get('SYNC_SAFETY_SECONDS', 10))
+
+    # scripts/archive_chores.py: move chores deleted this long ago into chore_archive
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    app.config['ARCHIVE_PAUSE_SECONDS'] = float(os.environ.get('ARCHIVE_PAUSE_SECONDS', 0.05))
+
+    # scripts/compact_logs.py: fold history older than this into monthly summaries
+    app.config['LOG_RETENTION_DAYS'] = int(os.environ.get('LOG_RETENTION_DAYS', 365))
+    app.config['LOG_COMPACTION_BATCH_SIZE'] = int(os.environ.get('LOG_COMPACTION_BATCH_SIZE', 1000))
+    app.config['LOG_COMPACTION_PAUSE_SECONDS'] = float(os.environ.get('LOG_COMPACTION_PAUSE_SECONDS', 0.05))
+
+    # Recurring schedules: reads keep occurrences materialized this far ahead,
+    # extending SCHEDULE_EXPAND_DAYS further each time so most reads do no work
+    app.config['SCHEDULE_HORIZON_DAYS'] = int(os.environ.get('SCHEDULE_HORIZON_DAYS', 90))
+    app.config['SCHEDULE_EXPAND_DAYS'] = int(os.environ.get('SCHEDULE_EXPAND_DAYS', 30))
+    app.config['SCHEDULE_EXPAND_BATCH'] = int(os.environ.get('SCHEDULE_EXPAND_BATCH', 200))
+    # Longest /api/schedules window, and how far past now it may end
+    app.config['SCHEDULE_MAX_WINDOW_DAYS'] = int(os.environ.get('SCHEDULE_MAX_WINDOW_DAYS', 366))
+
+    # Due reminders (app.reminders): emailed REMINDER_LEAD_MINUTES before each
+    # occurrence by scripts/reminder_daemon.py or a thread next to the dev server
+    app.config['REMINDER_IN_PROCESS'] = os.environ.get('REMINDER_IN_PROCESS', 'True').lower() in ['true', 'on', '1']
+    app.config['REMINDER_LEAD_MINUTES'] = int(os.environ.get('REMINDER_LEAD_MINUTES', 60))
+    app.config['REMINDER_GRACE_MINUTES'] = int(os.environ.get('REMINDER_GRACE_MINUTES', 30))  # late reminders still sent
+    app.config['REMINDER_WINDOW_MINUTES'] = int(os.environ.get('REMINDER_WINDOW_MINUTES', 120))  # kept in memory ahead
+    app.config['REMINDER_TICK_SECONDS'] = float(os.environ.get('REMINDER_TICK_SECONDS', 5))
+    app.config['REMINDER_RESYNC_SECONDS'] = int(os.environ.get('REMINDER_RESYNC_SECONDS', 300))
+    app.config['REMINDER_BATCH_SIZE'] = int(os.environ.get('REMINDER_BATCH_SIZE', 100))
+    app.config['REMINDER_CONCURRENCY'] = int(os.environ.get('REMINDER_CONCURRENCY', 2))
+
+    # /api/users/<id>/calendar.ics bodies are cached until that user's schedules change
+    app.config['CALENDAR_CACHE_TTL'] = int(os.environ.get('CALENDAR_CACHE_TTL', 3600))
+    app.config['CALENDAR_CACHE_MAX_BYTES'] = int(os.environ.get('CALENDAR_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+
+    # Bearer token for /api/admin/*; the admin endpoints are refused while it is unset
+    app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+
+
+def create_app(config=None):
+    """Build the app. `config` overrides settings read from the environment."""
+    from flask import Flask
+    from app.extensions import db, login_manager
+    from app.db_engine import engine_options, configure_engine
+    from app.json_provider import init_json
+    from app.docs import init_docs
+    from app.metrics import init_metrics
+    from app.session_user import init_session_users
+    from app.events import init_events
+
+    load_environment()
+    app = Flask(__name__)
+    load_config(app)
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+    init_json(app)
+    db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
+    init_metrics(app)
+    login_manager.init_app(app)
+    login_manager.user_loader(load_user)
+    init_session_users(app)
+    init_events(app)
+
+    register_blueprints(app)
+    init_docs(app)
+    register_commands(app)
+    return app
+
+
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# Register Blueprints
-from app.routes.users import users_bp
-from app.routes.chores import chores_bp
-from app.routes.stats import stats_bp
-from app.routes.main import main_bp
-from app.routes.auth import auth_bp
-
-app.register_blueprint(users_bp)
-app.register_blueprint(chores_bp)
-app.register_blueprint(stats_bp)
-app.register_blueprint(main_bp)
-app.register_blueprint(auth_bp)
-
-with app.app_context():
-    db.create_all()
+    from app.session_user import load_session_user
+
+    return load_session_user(int(user_id))
+
+
+def register_blueprints(app):
+    from app.routes.users import users_bp
+    from app.routes.chores import chores_bp
+    from app.routes.stats import stats_bp
+    from app.routes.main import main_bp
+    from app.routes.auth import auth_bp
+    from app.routes.mail import mail_bp
+    from app.routes.schedules import schedules_bp
+    from app.routes.events import events_bp
+    from app.routes.admin import admin_bp
+    from app.routes.calendar import calendar_bp
+
+    app.register_blueprint(users_bp)
+    app.register_blueprint(chores_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(main_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(mail_bp)
+    app.register_blueprint(schedules_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(calendar_bp)
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and apply pending migrations."""
+        from app.migrations import init_db
+
+        for name in init_db():
+            print(f"Applied migration: {name}")
+        print("Database is up to date.")
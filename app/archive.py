@@ -0,0 +1,90 @@
+"""Archival of long-deleted chores.
+
+Completing a one-off chore and deleting a chore only set is_deleted, so
+the chore table grows forever. archive_chores() moves chores deleted more
+than ARCHIVE_AFTER_DAYS ago into chore_archive and drops their schedules.
+The archived rows keep their ids, so ChoreLog.chore_id still resolves and
+history keeps showing their titles.
+
+The work is done in batches of ARCHIVE_BATCH_SIZE chores. Each batch is one
+short transaction (copy, delete, advance the checkpoint), and the job sleeps
+ARCHIVE_PAUSE_SECONDS between batches so requests get the write lock in
+between. The 'chore_archive' MaintenanceCheckpoint records the last id
+handled, so an interrupted run resumes there. A pass that reaches the end
+resets it.
+
+The newest chore is never archived: SQLite hands out max(id) + 1 for new
+rows, and a reused id would attach the archived chore's history to the new
+one.
+"""
+from datetime import datetime, timedelta
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Chore, ChoreArchive, ChoreSchedule, MaintenanceCheckpoint, ScheduleOccurrence
+
+CHECKPOINT = 'chore_archive'
+
+
+def archive_batch(cutoff, after_id, batch_size):
+    """
+    Archive up to batch_size chores deleted before cutoff with ids above
+    after_id. Returns their ids in order. The caller commits.
+    """
+    newest = db.session.query(db.func.max(Chore.id)).scalar() or 0
+    ids = [chore_id for (chore_id,) in db.session.query(Chore.id).filter(
+        Chore.is_deleted == db.true(),
+        Chore.updated_at < cutoff,
+        Chore.id > after_id,
+        Chore.id < newest
+    ).order_by(Chore.id).limit(batch_size)]
+    if not ids:
+        return ids
+
+    columns = [getattr(Chore, name) for name in ChoreArchive.COLUMNS]
+    db.session.execute(db.insert(ChoreArchive.__table__).from_select(
+        [*ChoreArchive.COLUMNS, 'deleted_at', 'archived_at'],
+        db.select(*columns, Chore.updated_at, db.literal(datetime.utcnow(), db.DateTime))
+        .where(Chore.id.in_(ids))
+    ))
+    ScheduleOccurrence.query.filter(ScheduleOccurrence.chore_id.in_(ids)).delete(synchronize_session=False)
+    ChoreSchedule.query.filter(ChoreSchedule.chore_id.in_(ids)).delete(synchronize_session=False)
+    Chore.query.filter(Chore.id.in_(ids)).delete(synchronize_session=False)
+    return ids
+
+
+def archive_chores(older_than_days=None, batch_size=None, pause=None, max_batches=None):
+    """
+    Archive long-deleted chores batch by batch, resuming from the checkpoint.
+    Needs an app context. Stops after max_batches if given.
+    """
+    config = current_app.config
+    older_than_days = config['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+    batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+    pause = config['ARCHIVE_PAUSE_SECONDS'] if pause is None else pause
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    after = MaintenanceCheckpoint.load(CHECKPOINT).position
+    db.session.commit()
+    result = {'archived': 0, 'batches': 0, 'resumed_from': after, 'finished': False}
+
+    while max_batches is None or result['batches'] < max_batches:
+        ids = archive_batch(cutoff, after, batch_size)
+        checkpoint = MaintenanceCheckpoint.load(CHECKPOINT)
+        if not ids:
+            checkpoint.position = 0
+            db.session.commit()
+            result['finished'] = True
+            break
+        after = checkpoint.position = ids[-1]
+        checkpoint.processed += len(ids)
+        db.session.commit()
+        result['archived'] += len(ids)
+        result['batches'] += 1
+        if pause:
+            time.sleep(pause)
+
+    result['position'] = 0 if result['finished'] else after
+    return result
@@ -0,0 +1,283 @@
+"""Server-side cache of serialized JSON responses.
+
+Views decorated with @cached('namespace') sit under @conditional, which has
+already derived an ETag from the DataVersion counters the response depends
+on. The cache key is namespace + ETag, so a write that bumps a counter
+(complete_chore() and the batch endpoint through ChoreLog.record(), user
+create/edit/picture upload) moves every affected endpoint to a new key.
+That invalidates exactly the entries that changed and nothing else, and
+it holds across processes because the counters live in the database. The
+old entries age out of the LRU or expire by TTL.
+
+Two backends share one interface (get, set, add, delete):
+LocalCache is an in-process LRU with per-entry TTL, and RedisCache speaks
+just enough of the Redis protocol to share entries between workers.
+When a key is missing, one request takes a short lock (an atomic add) and
+recomputes; concurrent requests for the same key wait for its result
+instead of all hitting the database.
+"""
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlparse
+import socket
+import threading
+import time
+
+from flask import current_app, g, make_response, request
+
+
+class CacheError(Exception):
+    pass
+
+
+class LocalCache:
+    """Thread-safe LRU with per-entry TTL."""
+
+    def __init__(self, max_entries=1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key, self._clock())
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key, value, ttl):
+        """Set only if absent. Returns True if this call stored the value."""
+        with self._lock:
+            now = self._clock()
+            if self._live(key, now) is not None:
+                return False
+            self._entries[key] = (now + ttl, value)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCache:
+    """Minimal Redis (RESP) client: GET, SET with PX/NX, DEL. One connection per thread."""
+
+    def __init__(self, url, timeout=2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = self._local.conn = (sock, sock.makefile('rb'))
+            if self.password:
+                self._send(conn, 'AUTH', self.password)
+            if self.db:
+                self._send(conn, 'SELECT', self.db)
+        return conn
+
+    def _send(self, conn, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        conn[0].sendall(b''.join(parts))
+        return self._read(conn[1])
+
+    def _read(self, reader):
+        line = reader.readline()
+        if not line:
+            raise CacheError('Connection closed by cache server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise CacheError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            return None if count < 0 else [self._read(reader) for _ in range(count)]
+        raise CacheError(f'Unexpected reply: {line!r}')
+
+    def command(self, *args):
+        try:
+            return self._send(self._connection(), *args)
+        except (OSError, CacheError):
+            self.close()
+            raise
+
+    def get(self, key):
+        return self.command('GET', key)
+
+    def set(self, key, value, ttl):
+        self.command('SET', key, value, 'PX', int(ttl * 1000))
+
+    def add(self, key, value, ttl):
+        return self.command('SET', key, value, 'NX', 'PX', int(ttl * 1000)) == 'OK'
+
+    def delete(self, key):
+        self.command('DEL', key)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+
+class CacheStats:
+    """Per-namespace hit/miss counters for this process."""
+
+    FIELDS = ('hits', 'misses', 'waits', 'recomputes', 'errors')
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, namespace, field):
+        with self._lock:
+            counts = self._counts.setdefault(namespace, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {ns: dict(counts) for ns, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_cache(config):
+    """Return the process-wide backend for this configuration, or None if caching is off."""
+    key = (config.get('CACHE_BACKEND'), config.get('CACHE_URL'), config.get('CACHE_MAX_ENTRIES'))
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = _build_backend(config)
+        return _backends[key]
+
+
+def _build_backend(config):
+    backend = (config.get('CACHE_BACKEND') or 'local').lower()
+    if backend == 'none':
+        return None
+    if backend == 'redis':
+        return RedisCache(config['CACHE_URL'], timeout=config.get('CACHE_TIMEOUT', 2.0))
+    return LocalCache(max_entries=config.get('CACHE_MAX_ENTRIES', 1024))
+
+
+def reset_caches():
+    with _backends_lock:
+        backends = list(_backends.values())
+        _backends.clear()
+    for backend in backends:
+        if isinstance(backend, RedisCache):
+            backend.close()
+
+
+def cached(namespace, ttl=None):
+    """Cache a GET view's JSON body under its ETag. Must sit below @conditional."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = g.get('etag')
+            backend = get_cache(current_app.config)
+            if request.method != 'GET' or etag is None or backend is None:
+                return view(*args, **kwargs)
+
+            config = current_app.config
+            key = f'cc:{namespace}:{etag}'
+            try:
+                return _cached_response(backend, namespace, key, ttl or config['CACHE_DEFAULT_TTL'],
+                                        config['CACHE_LOCK_SECONDS'], lambda: view(*args, **kwargs))
+            except (OSError, CacheError) as e:
+                # A cache outage degrades to uncached responses, never to errors
+                current_app.logger.warning("Cache %s unavailable: %s", namespace, e)
+                stats.incr(namespace, 'errors')
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _cached_response(backend, namespace, key, ttl, lock_seconds, compute):
+    body = backend.get(key)
+    if body is not None:
+        stats.incr(namespace, 'hits')
+        return _json_response(body)
+    stats.incr(namespace, 'misses')
+
+    lock_key = key + ':lock'
+    deadline = time.monotonic() + lock_seconds
+    locked = backend.add(lock_key, b'1', lock_seconds)
+    while not locked:
+        # Someone else is recomputing this key; wait for their result
+        time.sleep(0.005)
+        body = backend.get(key)
+        if body is not None:
+            stats.incr(namespace, 'waits')
+            return _json_response(body)
+        if time.monotonic() >= deadline:
+            break
+        locked = backend.add(lock_key, b'1', lock_seconds)
+
+    try:
+        if locked:
+            # The previous holder may have stored the value just before we got the lock
+            body = backend.get(key)
+            if body is not None:
+                stats.incr(namespace, 'waits')
+                return _json_response(body)
+        response = make_response(compute())
+        stats.incr(namespace, 'recomputes')
+        if response.status_code == 200 and response.is_json:
+            backend.set(key, response.get_data(), ttl)
+        return response
+    finally:
+        if locked:
+            backend.delete(lock_key)
+
+
+def _json_response(body):
+    return current_app.response_class(body, mimetype='application/json')
@@ -0,0 +1,94 @@
+"""Retention for ChoreLog.
+
+ChoreLog gets one row per completion forever. compact_logs() folds rows
+from before the retention horizon (LOG_RETENTION_DAYS ago, rounded down to
+the start of that month) into ChoreLogSummary, one row per month, user and
+chore, and deletes them. Point totals are unaffected: User.total_points
+and daily_user_points are never derived from the deleted rows again (see
+DailyUserPoints.rebuild()). History shows the summarized months through
+/api/stats/history/summary.
+
+The logs are processed oldest first in chunks of LOG_COMPACTION_BATCH_SIZE.
+Each chunk is one transaction (add to the summaries, delete the logs,
+advance the checkpoint), so a crash can neither lose a chunk nor count it
+twice. The job sleeps LOG_COMPACTION_PAUSE_SECONDS between chunks so
+requests get the write lock in between. The 'log_compaction'
+MaintenanceCheckpoint keeps the last log id compacted and a running count.
+"""
+from datetime import datetime, timedelta
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import ChoreLog, ChoreLogSummary, DataVersion, MaintenanceCheckpoint
+
+CHECKPOINT = 'log_compaction'
+
+
+def retention_horizon(retention_days, now=None):
+    """Start of the month retention_days ago; logs before it are compacted."""
+    moment = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    return datetime(moment.year, moment.month, 1)
+
+
+def compact_batch(horizon, batch_size):
+    """
+    Fold the oldest batch_size logs before horizon into ChoreLogSummary and
+    delete them. Returns (logs compacted, last log id). The caller commits.
+    """
+    rows = db.session.query(
+        ChoreLog.id, ChoreLog.chore_id, ChoreLog.user_id, ChoreLog.points_earned, ChoreLog.completed_at
+    ).filter(ChoreLog.completed_at < horizon) \
+        .order_by(ChoreLog.completed_at, ChoreLog.id).limit(batch_size).all()
+    if not rows:
+        return 0, None
+
+    totals = {}
+    for row in rows:
+        key = (row.completed_at.date().replace(day=1), row.user_id, row.chore_id)
+        points, count = totals.get(key, (0, 0))
+        totals[key] = (points + row.points_earned, count + 1)
+
+    ChoreLogSummary.add([{'month': month, 'user_id': user_id, 'chore_id': chore_id, 'points': p, 'count': n}
+                         for (month, user_id, chore_id), (p, n) in totals.items()])
+    ChoreLog.query.filter(ChoreLog.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+    # History pages change; their ETags are derived from these counters
+    DataVersion.bump('chores', 'users')
+    return len(rows), rows[-1].id
+
+
+def compact_logs(retention_days=None, batch_size=None, pause=None, max_batches=None):
+    """
+    Compact logs older than the retention horizon chunk by chunk. Needs an
+    app context. Stops after max_batches if given.
+    """
+    config = current_app.config
+    retention_days = config['LOG_RETENTION_DAYS'] if retention_days is None else retention_days
+    batch_size = batch_size or config['LOG_COMPACTION_BATCH_SIZE']
+    pause = config['LOG_COMPACTION_PAUSE_SECONDS'] if pause is None else pause
+    horizon = retention_horizon(retention_days)
+
+    position = MaintenanceCheckpoint.load(CHECKPOINT).position
+    db.session.commit()
+    result = {'compacted': 0, 'batches': 0, 'horizon': horizon.date().isoformat(),
+              'resumed_from': position, 'finished': False}
+
+    while max_batches is None or result['batches'] < max_batches:
+        compacted, last_id = compact_batch(horizon, batch_size)
+        checkpoint = MaintenanceCheckpoint.load(CHECKPOINT)
+        if not compacted:
+            checkpoint.position = 0
+            db.session.commit()
+            result['finished'] = True
+            break
+        position = checkpoint.position = last_id
+        checkpoint.processed += compacted
+        db.session.commit()
+        result['compacted'] += compacted
+        result['batches'] += 1
+        if pause:
+            time.sleep(pause)
+
+    result['position'] = 0 if result['finished'] else position
+    return result
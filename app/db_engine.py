@@ -0,0 +1,50 @@
+"""Database engine tuning.
+
+SQLite defaults (rollback journal, synchronous=FULL, no busy wait) make
+concurrent workers fail with "database is locked" and block readers behind
+writers. Every new SQLite connection is therefore set up with the pragmas
+below. Server databases get pool sizing through SQLALCHEMY_ENGINE_OPTIONS.
+"""
+from sqlalchemy import event
+
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'SQLITE_JOURNAL_MODE'),
+    ('synchronous', 'SQLITE_SYNCHRONOUS'),
+    ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS'),
+    ('mmap_size', 'SQLITE_MMAP_SIZE'),
+    ('cache_size', 'SQLITE_CACHE_SIZE'),
+)
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database URL."""
+    uri = config.get('SQLALCHEMY_DATABASE_URI', '')
+    if uri.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def sqlite_pragmas(config):
+    return [(pragma, config[key]) for pragma, key in SQLITE_PRAGMAS if config.get(key) not in (None, '')]
+
+
+def configure_engine(engine, config):
+    """Apply the SQLite pragmas to every connection the engine opens."""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas:
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,53 @@
+"""Swagger UI and spec, set up on the first docs request.
+
+Importing flasgger (and the jsonschema/yaml/mistune stack under it) costs
+more than the rest of the app together. create_app() therefore only
+registers placeholder routes at flasgger's URLs. The first request to one
+of them builds a shadow Flask app with the same URL rules and view
+functions, attaches Swagger to it and hands the request over. Later docs
+requests reuse the shadow app, and the spec is generated from the real
+views' docstrings exactly as before.
+"""
+import threading
+
+from flask import Flask, current_app, request
+
+DOCS_RULES = (
+    '/apidocs/',
+    '/apidocs/index.html',
+    '/apispec_1.json',
+    '/oauth2-redirect.html',
+    '/flasgger_static/<path:filename>',
+)
+
+_lock = threading.Lock()
+
+
+def init_docs(app):
+    for rule in DOCS_RULES:
+        app.add_url_rule(rule, endpoint='lazy_docs', view_func=serve_docs)
+
+
+def docs_app(app):
+    """The Swagger-enabled shadow app for `app`, built on first use."""
+    with _lock:
+        shadow = app.extensions.get('lazy_docs')
+        if shadow is None:
+            from flasgger import Swagger
+
+            shadow = Flask(app.import_name)
+            shadow.config.update(app.config)
+            for rule in app.url_map.iter_rules():
+                if rule.endpoint in ('static', 'lazy_docs'):
+                    continue
+                shadow.add_url_rule(rule.rule, endpoint=rule.endpoint,
+                                    view_func=app.view_functions[rule.endpoint], methods=rule.methods)
+            Swagger(shadow)
+            app.extensions['lazy_docs'] = shadow
+        return shadow
+
+
+def serve_docs(**kwargs):
+    shadow = docs_app(current_app._get_current_object())
+    with shadow.request_context(request.environ):
+        return shadow.full_dispatch_request()
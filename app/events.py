@@ -0,0 +1,143 @@
+"""Live board updates over Server-Sent Events.
+
+Writes queue small deltas with emit(). For example, `chore.completed`
+carries the chore's new due dates and `user.points` a user's new total;
+neither carries whole lists. Queued deltas are published to this
+process's EventBroker when the session commits and dropped on rollback.
+A client therefore never hears about a change it could not yet read back.
+
+The broker is one ring buffer of recent events and one Condition. Each
+connected client is a cursor into the buffer, not a queue: publishing
+costs the same however many clients are listening, and an idle client
+holds no state beyond its position. It is a streaming generator parked
+in Condition.wait(). Under a gevent/eventlet worker that makes each
+connection a greenlet rather than a thread. Under a threaded server each
+open stream still occupies a worker thread, so EVENTS_MAX_CLIENTS caps
+them and EVENTS_STREAM_SECONDS ends streams periodically (the browser
+reconnects on its own).
+
+Event ids are "<stream>-<seq>". A reconnect sends the last one back as
+Last-Event-ID and resumes right after it. If the id is from another
+process lifetime, or so old it has left the buffer, the client gets a
+`reset` event and refetches the full lists.
+"""
+from collections import deque
+import json
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class EventBroker:
+    def __init__(self, buffer_size=1000, max_clients=500):
+        # Distinguishes this process's sequence numbers from a previous run's
+        self.stream_id = format(int(time.time() * 1000), 'x')
+        self.max_clients = max_clients
+        self.clients = 0
+        self._events = deque(maxlen=buffer_size)  # (seq, type, json payload)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, kind, data):
+        payload = json.dumps(data, separators=(',', ':'))
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, kind, payload))
+            self._cond.notify_all()
+
+    def event_id(self, seq):
+        return f'{self.stream_id}-{seq}'
+
+    def resume_point(self, last_event_id):
+        """(seq to read after, whether the client must reset) for a Last-Event-ID."""
+        if not last_event_id:
+            return self._seq, False
+        stream, _, seq = last_event_id.rpartition('-')
+        if stream != self.stream_id or not seq.isdigit() or int(seq) > self._seq:
+            return self._seq, True
+        return int(seq), False
+
+    def read(self, after, timeout):
+        """
+        Events newer than `after`, waiting up to `timeout` seconds for one.
+        Returns (events, gap); gap means some events after `after` were evicted.
+        """
+        with self._cond:
+            if self._seq <= after:
+                self._cond.wait(timeout)
+            if self._seq <= after:
+                return [], False
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            gap = oldest > after + 1
+            return [e for e in self._events if e[0] > after], gap
+
+    def connect(self):
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def disconnect(self):
+        with self._cond:
+            self.clients -= 1
+
+
+def init_events(app):
+    app.extensions['events'] = EventBroker(app.config['EVENTS_BUFFER_SIZE'], app.config['EVENTS_MAX_CLIENTS'])
+
+
+def emit(kind, data):
+    """Queue an event on the current session; it is published when the session commits."""
+    from app.extensions import db
+
+    db.session.info.setdefault('pending_events', []).append((kind, data))
+
+
+def format_event(event_id, kind, payload):
+    return f'id: {event_id}\nevent: {kind}\ndata: {payload}\n\n'
+
+
+def stream(broker, after, reset, heartbeat, max_seconds):
+    """SSE body for one client. The view releases its client slot when the response closes."""
+    yield 'retry: 3000\n\n'
+    if reset:
+        yield format_event(broker.event_id(after), 'reset', '{}')
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    while deadline is None or time.monotonic() < deadline:
+        events, gap = broker.read(after, heartbeat)
+        if gap:
+            after = broker.last_seq
+            yield format_event(broker.event_id(after), 'reset', '{}')
+            continue
+        if not events:
+            yield ': keepalive\n\n'
+            continue
+        for seq, kind, payload in events:
+            yield format_event(broker.event_id(seq), kind, payload)
+            after = seq
+
+
+def _after_commit(session):
+    pending = session.info.pop('pending_events', None)
+    if not pending or not has_app_context():
+        return
+    broker = current_app.extensions.get('events')
+    if broker is not None:
+        for kind, data in pending:
+            broker.publish(kind, data)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('pending_events', None)
+
+
+event.listen(Session, 'after_commit', _after_commit)
+event.listen(Session, 'after_soft_rollback', _after_rollback)
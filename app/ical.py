@@ -0,0 +1,87 @@
+"""A small iCalendar (RFC 5545) writer for chore events.
+
+Invites and calendar feeds only ever contain VEVENTs with a start, a
+summary, a description and an optional RRULE, so they are written as text
+directly instead of building ics.Calendar objects: escape, fold at 75
+octets, join with CRLF. write_calendar() yields the calendar in chunks so
+a large feed can be streamed.
+"""
+from datetime import timezone
+
+PRODID = '-//Chore Chart//Chore Chart//EN'
+# Events per chunk yielded by write_calendar()
+CHUNK_EVENTS = 200
+
+
+def escape_text(value):
+    """TEXT value escaping (RFC 5545 3.3.11)."""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Fold a content line into chunks of at most 75 octets, never inside a UTF-8 character."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def format_utc(moment):
+    """DATE-TIME in UTC form. Naive datetimes are taken as UTC."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_uid(chore_id, start):
+    """
+    Same chore at the same time is the same event for every invitee and in
+    every feed, so clients merge an emailed invite with the feed's copy.
+    """
+    return f"chore-{chore_id}-{start.strftime('%Y%m%dT%H%M%S')}@chore-chart"
+
+
+def vevent(uid, start, summary, description=None, rrule=None, stamp=None):
+    """One VEVENT as CRLF-terminated text."""
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{format_utc(stamp or start)}',
+             f'DTSTART:{format_utc(start)}', f'SUMMARY:{escape_text(summary)}']
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    if rrule:
+        lines.append(f'RRULE:{rrule}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) + '\r\n' for line in lines)
+
+
+def write_calendar(events, name=None):
+    """Yield a VCALENDAR in chunks; `events` is an iterable of vevent() strings."""
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN']
+    if name:
+        header.append(f'X-WR-CALNAME:{escape_text(name)}')
+    chunk = [''.join(fold(line) + '\r\n' for line in header)]
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= CHUNK_EVENTS:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append('END:VCALENDAR\r\n')
+    yield ''.join(chunk)
+
+
+def chore_summary(chore):
+    return f"Chore: {chore.title}"
+
+
+def chore_description(chore):
+    description = f"Complete chore: {chore.title}. Points: {chore.points}"
+    if chore.description:
+        description += f"\n\nDescription: {chore.description}"
+    return description
@@ -0,0 +1,48 @@
+"""Optional C-accelerated JSON encoding for responses.
+
+Enabled with FAST_JSON=True. Uses orjson when it is installed and falls
+back to Flask's standard provider otherwise, so the setting is safe to turn
+on everywhere. Output parses to the same data as the default provider's:
+sorted keys, the same handling of dates (HTTP date strings), decimals,
+UUIDs and dataclasses, and indentation in debug mode. Non-ASCII text is
+written as UTF-8 rather than \\u escapes.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def _options(self, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def dumps_bytes(self, obj, **kwargs):
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=self._options(**kwargs))
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = None
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            indent = 2
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install FastJSONProvider on the app if FAST_JSON is set and orjson is available."""
+    if app.config.get('FAST_JSON') and orjson is not None:
+        app.json = FastJSONProvider(app)
+    return app.json
@@ -0,0 +1,101 @@
+"""Building and delivering calendar invite emails.
+
+Delivery goes through the Brevo HTTP API when MAIL_API_KEY is set (SMTP is
+blocked on PythonAnywhere's free tier), otherwise through SMTP when a server
+and credentials are configured, otherwise it is only logged. The connections
+themselves live in app.mail_transport.
+"""
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.base import MIMEBase
+from email import encoders
+from datetime import datetime, timezone
+
+from app.ical import chore_description, chore_summary, event_uid, vevent, write_calendar
+from app.mail_transport import MailDeliveryError, get_transport
+from app.models import ChoreSchedule
+from app.recurrence import rrule
+
+RRULES = {name: rrule(freq, interval) for name, (freq, interval) in ChoreSchedule.RECURRENCES.items()}
+
+
+def build_event(chore, dt_str, recurrence=None):
+    """VEVENT text for an ISO datetime string; raises ValueError if it does not parse."""
+    start = datetime.fromisoformat(dt_str[:-1] if dt_str.endswith('Z') else dt_str)
+    if start.tzinfo is not None:
+        # Same UID as the stored naive UTC schedule in the calendar feed
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    # Stamped with the start rather than the send time, so the same chore at
+    # the same time is byte-identical for every invitee and the transport
+    # can batch those invites into one provider call
+    return vevent(event_uid(chore.id, start), start, chore_summary(chore), chore_description(chore),
+                  RRULES.get(recurrence))
+
+
+def build_calendar_ics(items):
+    """One VCALENDAR for (chore, datetime string, recurrence) items."""
+    return ''.join(write_calendar(build_event(chore, dt_str, recurrence) for chore, dt_str, recurrence in items))
+
+
+def build_invite_ics(chore, dt_str, recurrence=None):
+    return build_calendar_ics([(chore, dt_str, recurrence)])
+
+
+def invite_content(user, chore):
+    """Subject and bodies for a single-chore invite."""
+    return {
+        'subject': f"Chore Reminder: {chore.title}",
+        'text_body': f"Hello {user.username},\n\nPlease find attached a calendar invite for your chore: {chore.title}.",
+        'html_body': f"<html><body><p>Hello {user.username},</p><p>Please find attached a calendar invite for your chore: {chore.title}.</p></body></html>",
+    }
+
+
+def schedule_digest_content(user, chores):
+    """Subject and bodies for one combined invite covering several chores."""
+    titles = sorted({chore.title for chore in chores})
+    listing = "\n".join(f"- {title}" for title in titles)
+    items = "".join(f"<li>{title}</li>" for title in titles)
+    return {
+        'subject': f"Chore Schedule: {len(chores)} chore{'s' if len(chores) != 1 else ''}",
+        'text_body': f"Hello {user.username},\n\nPlease find attached calendar invites for your chores:\n{listing}",
+        'html_body': f"<html><body><p>Hello {user.username},</p><p>Please find attached calendar invites for your chores:</p><ul>{items}</ul></body></html>",
+    }
+
+
+def reminder_content(user, chore, starts_at):
+    """Subject and bodies for a reminder that a scheduled chore is coming up."""
+    when = starts_at.strftime('%Y-%m-%d %H:%M UTC')
+    return {
+        'subject': f"Chore Due Soon: {chore.title}",
+        'text_body': f"Hello {user.username},\n\nYour chore {chore.title} ({chore.points} points) is scheduled for {when}.",
+        'html_body': f"<html><body><p>Hello {user.username},</p><p>Your chore <strong>{chore.title}</strong> ({chore.points} points) is scheduled for {when}.</p></body></html>",
+    }
+
+
+def build_mime_message(job, sender):
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = job.recipient_email
+    msg['Subject'] = job.subject
+    msg.attach(MIMEText(job.text_body, 'plain'))
+
+    if job.ics_content:
+        part = MIMEBase('text', 'calendar', method='REQUEST', name='invite.ics')
+        part.set_payload(job.ics_content)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', 'attachment; filename="invite.ics"')
+        msg.attach(part)
+
+    return msg
+
+
+def deliver_batch(jobs, config):
+    """Send jobs that share subject and attachment. Returns {job_id: MailDeliveryError or None}."""
+    return get_transport(config, build_mime_message).send_batch(jobs)
+
+
+def deliver(job, config):
+    """Send one outbox job, raising MailDeliveryError on failure."""
+    err = deliver_batch([job], config)[job.id]
+    if err:
+        raise err
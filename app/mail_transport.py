@@ -0,0 +1,302 @@
+"""Reusable connections to the mail providers.
+
+Opening a fresh SMTP connection (TCP, STARTTLS, AUTH) or an un-pooled HTTPS
+request per invite dominates delivery time. Transports are built once per
+process from the app config by get_transport() and then shared by all
+outbox worker threads:
+
+- SMTPTransport keeps a bounded pool of logged-in SMTP connections, checks
+  them with NOOP before reuse and closes ones that sat idle too long.
+- ApiTransport keeps one keep-alive requests.Session and sends several
+  messages that share an attachment as one Brevo call (messageVersions).
+"""
+from collections import deque
+import base64
+import smtplib
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class MailDeliveryError(Exception):
+    """Delivery failed. permanent=True means retrying will not help."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class SMTPConnectionPool:
+    def __init__(self, host, port, username, password, use_tls=True, max_size=4,
+                 idle_timeout=60, check_after=5, timeout=30, pooled=True):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.timeout = timeout
+        self.pooled = pooled
+        self._idle = deque()  # (connection, last_used)
+        self._open = 0
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    @staticmethod
+    def _healthy(server):
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self):
+        while True:
+            stale = []
+            server = None
+            with self._cond:
+                now = time.monotonic()
+                # Evict from the cold end; the most recently used sit on the right
+                while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                    stale.append(self._idle.popleft()[0])
+                    self._open -= 1
+                if self._idle:
+                    server, last_used = self._idle.pop()
+                elif self._open < self.max_size:
+                    self._open += 1
+                    last_used = None
+                else:
+                    self._cond.wait(self.timeout)
+                    continue
+            for old in stale:
+                self._close(old)
+
+            if server is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            if time.monotonic() - last_used < self.check_after or self._healthy(server):
+                return server
+            self.release(server, broken=True)
+
+    def release(self, server, broken=False):
+        if broken or not self.pooled:
+            self._close(server)
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append((server, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for server, _ in idle:
+            self._close(server)
+
+
+class SMTPTransport:
+    def __init__(self, pool, sender, build_message):
+        self.pool = pool
+        self.sender = sender
+        self.build_message = build_message
+
+    def send_batch(self, jobs):
+        """Send jobs over one pooled connection. Returns {job_id: MailDeliveryError or None}."""
+        results = {}
+        try:
+            server = self.pool.acquire()
+        except (smtplib.SMTPException, OSError) as smtp_err:
+            err = _smtp_error(smtp_err)
+            return {job.id: err for job in jobs}
+
+        broken = False
+        try:
+            for job in jobs:
+                if broken:
+                    results[job.id] = MailDeliveryError("SMTP connection lost earlier in batch")
+                    continue
+                try:
+                    server.send_message(self.build_message(job, self.sender))
+                    results[job.id] = None
+                except smtplib.SMTPRecipientsRefused as smtp_err:
+                    results[job.id] = MailDeliveryError(f"SMTP Error: {smtp_err}", permanent=True)
+                    try:
+                        server.rset()
+                    except (smtplib.SMTPException, OSError):
+                        # The connection dropped too; close it and fail the rest of the batch
+                        broken = True
+                except (smtplib.SMTPException, OSError) as smtp_err:
+                    results[job.id] = _smtp_error(smtp_err)
+                    broken = True
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            # Always hand the connection back, so the pool's open count stays right
+            self.pool.release(server, broken=broken)
+        return results
+
+    def close(self):
+        self.pool.close()
+
+
+def _smtp_error(smtp_err):
+    if "111" in str(smtp_err) or "Connection refused" in str(smtp_err):
+        return MailDeliveryError('Connection refused (PythonAnywhere free tier blocks SMTP port 587). '
+                                 'Please configure MAIL_API_KEY to use HTTP API.')
+    return MailDeliveryError(f"SMTP Error: {smtp_err}")
+
+
+class ApiTransport:
+    def __init__(self, url, api_key, sender, pool_size=4, timeout=30, pooled=True):
+        self.url = url
+        self.sender = sender
+        self.timeout = timeout
+        self.pooled = pooled
+        self.headers = {
+            "accept": "application/json",
+            "api-key": api_key,
+            "content-type": "application/json"
+        }
+        self.session = self._new_session(pool_size)
+
+    @staticmethod
+    def _new_session(pool_size):
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        return session
+
+    def payload(self, jobs):
+        """One API payload for jobs sharing subject and attachment."""
+        first = jobs[0]
+        payload = {
+            "sender": {"email": self.sender, "name": "Chore Chart"},
+            "subject": first.subject,
+            "htmlContent": first.html_body,
+        }
+        if first.ics_content:
+            encoded_ics = base64.b64encode(first.ics_content.encode('utf-8')).decode('utf-8')
+            payload["attachment"] = [{"name": "invite.ics", "content": encoded_ics}]
+        if len(jobs) == 1:
+            payload["to"] = [{"email": first.recipient_email, "name": first.recipient_name}]
+        else:
+            payload["messageVersions"] = [{
+                "to": [{"email": job.recipient_email, "name": job.recipient_name}],
+                "htmlContent": job.html_body
+            } for job in jobs]
+        return payload
+
+    def send_batch(self, jobs):
+        """Send jobs in one API call. Returns {job_id: MailDeliveryError or None}."""
+        if self.pooled:
+            session = self.session
+        else:
+            session = requests.Session()
+        try:
+            response = session.post(self.url, json=self.payload(jobs), headers=self.headers, timeout=self.timeout)
+        except requests.RequestException as api_err:
+            err = MailDeliveryError(f"API request failed: {api_err}")
+            return {job.id: err for job in jobs}
+        finally:
+            if not self.pooled:
+                session.close()
+
+        if response.status_code in [200, 201, 202]:
+            return {job.id: None for job in jobs}
+        # 4xx other than rate limiting means the request itself is bad
+        permanent = 400 <= response.status_code < 500 and response.status_code != 429
+        err = MailDeliveryError(f"API Error {response.status_code}: {response.text}", permanent=permanent)
+        return {job.id: err for job in jobs}
+
+    def close(self):
+        self.session.close()
+
+
+class LogTransport:
+    """Used when no provider is configured: print and report success."""
+
+    def send_batch(self, jobs):
+        for job in jobs:
+            print("--- EMAIL (MOCK - MISSING CONFIG) ---")
+            print(f"To: {job.recipient_email}")
+            print(f"Subject: {job.subject}")
+        return {job.id: None for job in jobs}
+
+    def close(self):
+        pass
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def transport_settings(config):
+    keys = ('MAIL_API_KEY', 'MAIL_API_URL', 'MAIL_SERVER', 'MAIL_PORT', 'MAIL_USERNAME', 'MAIL_PASSWORD',
+            'MAIL_USE_TLS', 'MAIL_DEFAULT_SENDER', 'MAIL_TIMEOUT', 'MAIL_POOL_SIZE', 'MAIL_POOL_IDLE_SECONDS',
+            'MAIL_CONNECTION_POOLING')
+    return tuple(config.get(k) for k in keys)
+
+
+def get_transport(config, build_message):
+    """Return the process-wide transport for this configuration."""
+    key = transport_settings(config)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = _build_transport(config, build_message)
+        return transport
+
+
+def _build_transport(config, build_message):
+    sender = config.get('MAIL_DEFAULT_SENDER')
+    pooled = config.get('MAIL_CONNECTION_POOLING', True)
+    if config.get('MAIL_API_KEY'):
+        return ApiTransport(config.get('MAIL_API_URL'), config.get('MAIL_API_KEY'), sender,
+                            pool_size=config.get('MAIL_POOL_SIZE', 4),
+                            timeout=config.get('MAIL_TIMEOUT', 30), pooled=pooled)
+    if config.get('MAIL_SERVER') and config.get('MAIL_USERNAME') and config.get('MAIL_PASSWORD'):
+        pool = SMTPConnectionPool(config.get('MAIL_SERVER'), config.get('MAIL_PORT'),
+                                  config.get('MAIL_USERNAME'), config.get('MAIL_PASSWORD'),
+                                  use_tls=config.get('MAIL_USE_TLS'),
+                                  max_size=config.get('MAIL_POOL_SIZE', 4),
+                                  idle_timeout=config.get('MAIL_POOL_IDLE_SECONDS', 60),
+                                  timeout=config.get('MAIL_TIMEOUT', 30), pooled=pooled)
+        return SMTPTransport(pool, sender, build_message)
+    return LogTransport()
+
+
+def close_transports():
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        transport.close()
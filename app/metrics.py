@@ -0,0 +1,265 @@
+"""Request and SQL metrics, exported in Prometheus text format at /metrics.
+
+Every request records its latency, response size and the number and total
+time of the SQL statements it ran, labelled by Flask endpoint (not URL, so
+the label set stays bounded). Statement timing comes from the engine's
+before/after_cursor_execute events and is added to a small per-request
+accumulator in `g`, so the only shared state touched per request is one
+locked update of the registry at the end.
+
+Statements slower than METRICS_SLOW_QUERY_MS are logged with their
+endpoint. A random METRICS_TRACE_SAMPLE_RATE share of requests also keeps
+every statement's SQL and duration. Those traces sit in a bounded buffer
+served at /metrics/traces; keeping the SQL for every request would cost
+too much to leave on. Both URLs require METRICS_TOKEN as a bearer token
+when it is set, and a login session when it is not.
+"""
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+import hmac
+import random
+import threading
+import time
+
+from flask import current_app, g, has_request_context, jsonify, request
+from flask_login import current_user
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+STATEMENT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+MAX_TRACE_SQL = 500
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label tuple. Callers hold the registry lock."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.help}')
+        lines.append(f'# TYPE {self.name} histogram')
+        for label_values, series in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.help}')
+        lines.append(f'# TYPE {self.name} counter')
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{{{_labels(self.labels, label_values)}}} {value:g}')
+
+
+def _labels(names, values):
+    return ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Process-wide registry for one app."""
+
+    def __init__(self, trace_buffer=100):
+        self._lock = threading.Lock()
+        self.requests = Counter('chore_chart_http_requests_total', 'Requests handled',
+                                ('endpoint', 'method', 'status'))
+        self.latency = Histogram('chore_chart_http_request_duration_seconds', 'Request latency',
+                                 ('endpoint', 'method'), LATENCY_BUCKETS)
+        self.size = Histogram('chore_chart_http_response_size_bytes', 'Response body size',
+                              ('endpoint', 'method'), SIZE_BUCKETS)
+        self.statements = Histogram('chore_chart_db_statements_per_request', 'SQL statements run per request',
+                                    ('endpoint', 'method'), STATEMENT_BUCKETS)
+        self.sql_seconds = Counter('chore_chart_db_statement_seconds_total', 'Time spent in SQL statements',
+                                   ('endpoint',))
+        self.slow = Counter('chore_chart_db_slow_statements_total', 'SQL statements over the slow threshold',
+                            ('endpoint',))
+        self.traces = deque(maxlen=trace_buffer)
+
+    def observe(self, endpoint, method, status, seconds, size, stats):
+        with self._lock:
+            self.requests.inc((endpoint, method, str(status)))
+            self.latency.observe((endpoint, method), seconds)
+            if size is not None:
+                self.size.observe((endpoint, method), size)
+            self.statements.observe((endpoint, method), stats.statements)
+            if stats.statements:
+                self.sql_seconds.inc((endpoint,), stats.sql_seconds)
+            if stats.slow:
+                self.slow.inc((endpoint,), stats.slow)
+
+    def add_trace(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for metric in (self.requests, self.latency, self.size, self.statements, self.sql_seconds, self.slow):
+                metric.render(lines)
+        return '\n'.join(lines) + '\n'
+
+    def recent_traces(self):
+        with self._lock:
+            return list(self.traces)
+
+
+class RequestStats:
+    """What one request has done so far; lives in g for the request's duration."""
+
+    __slots__ = ('start', 'statements', 'sql_seconds', 'slow', 'trace')
+
+    def __init__(self, sampled):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.slow = 0
+        self.trace = [] if sampled else None
+
+
+def endpoint_label():
+    return request.endpoint or 'unmatched'
+
+
+def init_metrics(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    metrics = app.extensions['metrics'] = Metrics(app.config['METRICS_TRACE_BUFFER'])
+    sample_rate = app.config['METRICS_TRACE_SAMPLE_RATE']
+    slow_seconds = app.config['METRICS_SLOW_QUERY_MS'] / 1000.0
+
+    @app.before_request
+    def start_request_metrics():
+        g._request_stats = RequestStats(sample_rate > 0 and random.random() < sample_rate)
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        seconds = time.perf_counter() - stats.start
+        endpoint = endpoint_label()
+        metrics.observe(endpoint, request.method, response.status_code, seconds,
+                        None if response.is_streamed else response.content_length, stats)
+        if stats.trace is not None:
+            metrics.add_trace({
+                'at': datetime.utcnow().isoformat() + 'Z',
+                'endpoint': endpoint,
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'status': response.status_code,
+                'duration_ms': round(seconds * 1000, 3),
+                'sql_ms': round(stats.sql_seconds * 1000, 3),
+                'statements': stats.trace
+            })
+        return response
+
+    with app.app_context():
+        from app.extensions import db
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        # On the execution context rather than the connection: a statement
+        # that raises never reaches after_cursor_execute, and its start
+        # time must not be paired with a later statement
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_started', None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        stats = g.get('_request_stats') if has_request_context() else None
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += seconds
+            if stats.trace is not None:
+                stats.trace.append({'sql': statement[:MAX_TRACE_SQL], 'ms': round(seconds * 1000, 3)})
+        if seconds >= slow_seconds:
+            if stats is not None:
+                stats.slow += 1
+            endpoint = endpoint_label() if has_request_context() else 'background'
+            current_app.logger.warning("Slow query (%.1f ms) in %s: %s", seconds * 1000, endpoint,
+                                       statement[:MAX_TRACE_SQL])
+
+    app.add_url_rule('/metrics', endpoint='metrics', view_func=serve_metrics)
+    app.add_url_rule('/metrics/traces', endpoint='metrics_traces', view_func=serve_traces)
+
+
+def authorized():
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        # Fail closed: without a scrape token only logged-in users may read them
+        return bool(current_app.config.get('LOGIN_DISABLED') or current_user.is_authenticated)
+    supplied = request.headers.get('Authorization', '')
+    return hmac.compare_digest(supplied, f'Bearer {token}')
+
+
+def serve_metrics():
+    """
+    Prometheus metrics for this process
+    ---
+    tags:
+      - Metrics
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Request latency, response size and SQL histograms per endpoint
+      401:
+        description: The bearer token does not match METRICS_TOKEN, or no token is set and the user is not logged in
+    """
+    if not authorized():
+        return jsonify({'error': 'Unauthorized'}), 401
+    body = current_app.extensions['metrics'].render()
+    return current_app.response_class(body, mimetype='text/plain; version=0.0.4')
+
+
+def serve_traces():
+    """
+    Recently sampled request traces with every SQL statement they ran
+    ---
+    tags:
+      - Metrics
+    responses:
+      200:
+        description: Up to METRICS_TRACE_BUFFER traces, oldest first
+      401:
+        description: The bearer token does not match METRICS_TOKEN, or no token is set and the user is not logged in
+    """
+    if not authorized():
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(current_app.extensions['metrics'].recent_traces())
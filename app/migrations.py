@@ -0,0 +1,206 @@
+"""Versioned schema migrations.
+
+db.create_all() only creates missing tables, so anything that changes an
+existing table (new columns, new indexes) is registered here instead. Each
+migration runs once, in order, and is recorded in the schema_migrations
+table. Migrations must be safe to run on a database that create_all() has
+just built from the current models, so they check before altering.
+"""
+from datetime import datetime
+from sqlalchemy import DateTime, Integer, String, inspect, text
+
+from app.extensions import db
+
+
+def _column_names(conn, table):
+    return {c['name'] for c in inspect(conn).get_columns(table)}
+
+
+def _quote(conn, name):
+    # Table names such as user are reserved words outside SQLite
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def _add_columns(conn, table, columns):
+    existing = _column_names(conn, table)
+    for name, col_type in columns:
+        if name not in existing:
+            conn.execute(text(f'ALTER TABLE {_quote(conn, table)} ADD COLUMN {_quote(conn, name)} '
+                              f'{col_type.compile(dialect=conn.dialect)}'))
+
+
+def _create_indexes(conn, model, names=None):
+    # Indexes on columns a later migration adds are left to that migration
+    existing = _column_names(conn, model.__tablename__)
+    for index in model.__table__.indexes:
+        if (names is None or index.name in names) and {c.name for c in index.columns} <= existing:
+            index.create(conn, checkfirst=True)
+
+
+def chore_due_columns(conn):
+    from app.models import Chore
+
+    _add_columns(conn, 'chore', [
+        ('recurrence_days', Integer()),
+        ('last_completed_at', DateTime()),
+        ('next_due_at', DateTime()),
+    ])
+    _create_indexes(conn, Chore, {'ix_chore_next_due_at'})
+    conn.execute(text(
+        'UPDATE chore SET last_completed_at = '
+        '(SELECT MAX(completed_at) FROM chore_log WHERE chore_log.chore_id = chore.id) '
+        'WHERE last_completed_at IS NULL'
+    ))
+
+
+def hot_path_indexes(conn):
+    from app.models import User, Chore, ChoreLog, ChoreSchedule
+
+    for model in (User, Chore, ChoreLog, ChoreSchedule):
+        _create_indexes(conn, model)
+
+
+def daily_user_points(conn):
+    from app.models import DailyUserPoints
+
+    DailyUserPoints.__table__.create(conn, checkfirst=True)
+    if conn.execute(text('SELECT COUNT(*) FROM daily_user_points')).scalar() == 0:
+        conn.execute(text(
+            'INSERT INTO daily_user_points (date, user_id, points, count) '
+            'SELECT date(completed_at), user_id, SUM(points_earned), COUNT(id) '
+            'FROM chore_log GROUP BY date(completed_at), user_id'
+        ))
+
+
+def history_keyset_index(conn):
+    from app.models import ChoreLog
+
+    _create_indexes(conn, ChoreLog, {'ix_chore_log_completed_at_id'})
+    # Superseded by the (completed_at, id) index
+    conn.execute(text('DROP INDEX IF EXISTS ix_chore_log_completed_at'))
+
+
+def data_versions(conn):
+    from app.models import ChoreSchedule, DataVersion
+
+    _create_indexes(conn, ChoreSchedule, {'ix_chore_schedule_scheduled_at'})
+    DataVersion.__table__.create(conn, checkfirst=True)
+    existing = {row[0] for row in conn.execute(text('SELECT name FROM data_version'))}
+    for name in DataVersion.NAMES:
+        if name not in existing:
+            conn.execute(text('INSERT INTO data_version (name, version) VALUES (:n, 1)'), {'n': name})
+
+
+def updated_at_columns(conn):
+    from app.models import User, Chore
+
+    _add_columns(conn, 'user', [('updated_at', DateTime())])
+    _add_columns(conn, 'chore', [('updated_at', DateTime())])
+    conn.execute(User.__table__.update().where(User.updated_at.is_(None))
+                 .values(updated_at=db.func.coalesce(User.created_at, db.func.current_timestamp())))
+    conn.execute(Chore.__table__.update().where(Chore.updated_at.is_(None))
+                 .values(updated_at=db.func.coalesce(Chore.last_completed_at, Chore.created_at,
+                                                     db.func.current_timestamp())))
+    _create_indexes(conn, User, {'ix_user_updated_at'})
+    _create_indexes(conn, Chore, {'ix_chore_updated_at'})
+
+
+def chore_archive(conn):
+    from app.models import Chore, ChoreArchive, MaintenanceCheckpoint
+
+    ChoreArchive.__table__.create(conn, checkfirst=True)
+    MaintenanceCheckpoint.__table__.create(conn, checkfirst=True)
+    # Replaced by the partial ix_chore_active_next_due_at
+    conn.execute(text('DROP INDEX IF EXISTS ix_chore_next_due_at'))
+    _create_indexes(conn, Chore, {'ix_chore_active_next_due_at'})
+    # chore_log.chore_id may point at an archived chore from now on
+    if conn.dialect.name != 'sqlite':
+        for fk in inspect(conn).get_foreign_keys('chore_log'):
+            if fk['referred_table'] == 'chore' and fk.get('name'):
+                conn.execute(text(f'ALTER TABLE chore_log DROP CONSTRAINT {_quote(conn, fk["name"])}'))
+
+
+def chore_log_summary(conn):
+    from app.models import ChoreLogSummary
+
+    ChoreLogSummary.__table__.create(conn, checkfirst=True)
+
+
+def points_reconciliation(conn):
+    from app.models import ChoreLog, UserPointsBaseline
+
+    UserPointsBaseline.__table__.create(conn, checkfirst=True)
+    # Rebuilt with points_earned as a covering column
+    conn.execute(text('DROP INDEX IF EXISTS ix_chore_log_user_id_completed_at'))
+    _create_indexes(conn, ChoreLog, {'ix_chore_log_user_id_completed_at'})
+
+
+def schedule_occurrences(conn):
+    from app.models import ChoreSchedule, ScheduleOccurrence
+
+    _add_columns(conn, 'chore_schedule', [
+        ('recurrence_freq', String(10)),
+        ('recurrence_interval', Integer()),
+        ('expanded_until', DateTime()),
+    ])
+    _create_indexes(conn, ChoreSchedule, {'ix_chore_schedule_expanded_until'})
+    ScheduleOccurrence.__table__.create(conn, checkfirst=True)
+    # Superseded by ix_schedule_occurrence_starts_at. Existing schedules stay
+    # single occurrences and are expanded on the next read.
+    conn.execute(text('DROP INDEX IF EXISTS ix_chore_schedule_scheduled_at'))
+
+
+def occurrence_reminders(conn):
+    _add_columns(conn, 'schedule_occurrence', [('reminded_at', DateTime())])
+
+
+# (version, name, function) -- append only, never renumber
+MIGRATIONS = [
+    (1, 'chore_due_columns', chore_due_columns),
+    (2, 'hot_path_indexes', hot_path_indexes),
+    (3, 'daily_user_points', daily_user_points),
+    (4, 'history_keyset_index', history_keyset_index),
+    (5, 'data_versions', data_versions),
+    (6, 'updated_at_columns', updated_at_columns),
+    (7, 'chore_archive', chore_archive),
+    (8, 'chore_log_summary', chore_log_summary),
+    (9, 'points_reconciliation', points_reconciliation),
+    (10, 'schedule_occurrences', schedule_occurrences),
+    (11, 'occurrence_reminders', occurrence_reminders),
+]
+
+
+def applied_versions(conn):
+    conn.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_migrations ('
+        'version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+    return {row[0] for row in conn.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def init_db():
+    """Create missing tables, then apply pending migrations. Needs an app context."""
+    db.create_all()
+    return upgrade()
+
+
+def upgrade(engine=None):
+    """Apply pending migrations, each in its own transaction. Returns the names applied."""
+    engine = engine or db.engine
+    applied = []
+
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text('INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)'),
+                {'v': version, 'n': name, 't': datetime.utcnow()}
+            )
+        applied.append(name)
+
+    return applied
@@ -1,20 +1,28 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.extensions import db
 
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.session_user import register_invalidation
+from app.events import emit
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128))
-    total_points = db.Column(db.Integer, default=0)
+    total_points = db.Column(db.Integer, default=0, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     first_name = db.Column(db.String(80))
     last_name = db.Column(db.String(80))
     pronouns = db.Column(db.String(20))
     email = db.Column(db.String(120))
     profile_picture = db.Column(db.String(255))
+    # Set on every write, including bulk UPDATEs; drives ?since= sync
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Columns list endpoints select as plain rows instead of loading instances
+    LIST_COLUMNS = ('id', 'username', 'total_points', 'created_at', 'first_name', 'last_name',
+                    'pronouns', 'email', 'profile_picture')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -23,19 +31,39 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
     def to_dict(self):
+        return User.row_to_dict(self)
+
+    @classmethod
+    def list_columns(cls):
+        return [getattr(cls, name) for name in cls.LIST_COLUMNS]
+
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a User or a row of LIST_COLUMNS."""
         return {
-            'id': self.id,
-            'username': self.username,
-            'total_points': self.total_points,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'pronouns': self.pronouns,
-            'email': self.email,
-            'profile_picture': self.profile_picture
+            'id': row.id,
+            'username': row.username,
+            'total_points': row.total_points,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'first_name': row.first_name,
+            'last_name': row.last_name,
+            'pronouns': row.pronouns,
+            'email': row.email,
+            'profile_picture': row.profile_picture
         }
 
 class Chore(db.Model):
+    __table_args__ = (
+        # The live board only ever reads active chores, newest first
+        db.Index('ix_chore_active_created_at', 'created_at',
+                 sqlite_where=db.text('is_deleted = 0'),
+                 postgresql_where=db.text('is_deleted = false')),
+        # Overdue filter, sort=due and the ETag due clock; deleted chores stay out of it
+        db.Index('ix_chore_active_next_due_at', 'next_due_at',
+                 sqlite_where=db.text('is_deleted = 0'),
+                 postgresql_where=db.text('is_deleted = false')),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.String(255), nullable=True)
@@ -44,48 +72,157 @@ class Chore(db.Model):
     is_recurring = db.Column(db.Boolean, default=False)
     is_deleted = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Recurrence interval in days; None means "recurring, no fixed cadence"
+    recurrence_days = db.Column(db.Integer, nullable=True)
+    # Denormalized from ChoreLog, kept current by mark_completed()
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+    next_due_at = db.Column(db.DateTime, nullable=True)
+    # Set on every write, including soft deletes, so deletions sync as tombstones
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
-    def to_dict(self):
+    LIST_COLUMNS = ('id', 'title', 'description', 'location', 'points', 'is_recurring', 'created_at',
+                    'recurrence_days', 'last_completed_at', 'next_due_at')
+
+    def compute_next_due(self):
+        if not self.is_recurring or not self.recurrence_days:
+            return None
+        base = self.last_completed_at or self.created_at or datetime.utcnow()
+        return base + timedelta(days=self.recurrence_days)
+
+    @classmethod
+    def touch(cls, chore_ids):
+        """Mark chores changed when something serialized with them (their schedules) changes."""
+        if chore_ids:
+            cls.query.filter(cls.id.in_(chore_ids)).update({cls.updated_at: datetime.utcnow()},
+                                                           synchronize_session=False)
+
+    @classmethod
+    def active(cls):
+        # Literal false() so the comparison matches the partial index predicate
+        return cls.query.filter(cls.is_deleted == db.false())
+
+    def mark_completed(self, completed_at):
+        if self.last_completed_at is None or completed_at > self.last_completed_at:
+            self.last_completed_at = completed_at
+        self.next_due_at = self.compute_next_due()
+
+    def to_dict(self, schedules=None):
+        # Scheduling; list callers go through serialize_many() and pass these in
+        if schedules is None:
+            schedules = upcoming_schedules([self.id]).get(self.id, [])
+        return Chore.row_to_dict(self, schedules, datetime.utcnow())
+
+    @classmethod
+    def list_columns(cls):
+        return [getattr(cls, name) for name in cls.LIST_COLUMNS]
+
+    @staticmethod
+    def row_to_dict(row, schedules, now):
+        """Serialize a Chore or a row of LIST_COLUMNS."""
         data = {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'location': self.location,
-            'points': self.points,
-            'is_recurring': self.is_recurring,
-            'created_at': self.created_at.isoformat()
+            'id': row.id,
+            'title': row.title,
+            'description': row.description,
+            'location': row.location,
+            'points': row.points,
+            'is_recurring': row.is_recurring,
+            'created_at': row.created_at.isoformat()
         }
-        
-        if self.is_recurring and self.logs:
-            # Find the most recent log
-            last_log = max(self.logs, key=lambda x: x.completed_at)
-            data['last_completed_at'] = last_log.completed_at.isoformat()
-            
-        # Scheduling
-        now = datetime.utcnow()
-        if hasattr(self, 'schedules') and self.schedules:
-            active_schedules = [s for s in self.schedules if s.scheduled_at > now]
-            active_schedules.sort(key=lambda x: x.scheduled_at)
-            data['schedules'] = [{
-                'user_name': s.user.username if s.user else 'Unknown',
-                'user_avatar': s.user.profile_picture if s.user else None,
-                'scheduled_at': s.scheduled_at.isoformat()
-            } for s in active_schedules]
-        else:
-            data['schedules'] = []
 
+        if row.is_recurring:
+            data['recurrence_days'] = row.recurrence_days
+            if row.last_completed_at:
+                data['last_completed_at'] = row.last_completed_at.isoformat()
+            if row.next_due_at:
+                data['next_due_at'] = row.next_due_at.isoformat()
+                data['is_overdue'] = row.next_due_at <= now
+
+        data['schedules'] = schedules
         return data
 
+    @staticmethod
+    def serialize_many(rows):
+        """Serialize chores, or LIST_COLUMNS rows, with a fixed number of queries."""
+        chore_ids = [r.id for r in rows]
+        if not chore_ids:
+            return []
+
+        schedules = upcoming_schedules(chore_ids)
+        now = datetime.utcnow()
+        return [Chore.row_to_dict(r, schedules.get(r.id, []), now) for r in rows]
+
+class ChoreUnavailable(Exception):
+    """The chore was deleted or, if one-off, already completed."""
+
+
 class ChoreLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_chore_log_chore_id_completed_at', 'chore_id', 'completed_at'),
+        # points_earned makes it covering for per-user point sums (app.reconcile)
+        db.Index('ix_chore_log_user_id_completed_at', 'user_id', 'completed_at', 'points_earned'),
+        # Keyset pagination of history orders by (completed_at, id)
+        db.Index('ix_chore_log_completed_at_id', 'completed_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    chore_id = db.Column(db.Integer, db.ForeignKey('chore.id'), nullable=False)
+    # chore.id, or chore_archive.id once app.archive has moved the chore out,
+    # so there is no foreign key constraint
+    chore_id = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     points_earned = db.Column(db.Integer, nullable=False)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    chore = db.relationship('Chore', backref=db.backref('logs', lazy=True))
-    user = db.relationship('User', backref=db.backref('logs', lazy=True))
+    # Dynamic: a chore or user can have years of logs, so the backrefs are queries
+    chore = db.relationship('Chore', primaryjoin='foreign(ChoreLog.chore_id) == Chore.id',
+                            backref=db.backref('logs', lazy='dynamic'))
+    user = db.relationship('User', backref=db.backref('logs', lazy='dynamic'))
+
+    @classmethod
+    def record(cls, chore, user_id, completed_at):
+        """
+        Record a completion using only conditional and relative UPDATEs, so
+        concurrent completions cannot lose points or complete a one-off
+        chore twice. The caller commits. Raises ChoreUnavailable.
+        """
+        active = (Chore.id == chore.id, Chore.is_deleted == db.false())
+
+        if chore.is_recurring:
+            next_due = completed_at + timedelta(days=chore.recurrence_days) if chore.recurrence_days else None
+            # Only ever move last_completed_at forwards
+            advanced = Chore.query.filter(
+                *active,
+                db.or_(Chore.last_completed_at.is_(None), Chore.last_completed_at < completed_at)
+            ).update({Chore.last_completed_at: completed_at, Chore.next_due_at: next_due},
+                     synchronize_session=False)
+            if not advanced and not db.session.query(Chore.query.filter(*active).exists()).scalar():
+                raise ChoreUnavailable(f"Chore {chore.id} is not available")
+        else:
+            # Claim the one-off chore; a concurrent completion matches zero rows
+            claimed = Chore.query.filter(*active).update({
+                Chore.is_deleted: True,
+                Chore.last_completed_at: completed_at,
+                Chore.next_due_at: None
+            }, synchronize_session=False)
+            if not claimed:
+                raise ChoreUnavailable(f"Chore {chore.id} has already been completed")
+
+        User.query.filter_by(id=user_id).update(
+            {User.total_points: User.total_points + chore.points}, synchronize_session=False)
+        DailyUserPoints.record(user_id, completed_at, chore.points)
+        DataVersion.bump('chores', 'users')
+
+        # Enough for live clients (app/events.py) to update the chore card in place
+        change = {'chore_id': chore.id, 'user_id': user_id, 'points_earned': chore.points,
+                  'completed_at': completed_at.isoformat(), 'is_deleted': not chore.is_recurring}
+        if chore.is_recurring and advanced:
+            change['last_completed_at'] = completed_at.isoformat()
+            change['next_due_at'] = next_due.isoformat() if next_due else None
+        emit('chore.completed', change)
+
+        log = cls(chore_id=chore.id, user_id=user_id, points_earned=chore.points, completed_at=completed_at)
+        db.session.add(log)
+        return log
 
     def to_dict(self):
         return {
@@ -94,17 +231,407 @@ class ChoreLog(db.Model):
             'user_id': self.user_id,
             'points_earned': self.points_earned,
             'completed_at': self.completed_at.isoformat(),
-            'chore_title': self.chore.title if self.chore else 'Unknown',
+            'chore_title': self.chore.title if self.chore else ChoreArchive.title_of(self.chore_id),
             'username': self.user.username if self.user else 'Unknown'
         }
 
+    @classmethod
+    def list_query(cls):
+        """
+        History rows as plain tuples, with the chore title and username joined
+        in. Titles of archived chores come from chore_archive.
+        """
+        return db.session.query(
+            cls.id, cls.chore_id, cls.user_id, cls.points_earned, cls.completed_at,
+            db.func.coalesce(Chore.title, ChoreArchive.title).label('chore_title'), User.username.label('username')
+        ).outerjoin(Chore, Chore.id == cls.chore_id) \
+            .outerjoin(ChoreArchive, ChoreArchive.id == cls.chore_id) \
+            .outerjoin(User, User.id == cls.user_id)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Serialize a row of list_query()."""
+        return {
+            'id': row.id,
+            'chore_id': row.chore_id,
+            'user_id': row.user_id,
+            'points_earned': row.points_earned,
+            'completed_at': row.completed_at.isoformat(),
+            'chore_title': row.chore_title if row.chore_title is not None else 'Unknown',
+            'username': row.username if row.username is not None else 'Unknown'
+        }
+
+class ChoreArchive(db.Model):
+    """
+    Soft-deleted chores moved out of the live table by app.archive. Rows
+    keep their chore id, so ChoreLog.chore_id still resolves for history.
+    """
+    __tablename__ = 'chore_archive'
+
+    # Copied from the live row, in this order
+    COLUMNS = ('id', 'title', 'description', 'location', 'points', 'is_recurring', 'created_at',
+               'recurrence_days', 'last_completed_at')
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.String(255), nullable=True)
+    location = db.Column(db.String(50))
+    points = db.Column(db.Integer, nullable=False)
+    is_recurring = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    recurrence_days = db.Column(db.Integer, nullable=True)
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+    # The live row's updated_at, i.e. when it was deleted; old sync tokens still get the tombstone
+    deleted_at = db.Column(db.DateTime, index=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def title_of(cls, chore_id):
+        title = db.session.query(cls.title).filter_by(id=chore_id).scalar()
+        return title if title is not None else 'Unknown'
+
+
+class MaintenanceCheckpoint(db.Model):
+    """Progress of a resumable batch job, so a restart picks up where it stopped."""
+    __tablename__ = 'maintenance_checkpoint'
+
+    name = db.Column(db.String(40), primary_key=True)
+    # Last key processed in the current pass; 0 between passes
+    position = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def load(cls, name):
+        checkpoint = db.session.get(cls, name)
+        if checkpoint is None:
+            checkpoint = cls(name=name, position=0, processed=0)
+            db.session.add(checkpoint)
+        return checkpoint
+
+
 class ChoreSchedule(db.Model):
+    __table_args__ = (
+        db.Index('ix_chore_schedule_chore_id_scheduled_at', 'chore_id', 'scheduled_at'),
+    )
+
+    # Named recurrences the invite APIs accept: name -> (RRULE FREQ, INTERVAL)
+    RECURRENCES = {
+        'weekly': ('WEEKLY', 1),
+        'biweekly': ('WEEKLY', 2),
+        'monthly': ('MONTHLY', 1),
+    }
+
     id = db.Column(db.Integer, primary_key=True)
     chore_id = db.Column(db.Integer, db.ForeignKey('chore.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    # First occurrence
     scheduled_at = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # None for a single occurrence
+    recurrence_freq = db.Column(db.String(10), nullable=True)
+    recurrence_interval = db.Column(db.Integer, nullable=True)
+    # Occurrences before this are in schedule_occurrence (app.recurrence);
+    # None until first expanded
+    expanded_until = db.Column(db.DateTime, nullable=True, index=True)
     
     # Relationships
     chore = db.relationship('Chore', backref=db.backref('schedules', lazy=True))
     user = db.relationship('User', backref=db.backref('schedules', lazy=True))
+
+    def set_recurrence(self, name):
+        """Store a named recurrence (or None) as FREQ and INTERVAL. Raises ValueError for unknown names."""
+        if name and (not isinstance(name, str) or name not in self.RECURRENCES):
+            raise ValueError(f"recurrence must be one of {', '.join(self.RECURRENCES)}")
+        self.recurrence_freq, self.recurrence_interval = self.RECURRENCES[name] if name else (None, None)
+
+    @classmethod
+    def recurrence_name(cls, freq, interval):
+        for name, rule in cls.RECURRENCES.items():
+            if rule == (freq, interval):
+                return name
+        return None
+
+
+class ScheduleOccurrence(db.Model):
+    """
+    One occurrence of a ChoreSchedule, materialized by app.recurrence up to
+    the schedule's expanded_until. Single schedules have exactly one.
+    """
+    __tablename__ = 'schedule_occurrence'
+    __table_args__ = (
+        db.UniqueConstraint('schedule_id', 'starts_at', name='uq_schedule_occurrence_schedule_id_starts_at'),
+        # /api/schedules?from=&to= and the board's due clock
+        db.Index('ix_schedule_occurrence_starts_at', 'starts_at'),
+        # A chore's next occurrences on the board
+        db.Index('ix_schedule_occurrence_chore_id_starts_at', 'chore_id', 'starts_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key: occurrences are derived rows, dropped in bulk with
+    # (or after) their schedule
+    schedule_id = db.Column(db.Integer, nullable=False)
+    # Copied from the schedule so window queries need no join to filter
+    chore_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    # Set when app.reminders claims this occurrence's reminder
+    reminded_at = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def add(cls, entries):
+        """Insert dicts of schedule_id, chore_id, user_id and starts_at, skipping ones already there."""
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(cls.__table__).on_conflict_do_nothing(index_elements=['schedule_id', 'starts_at'])
+            db.session.execute(stmt, entries)
+            return
+
+        for values in entries:
+            if not cls.query.filter_by(schedule_id=values['schedule_id'], starts_at=values['starts_at']).count():
+                db.session.add(cls(**values))
+
+
+class DailyUserPoints(db.Model):
+    """Per-user, per-day rollup of ChoreLog, maintained by record()."""
+    __tablename__ = 'daily_user_points'
+
+    date = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def record(cls, user_id, completed_at, points, count=1):
+        """Add a completion to the rollup in the caller's transaction."""
+        values = {'date': completed_at.date(), 'user_id': user_id, 'points': points, 'count': count}
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(cls.__table__).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['date', 'user_id'],
+                set_={'points': cls.__table__.c.points + stmt.excluded.points,
+                      'count': cls.__table__.c.count + stmt.excluded.count}
+            )
+            db.session.execute(stmt)
+            return
+
+        updated = cls.query.filter_by(date=values['date'], user_id=user_id).update({
+            cls.points: cls.points + points,
+            cls.count: cls.count + count
+        }, synchronize_session=False)
+        if not updated:
+            db.session.add(cls(**values))
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Regenerate the rollup from ChoreLog in one INSERT ... SELECT. Days
+        already compacted into ChoreLogSummary no longer have their logs, so
+        their rows are kept as they are.
+        """
+        day = db.func.date(ChoreLog.completed_at)
+        source = db.select(
+            day,
+            ChoreLog.user_id,
+            db.func.sum(ChoreLog.points_earned),
+            db.func.count(ChoreLog.id)
+        ).group_by(day, ChoreLog.user_id)
+        stale = cls.query
+
+        compacted_before = ChoreLogSummary.compacted_before()
+        if compacted_before is not None:
+            source = source.where(ChoreLog.completed_at >= datetime.combine(compacted_before, datetime.min.time()))
+            stale = stale.filter(cls.date >= compacted_before)
+
+        stale.delete(synchronize_session=False)
+        db.session.execute(
+            db.insert(cls.__table__).from_select(['date', 'user_id', 'points', 'count'], source)
+        )
+
+
+class ChoreLogSummary(db.Model):
+    """
+    Per-month, per-user, per-chore totals of ChoreLog rows older than the
+    retention horizon, written by app.compaction as it deletes them.
+    """
+    __tablename__ = 'chore_log_summary'
+
+    # First day of the month
+    month = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    # chore.id or chore_archive.id, like ChoreLog.chore_id
+    chore_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def add(cls, entries):
+        """Add dicts of month, user_id, chore_id, points and count in the caller's transaction."""
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(cls.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['month', 'user_id', 'chore_id'],
+                set_={'points': cls.__table__.c.points + stmt.excluded.points,
+                      'count': cls.__table__.c.count + stmt.excluded.count}
+            )
+            db.session.execute(stmt, entries)
+            return
+
+        for values in entries:
+            updated = cls.query.filter_by(month=values['month'], user_id=values['user_id'],
+                                          chore_id=values['chore_id']).update({
+                cls.points: cls.points + values['points'],
+                cls.count: cls.count + values['count']
+            }, synchronize_session=False)
+            if not updated:
+                db.session.add(cls(**values))
+
+    @classmethod
+    def compacted_before(cls):
+        """First day after the latest summarized month, or None if nothing is summarized."""
+        latest = db.session.query(db.func.max(cls.month)).scalar()
+        if latest is None:
+            return None
+        return (latest.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class UserPointsBaseline(db.Model):
+    """
+    Each user's points from ChoreLog and ChoreLogSummary up to the log id
+    high-water mark kept in the 'reconcile' MaintenanceCheckpoint. Lets
+    app.reconcile check totals by summing only newer logs.
+    """
+    __tablename__ = 'user_points_baseline'
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    points = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DataVersion(db.Model):
+    """
+    Monotonic change counter per data set, bumped in the same transaction as
+    every write to it. Read APIs derive their ETags from these counters.
+    """
+    __tablename__ = 'data_version'
+
+    NAMES = ('chores', 'users', 'schedules')
+
+    name = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, *names):
+        """Increment the named counters in the caller's transaction."""
+        updated = cls.query.filter(cls.name.in_(names)).update(
+            {cls.version: cls.version + 1}, synchronize_session=False)
+        if updated < len(names):
+            # Rows are seeded by the data_versions migration; a database
+            # rebuilt with create_all() starts without them
+            existing = {n for (n,) in db.session.query(cls.name).filter(cls.name.in_(names))}
+            db.session.add_all([cls(name=n, version=1) for n in names if n not in existing])
+
+    @classmethod
+    def current(cls, names):
+        """{name: version} read with a single Core query, no ORM objects."""
+        rows = db.session.execute(
+            db.select(cls.name, cls.version).where(cls.name.in_(names))
+        )
+        return dict(rows.all())
+
+
+class OutboundEmail(db.Model):
+    """Persistent mail outbox, drained by app.outbox.OutboxWorker."""
+    __tablename__ = 'mail_outbox'
+    __table_args__ = (
+        db.Index('ix_mail_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_email = db.Column(db.String(120), nullable=False)
+    recipient_name = db.Column(db.String(80))
+    subject = db.Column(db.String(255), nullable=False)
+    text_body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    ics_content = db.Column(db.Text)
+    # pending -> sending -> sent, or back to pending with backoff, or dead
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    # When pending: earliest retry time. When sending: lease expiry.
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'recipient_email': self.recipient_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.status == 'pending' else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+
+def upcoming_schedules(chore_ids):
+    """Map chore id -> serialized future schedules, soonest first."""
+    result = {}
+    if not chore_ids:
+        return result
+
+    # Each schedule's next materialized occurrence; recurring schedules
+    # show up once, at their next date
+    next_at = db.func.min(ScheduleOccurrence.starts_at)
+    rows = db.session.query(ChoreSchedule.chore_id, next_at, User.username, User.profile_picture,
+                            ChoreSchedule.recurrence_freq, ChoreSchedule.recurrence_interval) \
+        .join(ChoreSchedule, ChoreSchedule.id == ScheduleOccurrence.schedule_id) \
+        .outerjoin(User, User.id == ChoreSchedule.user_id) \
+        .filter(ScheduleOccurrence.chore_id.in_(chore_ids),
+                ScheduleOccurrence.starts_at > datetime.utcnow()) \
+        .group_by(ChoreSchedule.id, ChoreSchedule.chore_id, User.username, User.profile_picture,
+                  ChoreSchedule.recurrence_freq, ChoreSchedule.recurrence_interval) \
+        .order_by(next_at)
+    for chore_id, scheduled_at, username, avatar, freq, interval in rows:
+        result.setdefault(chore_id, []).append(
+            board_schedule(username, avatar, scheduled_at, ChoreSchedule.recurrence_name(freq, interval)))
+    return result
+
+def board_schedule(username, avatar, scheduled_at, recurrence=None):
+    """One entry of a chore's `schedules` list."""
+    return {
+        'user_name': username if username is not None else 'Unknown',
+        'user_avatar': avatar,
+        'scheduled_at': scheduled_at.isoformat(),
+        'recurrence': recurrence
+    }
+
+def emit_schedule_added(chore_id, user, scheduled_at, recurrence=None):
+    """Tell live clients about a schedule if it is still upcoming (the board hides past ones)."""
+    if scheduled_at > datetime.utcnow():
+        emit('schedule.added', {'chore_id': chore_id,
+                                **board_schedule(user.username, user.profile_picture, scheduled_at, recurrence)})
+
+# Drop the cached session user (app/session_user.py) when its row changes
+register_invalidation(User)
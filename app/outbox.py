@@ -0,0 +1,139 @@
+"""Background delivery of queued emails.
+
+Requests only insert an OutboundEmail row (enqueue) and return. An
+OutboxWorker, either a thread started next to the dev server or the
+standalone scripts/mail_worker.py process, claims due rows and hands them
+to a bounded thread pool. Failures are retried with exponential backoff
+until max_attempts, after which the row is dead-lettered (status 'dead').
+Jobs that share a subject and attachment (the same invite sent to several
+people) are handed to the transport together so it can send them in one
+provider call or over one connection.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+
+from sqlalchemy import or_
+
+from app.extensions import db
+from app.models import OutboundEmail
+from app.mail import deliver_batch
+from app.mail_transport import close_transports
+
+
+def enqueue(recipient_email, recipient_name, subject, text_body, html_body, ics_content=None, max_attempts=None):
+    """Add a message to the outbox. Committed together with the caller's transaction."""
+    from flask import current_app
+
+    job = OutboundEmail(
+        recipient_email=recipient_email,
+        recipient_name=recipient_name,
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body,
+        ics_content=ics_content,
+        max_attempts=max_attempts or current_app.config['MAIL_MAX_ATTEMPTS'],
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    return job
+
+
+def retry_delay(attempts, config):
+    base = config['MAIL_RETRY_BASE_SECONDS']
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), config['MAIL_RETRY_MAX_SECONDS']))
+
+
+class OutboxWorker:
+    def __init__(self, app, concurrency=None, poll_interval=None, batch_size=None):
+        self.app = app
+        self.concurrency = concurrency or app.config['MAIL_WORKER_CONCURRENCY']
+        self.poll_interval = poll_interval or app.config['MAIL_WORKER_POLL_SECONDS']
+        self.batch_size = batch_size or self.concurrency * 4
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='outbox')
+        self._stop = threading.Event()
+        self._thread = None
+
+    def claim(self):
+        """Claim up to batch_size due jobs. Returns lists of job ids to send together."""
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=self.app.config['MAIL_LEASE_SECONDS'])
+        due = or_(OutboundEmail.status == 'pending', OutboundEmail.status == 'sending')
+
+        candidates = db.session.query(OutboundEmail.id, OutboundEmail.subject, OutboundEmail.ics_content) \
+            .filter(due, OutboundEmail.next_attempt_at <= now) \
+            .order_by(OutboundEmail.next_attempt_at) \
+            .limit(self.batch_size) \
+            .all()
+        groups = {}
+        for job_id, subject, ics_content in candidates:
+            # Conditional update so two workers never claim the same row. A
+            # 'sending' row whose lease expired belonged to a crashed worker.
+            updated = OutboundEmail.query.filter(
+                OutboundEmail.id == job_id, due, OutboundEmail.next_attempt_at <= now
+            ).update({
+                OutboundEmail.status: 'sending',
+                OutboundEmail.attempts: OutboundEmail.attempts + 1,
+                OutboundEmail.next_attempt_at: lease
+            }, synchronize_session=False)
+            if updated:
+                groups.setdefault((subject, ics_content), []).append(job_id)
+        db.session.commit()
+
+        size = self.app.config['MAIL_BATCH_SIZE']
+        return [ids[i:i + size] for ids in groups.values() for i in range(0, len(ids), size)]
+
+    def process(self, job_ids):
+        with self.app.app_context():
+            jobs = OutboundEmail.query.filter(OutboundEmail.id.in_(job_ids)).all()
+            results = deliver_batch(jobs, self.app.config)
+            now = datetime.utcnow()
+            for job in jobs:
+                err = results[job.id]
+                if err is None:
+                    job.status = 'sent'
+                    job.sent_at = now
+                    job.last_error = None
+                    continue
+                self.app.logger.warning("Mail job %s attempt %s failed: %s", job.id, job.attempts, err)
+                job.last_error = str(err)
+                if err.permanent or job.attempts >= job.max_attempts:
+                    job.status = 'dead'
+                else:
+                    job.status = 'pending'
+                    job.next_attempt_at = now + retry_delay(job.attempts, self.app.config)
+            db.session.commit()
+            return {job.id: job.status for job in jobs}
+
+    def run_once(self):
+        """Claim one batch and wait for it to finish. Returns {job_id: status}."""
+        with self.app.app_context():
+            batches = self.claim()
+        futures = [self._pool.submit(self.process, job_ids) for job_ids in batches]
+        statuses = {}
+        for future in futures:
+            statuses.update(future.result())
+        return statuses
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception:
+                self.app.logger.exception("Outbox worker iteration failed")
+                processed = {}
+            # Keep draining while there is work, otherwise poll
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name='outbox-worker', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
+        close_transports()
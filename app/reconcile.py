@@ -0,0 +1,145 @@
+"""Reconciliation of User.total_points against the completion history.
+
+total_points is a counter bumped by ChoreLog.record(). The history it should
+equal is the user's ChoreLog rows plus their ChoreLogSummary rows.
+reconcile() compares the two for every user in one grouped SQL statement
+and reports the users whose counter has drifted. With repair=True it fixes
+them in one bulk UPDATE.
+
+Modes:
+
+- full: sums all history per user. The sum over chore_log is read from the
+  covering ix_chore_log_user_id_completed_at index, so it never touches the
+  table itself.
+- incremental: starts from UserPointsBaseline, each user's sum as of the
+  log id high-water mark in the 'reconcile' MaintenanceCheckpoint, and adds
+  only the logs above that mark. Every run saves a new baseline and mark.
+  Compaction only removes logs older than the retention horizon, so a
+  baseline older than that horizon could miss logs; the run falls back to
+  full instead. The first run is always full. Changes to history below the
+  mark (rows deleted or edited by hand) are only seen by a full run.
+  The mark assumes log ids commit in order, which holds on SQLite (one
+  writer at a time) but not with a sequence, where a transaction holding
+  a lower id can commit after a higher one. Other databases therefore
+  always run full.
+
+Repairs are only made from a full pass. An incremental run that finds
+drift with repair=True re-checks in full before changing anything.
+
+Running alongside complete_chore() is safe:
+
+- The comparison is one SELECT, so counters and history come from the same
+  snapshot.
+- Repairs add the drift found (`total_points + delta`) rather than writing
+  absolute totals, so completions committed between the read and the
+  repair are kept.
+- Runs claim the checkpoint with a conditional UPDATE on its run counter. Of
+  two overlapping runs, the second finds the counter moved and neither
+  repairs twice nor overwrites the newer baseline.
+"""
+import time
+
+from flask import current_app
+
+from app.compaction import retention_horizon
+from app.events import emit
+from app.extensions import db
+from app.models import ChoreLog, ChoreLogSummary, DataVersion, MaintenanceCheckpoint, User, UserPointsBaseline
+
+CHECKPOINT = 'reconcile'
+
+
+def _history_sum(user_id, points, *conditions):
+    return db.select(user_id.label('user_id'), db.func.sum(points).label('points')) \
+        .where(*conditions).group_by(user_id).subquery()
+
+
+def compare_query(high_water=None):
+    """
+    One row per user: id, username, total_points, expected and the current
+    highest log id. Full when high_water is None, else from the baseline.
+    """
+    max_log_id = db.select(db.func.coalesce(db.func.max(ChoreLog.id), 0)).scalar_subquery()
+
+    if high_water is None:
+        logs = _history_sum(ChoreLog.user_id, ChoreLog.points_earned)
+        summaries = _history_sum(ChoreLogSummary.user_id, ChoreLogSummary.points)
+        expected = db.func.coalesce(logs.c.points, 0) + db.func.coalesce(summaries.c.points, 0)
+        query = db.select(User.id, User.username, User.total_points, expected.label('expected'),
+                          max_log_id.label('max_log_id')) \
+            .outerjoin(logs, logs.c.user_id == User.id) \
+            .outerjoin(summaries, summaries.c.user_id == User.id)
+    else:
+        # Grouping on user_id + 0 keeps SQLite from walking the whole user_id
+        # index for the GROUP BY; the primary key range on id is far smaller
+        logs = _history_sum(ChoreLog.user_id + 0, ChoreLog.points_earned, ChoreLog.id > high_water)
+        expected = db.func.coalesce(UserPointsBaseline.points, 0) + db.func.coalesce(logs.c.points, 0)
+        query = db.select(User.id, User.username, User.total_points, expected.label('expected'),
+                          max_log_id.label('max_log_id')) \
+            .outerjoin(UserPointsBaseline, UserPointsBaseline.user_id == User.id) \
+            .outerjoin(logs, logs.c.user_id == User.id)
+    return query.order_by(User.id)
+
+
+def reconcile(full=False, repair=False):
+    """
+    Compare every user's total_points with their history; repair drift if
+    asked. Needs an app context. Returns a report dict.
+    """
+    started = time.perf_counter()
+    checkpoint = MaintenanceCheckpoint.load(CHECKPOINT)
+    runs, high_water, last_run = checkpoint.processed, checkpoint.position, checkpoint.updated_at
+    db.session.commit()
+
+    horizon = retention_horizon(current_app.config['LOG_RETENTION_DAYS'])
+    incremental = not full and runs > 0 and last_run is not None and last_run >= horizon \
+        and db.engine.dialect.name == 'sqlite'
+    rows = db.session.execute(compare_query(high_water if incremental else None)).all()
+    if incremental and repair and any((row.total_points or 0) != row.expected for row in rows):
+        incremental = False
+        rows = db.session.execute(compare_query()).all()
+    # End the read transaction before writing; the repair is relative, so it needs no lock
+    db.session.commit()
+
+    new_high_water = max([high_water] + [row.max_log_id for row in rows]) if incremental else \
+        (rows[0].max_log_id if rows else 0)
+    drifted = [{
+        'user_id': row.id,
+        'username': row.username,
+        'total_points': row.total_points or 0,
+        'expected': row.expected,
+        'drift': (row.total_points or 0) - row.expected
+    } for row in rows if (row.total_points or 0) != row.expected]
+    report = {
+        'mode': 'incremental' if incremental else 'full',
+        'users_checked': len(rows),
+        'drifted': drifted,
+        'repaired': 0,
+        'high_water_mark': new_high_water,
+        'conflict': False
+    }
+
+    claimed = MaintenanceCheckpoint.query.filter_by(name=CHECKPOINT, processed=runs).update({
+        MaintenanceCheckpoint.position: new_high_water,
+        MaintenanceCheckpoint.processed: runs + 1
+    }, synchronize_session=False)
+    if not claimed:
+        db.session.rollback()
+        report['conflict'] = True
+    else:
+        UserPointsBaseline.query.delete(synchronize_session=False)
+        if rows:
+            db.session.execute(db.insert(UserPointsBaseline.__table__),
+                               [{'user_id': row.id, 'points': row.expected} for row in rows])
+        if repair and drifted:
+            delta = db.case({d['user_id']: -d['drift'] for d in drifted}, value=User.id, else_=0)
+            ids = [d['user_id'] for d in drifted]
+            report['repaired'] = User.query.filter(User.id.in_(ids)).update(
+                {User.total_points: User.total_points + delta}, synchronize_session=False)
+            DataVersion.bump('users')
+            for user_id, total in db.session.query(User.id, User.total_points).filter(User.id.in_(ids)):
+                emit('user.points', {'id': user_id, 'total_points': total})
+        db.session.commit()
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,140 @@
+"""Recurring schedules and their materialized occurrences.
+
+A ChoreSchedule stores its first occurrence (scheduled_at) and, when it
+repeats, an RRULE FREQ and INTERVAL (see ChoreSchedule.RECURRENCES). Reads
+never expand rules themselves: they query schedule_occurrence, which holds
+every occurrence of a schedule before its expanded_until. Range reads
+(/api/schedules?from=&to=) and the board's next occurrence per schedule
+are then plain index range scans on starts_at.
+
+ensure_expanded(until) extends every schedule whose expanded_until falls
+short of `until`, in batches of SCHEDULE_EXPAND_BATCH schedules, one
+transaction each. Each schedule is pushed SCHEDULE_EXPAND_DAYS past
+`until`, so a rolling horizon only does work once per that many days
+rather than on every read. A single occurrence is expanded once and marked
+FULLY_EXPANDED. Two requests extending the same horizon at once are
+harmless: expanded_until only moves forward, and an occurrence already
+present is skipped on insert (unique schedule_id, starts_at).
+
+Occurrences follow RFC 5545: MONTHLY on the 31st skips months without one.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import ChoreSchedule, DataVersion, ScheduleOccurrence
+
+# expanded_until of a single occurrence once it is materialized
+FULLY_EXPANDED = datetime(9999, 12, 31)
+
+
+def rrule(freq, interval):
+    """RRULE value for an invite, e.g. FREQ=WEEKLY;INTERVAL=2."""
+    return f'FREQ={freq}' if interval == 1 else f'FREQ={freq};INTERVAL={interval}'
+
+
+def occurrences(start, freq, interval, after, before):
+    """Occurrence starts in [after, before) of a rule starting at start."""
+    if freq is None:
+        if after <= start < before:
+            yield start
+        return
+
+    if freq == 'WEEKLY':
+        step = timedelta(weeks=interval)
+        # First occurrence at or after `after`, without walking from start
+        skipped = -((start - after) // step) if after > start else 0
+        moment = start + skipped * step
+        while moment < before:
+            yield moment
+            moment += step
+    elif freq == 'MONTHLY':
+        months = (after.year - start.year) * 12 + after.month - start.month
+        offset = max(0, months - months % interval)
+        while True:
+            year, month = divmod(start.month - 1 + offset, 12)
+            offset += interval
+            try:
+                moment = start.replace(year=start.year + year, month=month + 1)
+            except ValueError:
+                continue  # no such day this month
+            if moment >= before:
+                return
+            if moment >= after:
+                yield moment
+    else:
+        raise ValueError(f'Unsupported recurrence frequency: {freq}')
+
+
+def expand_schedules(schedules, until):
+    """
+    Materialize occurrences before `until` (all of them for a single
+    occurrence) of ChoreSchedules or rows with the same columns, with one
+    UPDATE and one INSERT. Returns the occurrences written. The caller
+    commits.
+    """
+    ids, entries = [], []
+    for schedule in schedules:
+        old = schedule.expanded_until
+        new = FULLY_EXPANDED if schedule.recurrence_freq is None else until
+        if old is not None and old >= new:
+            continue
+        ids.append(schedule.id)
+        entries += [{'schedule_id': schedule.id, 'chore_id': schedule.chore_id, 'user_id': schedule.user_id,
+                     'starts_at': start}
+                    for start in occurrences(schedule.scheduled_at, schedule.recurrence_freq,
+                                             schedule.recurrence_interval, old or schedule.scheduled_at, new)]
+    if not ids:
+        return 0
+
+    # Only ever forward, whatever a concurrent expansion wrote in between
+    ChoreSchedule.query.filter(
+        ChoreSchedule.id.in_(ids),
+        db.or_(ChoreSchedule.expanded_until.is_(None), ChoreSchedule.expanded_until < until)
+    ).update({ChoreSchedule.expanded_until: db.case((ChoreSchedule.recurrence_freq.is_(None), FULLY_EXPANDED),
+                                                    else_=until)}, synchronize_session=False)
+    if entries:
+        ScheduleOccurrence.add(entries)
+    return len(entries)
+
+
+def horizon():
+    """How far ahead the board needs occurrences: SCHEDULE_HORIZON_DAYS from now."""
+    return datetime.utcnow() + timedelta(days=current_app.config['SCHEDULE_HORIZON_DAYS'])
+
+
+def expansion_target(until):
+    """Where a schedule short of `until` is expanded to."""
+    return until + timedelta(days=current_app.config['SCHEDULE_EXPAND_DAYS'])
+
+
+def ensure_expanded(until=None, batch_size=None):
+    """
+    Make sure every schedule is materialized up to `until` (default: the
+    board's horizon). Needs an app context; commits once per batch.
+    Returns the occurrences added.
+    """
+    until = until or horizon()
+    batch_size = batch_size or current_app.config['SCHEDULE_EXPAND_BATCH']
+    target = expansion_target(until)
+    added = 0
+
+    while True:
+        # Unordered, so SQLite can answer the OR from the expanded_until index;
+        # expanded rows drop out of the filter
+        rows = db.session.query(
+            ChoreSchedule.id, ChoreSchedule.chore_id, ChoreSchedule.user_id, ChoreSchedule.scheduled_at,
+            ChoreSchedule.recurrence_freq, ChoreSchedule.recurrence_interval, ChoreSchedule.expanded_until
+        ).filter(db.or_(ChoreSchedule.expanded_until.is_(None), ChoreSchedule.expanded_until < until)) \
+            .limit(batch_size).all()
+        if not rows:
+            break
+        batch_added = expand_schedules(rows, target)
+        if batch_added:
+            DataVersion.bump('schedules')
+        db.session.commit()
+        added += batch_added
+        if len(rows) < batch_size:
+            break
+    return added
@@ -0,0 +1,189 @@
+"""Due reminders for scheduled chores.
+
+A ReminderScheduler, either scripts/reminder_daemon.py or a thread started
+next to the dev server, emails each occurrence's assignee
+REMINDER_LEAD_MINUTES before it starts. It never scans schedule_occurrence:
+
+- An in-memory min-heap holds (reminder time, occurrence id) for the
+  occurrences starting in the next REMINDER_WINDOW_MINUTES past the lead.
+  It is filled by a range scan on ix_schedule_occurrence_starts_at.
+- Each tick only reads what is new. Occurrences inserted since the last
+  tick are found by a primary key range above the highest id seen. The
+  window's leading edge is a starts_at range from where the last load
+  stopped. Every REMINDER_RESYNC_SECONDS the whole window is read again,
+  which catches rows committed out of id order, and schedules are expanded
+  that far ahead.
+- Due entries are popped off the heap and handed in batches of
+  REMINDER_BATCH_SIZE to a pool of REMINDER_CONCURRENCY threads.
+
+Each batch is one transaction. It claims every occurrence with a
+conditional UPDATE on reminded_at and enqueues the outbox row for each
+claimed one. Claim and email commit together, so a reminder is queued
+exactly once even with several schedulers running. A batch that fails
+before its commit leaves its occurrences unclaimed, and the next resync
+puts them back on the heap. The outbox then delivers with retries
+(app.outbox).
+
+Reminders more than REMINDER_GRACE_MINUTES late, for example after
+downtime, are dropped rather than sent.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import heapq
+import threading
+import time
+
+from app.extensions import db
+from app.mail import reminder_content
+from app.models import Chore, ChoreSchedule, ScheduleOccurrence, User
+from app.outbox import enqueue
+from app.recurrence import ensure_expanded
+
+
+class ReminderScheduler:
+    def __init__(self, app, concurrency=None, tick=None, batch_size=None):
+        config = app.config
+        self.app = app
+        self.concurrency = concurrency or config['REMINDER_CONCURRENCY']
+        self.tick = tick or config['REMINDER_TICK_SECONDS']
+        self.batch_size = batch_size or config['REMINDER_BATCH_SIZE']
+        self.lead = timedelta(minutes=config['REMINDER_LEAD_MINUTES'])
+        self.grace = timedelta(minutes=config['REMINDER_GRACE_MINUTES'])
+        self.window = timedelta(minutes=config['REMINDER_WINDOW_MINUTES'])
+        self.resync_seconds = config['REMINDER_RESYNC_SECONDS']
+        self._heap = []  # (remind_at, occurrence id)
+        self._queued = set()
+        self._max_id = 0
+        self._loaded_until = None  # starts_at up to which the heap is complete
+        self._resynced_at = None
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='reminders')
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, rows):
+        added = 0
+        for occurrence_id, starts_at in rows:
+            if occurrence_id not in self._queued:
+                heapq.heappush(self._heap, (starts_at - self.lead, occurrence_id))
+                self._queued.add(occurrence_id)
+                added += 1
+            self._max_id = max(self._max_id, occurrence_id)
+        return added
+
+    def _pending(self, *conditions):
+        return db.session.query(ScheduleOccurrence.id, ScheduleOccurrence.starts_at) \
+            .filter(ScheduleOccurrence.reminded_at.is_(None), *conditions)
+
+    def refresh(self, now):
+        """Bring the heap up to date for `now`. Needs an app context. Returns entries added."""
+        earliest = now + self.lead - self.grace
+        until = now + self.lead + self.window
+        monotonic = time.monotonic()
+
+        if self._loaded_until is None or monotonic - self._resynced_at >= self.resync_seconds:
+            ensure_expanded(until)
+            # Read the high-water id first: anything inserted after it is
+            # either in the range read below or found by the next id scan
+            newest = db.session.query(db.func.coalesce(db.func.max(ScheduleOccurrence.id), 0)).scalar()
+            self._max_id = max(self._max_id, newest)
+            added = self._push(self._pending(ScheduleOccurrence.starts_at >= earliest,
+                                             ScheduleOccurrence.starts_at < until))
+            self._resynced_at = monotonic
+        else:
+            # Inserted since the last tick, inside the part already loaded
+            added = self._push(self._pending(ScheduleOccurrence.id > self._max_id,
+                                             ScheduleOccurrence.starts_at >= earliest,
+                                             ScheduleOccurrence.starts_at < self._loaded_until))
+            # The window's leading edge
+            if until > self._loaded_until:
+                added += self._push(self._pending(ScheduleOccurrence.starts_at >= self._loaded_until,
+                                                  ScheduleOccurrence.starts_at < until))
+        self._loaded_until = until
+        db.session.commit()
+        return added
+
+    def pop_due(self, now):
+        """Remove and return the ids whose reminder time has come, dropping ones past the grace period."""
+        due, expired = [], 0
+        while self._heap and self._heap[0][0] <= now:
+            remind_at, occurrence_id = heapq.heappop(self._heap)
+            self._queued.discard(occurrence_id)
+            if remind_at < now - self.grace:
+                expired += 1
+            else:
+                due.append(occurrence_id)
+        return due, expired
+
+    def dispatch(self, occurrence_ids):
+        """Claim a batch and queue its emails in one transaction. Returns counts."""
+        counts = {'sent': 0, 'skipped': 0, 'taken': 0}
+        with self.app.app_context():
+            now = datetime.utcnow()
+            rows = db.session.query(
+                ScheduleOccurrence.id, ScheduleOccurrence.schedule_id, ScheduleOccurrence.chore_id,
+                ScheduleOccurrence.user_id, ScheduleOccurrence.starts_at
+            ).filter(ScheduleOccurrence.id.in_(occurrence_ids), ScheduleOccurrence.reminded_at.is_(None)).all()
+            counts['taken'] = len(occurrence_ids) - len(rows)
+
+            # Set-based lookups for the whole batch
+            schedule_ids = {row.schedule_id for row in rows}
+            live = {s for (s,) in db.session.query(ChoreSchedule.id).filter(ChoreSchedule.id.in_(schedule_ids))} \
+                if schedule_ids else set()
+            chores = {c.id: c for c in Chore.active().filter(Chore.id.in_({row.chore_id for row in rows}))} \
+                if rows else {}
+            users = {u.id: u for u in User.query.filter(User.id.in_({row.user_id for row in rows}))} if rows else {}
+
+            for row in rows:
+                # Conditional update so two schedulers never claim the same occurrence
+                claimed = ScheduleOccurrence.query.filter(
+                    ScheduleOccurrence.id == row.id, ScheduleOccurrence.reminded_at.is_(None)
+                ).update({ScheduleOccurrence.reminded_at: now}, synchronize_session=False)
+                if not claimed:
+                    counts['taken'] += 1
+                    continue
+                chore, user = chores.get(row.chore_id), users.get(row.user_id)
+                if row.schedule_id not in live or chore is None or user is None or not user.email:
+                    # Claimed anyway, so it is not looked at again
+                    counts['skipped'] += 1
+                    continue
+                enqueue(recipient_email=user.email, recipient_name=user.username,
+                        **reminder_content(user, chore, row.starts_at))
+                counts['sent'] += 1
+            db.session.commit()
+        return counts
+
+    def run_once(self, now=None):
+        """Refresh, then dispatch everything due and wait for it. Returns counts."""
+        now = now or datetime.utcnow()
+        with self.app.app_context():
+            self.refresh(now)
+        due, expired = self.pop_due(now)
+        totals = {'sent': 0, 'skipped': 0, 'taken': 0, 'expired': expired}
+        futures = [self._pool.submit(self.dispatch, due[i:i + self.batch_size])
+                   for i in range(0, len(due), self.batch_size)]
+        for future in futures:
+            for key, value in future.result().items():
+                totals[key] += value
+        return totals
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                self.app.logger.exception("Reminder scheduler iteration failed")
+            self._stop.wait(self.tick)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name='reminder-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._pool.shutdown(wait=True)
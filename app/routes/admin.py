@@ -0,0 +1,48 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from app.reconcile import reconcile
+import hmac
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_authorized():
+    token = current_app.config.get('ADMIN_TOKEN')
+    supplied = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(supplied, f'Bearer {token}')
+
+@admin_bp.route('/api/admin/reconcile', methods=['POST'])
+@login_required
+def reconcile_points():
+    """
+    Check every user's total_points against their completion history
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: Authorization
+        in: header
+        type: string
+        required: true
+        description: Bearer ADMIN_TOKEN
+      - name: body
+        in: body
+        required: false
+        schema:
+          type: object
+          properties:
+            full:
+              type: boolean
+              description: Sum all history instead of only the logs since the last run
+            repair:
+              type: boolean
+              description: Correct the drifted totals in one bulk UPDATE
+    responses:
+      200:
+        description: Mode, users checked, drift per user, users repaired and timing
+      403:
+        description: ADMIN_TOKEN is not set or the bearer token does not match
+    """
+    if not admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    data = request.get_json(silent=True) or {}
+    return jsonify(reconcile(full=bool(data.get('full')), repair=bool(data.get('repair'))))
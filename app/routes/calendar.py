@@ -0,0 +1,162 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
+from flask_login import current_user, login_required
+from app.models import Chore, ChoreSchedule, User
+from app.extensions import db
+from app.cache import CacheError, get_cache, stats
+from app.ical import chore_description, chore_summary, event_uid, vevent, write_calendar
+from app.recurrence import rrule
+import hashlib
+import hmac
+
+calendar_bp = Blueprint('calendar', __name__)
+
+CACHE_CONTROL = 'private, no-cache'
+MIMETYPE = 'text/calendar'
+
+def calendar_token(user_id):
+    """Secret in a user's feed URL; calendar clients cannot log in."""
+    return hmac.new(current_app.secret_key.encode('utf-8'), f'calendar:{user_id}'.encode('utf-8'),
+                    hashlib.sha256).hexdigest()[:32]
+
+def feed_state(user):
+    """
+    (ETag, Last-Modified) of a user's feed from one aggregate over their
+    schedules. Any schedule added or removed moves the count or newest id;
+    edits to the chores or the user move the timestamps.
+    """
+    count, newest_id, newest_schedule, newest_chore = db.session.query(
+        db.func.count(ChoreSchedule.id), db.func.max(ChoreSchedule.id),
+        db.func.max(ChoreSchedule.created_at), db.func.max(Chore.updated_at)
+    ).join(Chore, Chore.id == ChoreSchedule.chore_id) \
+        .filter(ChoreSchedule.user_id == user.id, Chore.is_deleted == db.false()).one()
+    changed = [t for t in (newest_schedule, newest_chore, user.updated_at, user.created_at) if t is not None]
+    last_modified = max(changed).replace(microsecond=0) if changed else None
+    parts = [str(user.id), str(count), str(newest_id),
+             repr(newest_schedule), repr(newest_chore), repr(user.updated_at)]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest(), last_modified
+
+def feed_events(user_id):
+    """VEVENT text per schedule on an active chore, read in chunks."""
+    rows = db.session.query(
+        ChoreSchedule.chore_id, ChoreSchedule.scheduled_at, ChoreSchedule.created_at,
+        ChoreSchedule.recurrence_freq, ChoreSchedule.recurrence_interval,
+        Chore.title, Chore.points, Chore.description
+    ).join(Chore, Chore.id == ChoreSchedule.chore_id) \
+        .filter(ChoreSchedule.user_id == user_id, Chore.is_deleted == db.false()) \
+        .order_by(ChoreSchedule.scheduled_at, ChoreSchedule.id) \
+        .execution_options(yield_per=500)
+    for row in rows:
+        yield vevent(event_uid(row.chore_id, row.scheduled_at), row.scheduled_at, chore_summary(row),
+                     chore_description(row),
+                     rrule(row.recurrence_freq, row.recurrence_interval) if row.recurrence_freq else None,
+                     stamp=row.created_at)
+
+def feed_response(body, etag, last_modified):
+    response = Response(body, mimetype=MIMETYPE)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+@calendar_bp.route('/api/users/<int:user_id>/calendar', methods=['GET'])
+@login_required
+def calendar_url(user_id):
+    """
+    Subscription URL of a user's chore calendar
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: user_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: "{url}: the feed URL including its access token"
+      404:
+        description: User not found
+    """
+    user = User.query.get_or_404(user_id)
+    return jsonify({'url': url_for('calendar.calendar_feed', user_id=user.id, token=calendar_token(user.id),
+                                   _external=True)})
+
+@calendar_bp.route('/api/users/<int:user_id>/calendar.ics', methods=['GET'])
+def calendar_feed(user_id):
+    """
+    iCalendar feed of a user's scheduled chores
+    ---
+    tags:
+      - Calendar
+    parameters:
+      - name: user_id
+        in: path
+        type: integer
+        required: true
+      - name: token
+        in: query
+        type: string
+        required: false
+        description: Feed token from /api/users/{user_id}/calendar; not needed with a login session
+    responses:
+      200:
+        description: text/calendar with one VEVENT per schedule (RRULE for recurring ones)
+      304:
+        description: Not modified since the ETag in If-None-Match or the If-Modified-Since date
+      403:
+        description: Missing or wrong token and not logged in
+      404:
+        description: User not found
+    """
+    token = request.args.get('token', '')
+    if not (token and hmac.compare_digest(token, calendar_token(user_id))):
+        if not (current_app.config.get('LOGIN_DISABLED') or current_user.is_authenticated):
+            return jsonify({'error': 'Invalid calendar token'}), 403
+
+    user = User.query.get_or_404(user_id)
+    etag, last_modified = feed_state(user)
+    if request.if_none_match.contains(etag) or (
+            not request.if_none_match and last_modified and request.if_modified_since
+            and request.if_modified_since.replace(tzinfo=None) >= last_modified):
+        response = feed_response('', etag, last_modified)
+        response.status_code = 304
+        return response
+
+    config = current_app.config
+    backend = get_cache(config)
+    key = f'cc:calendar:{user.id}:{etag}'
+    if backend is not None:
+        try:
+            body = backend.get(key)
+        except (OSError, CacheError) as e:
+            current_app.logger.warning("Cache calendar unavailable: %s", e)
+            stats.incr('calendar', 'errors')
+            backend = body = None
+        if body is not None:
+            stats.incr('calendar', 'hits')
+            return feed_response(body, etag, last_modified)
+        stats.incr('calendar', 'misses')
+
+    name = f"{user.username}'s chores"
+
+    def generate():
+        # Stream while building; keep the whole body only if it is small enough to cache
+        chunks, size, limit = [], 0, config['CALENDAR_CACHE_MAX_BYTES']
+        for chunk in write_calendar(feed_events(user_id), name):
+            data = chunk.encode('utf-8')
+            if chunks is not None:
+                size += len(data)
+                if size <= limit:
+                    chunks.append(data)
+                else:
+                    chunks = None
+            yield data
+        if backend is not None and chunks is not None:
+            try:
+                backend.set(key, b''.join(chunks), config['CALENDAR_CACHE_TTL'])
+                stats.incr('calendar', 'recomputes')
+            except (OSError, CacheError) as e:
+                current_app.logger.warning("Cache calendar unavailable: %s", e)
+                stats.incr('calendar', 'errors')
+
+    return feed_response(stream_with_context(generate()), etag, last_modified)
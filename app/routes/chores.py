@@ -1,19 +1,36 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request
 from flask_login import login_required
-from app.models import Chore, User, ChoreLog, ChoreSchedule
+from app.models import (Chore, ChoreArchive, User, ChoreLog, ChoreSchedule, ChoreUnavailable, DataVersion,
+                        ScheduleOccurrence, emit_schedule_added)
+from app.events import emit
 from app.extensions import db
-from datetime import datetime
-from ics import Calendar, Event
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import smtplib
+from datetime import datetime, timezone
+from app.mail import build_invite_ics, invite_content
+from app.outbox import enqueue
+from app.conditional import conditional
+from app.sync import changed_after, encode_token
+from app.recurrence import ensure_expanded, expand_schedules, expansion_target, horizon
 
 chores_bp = Blueprint('chores', __name__)
 
+MAX_BATCH_COMPLETIONS = 500
+
+def due_clock():
+    """
+    Latest due date and schedule occurrence already passed. The board's
+    overdue flags and upcoming schedules change whenever either of these moves.
+    """
+    now = datetime.utcnow()
+    return tuple(db.session.execute(db.select(
+        db.select(db.func.max(Chore.next_due_at))
+        .where(Chore.is_deleted == db.false(), Chore.next_due_at <= now).scalar_subquery(),
+        db.select(db.func.max(ScheduleOccurrence.starts_at))
+        .where(ScheduleOccurrence.starts_at <= now).scalar_subquery()
+    )).one())
+
 @chores_bp.route('/api/chores', methods=['GET', 'POST'])
 @login_required
+@conditional('chores', 'users', 'schedules', clock=due_clock)
 def handle_chores():
     """
     Manage chores
@@ -40,13 +57,36 @@ def handle_chores():
               type: integer
             is_recurring:
               type: boolean
+            recurrence_days:
+              type: integer
+      - name: overdue
+        in: query
+        type: boolean
+        required: false
+        description: Only return recurring chores whose next due date has passed
+      - name: sort
+        in: query
+        type: string
+        enum: [created, due]
+        required: false
+        description: Order by creation date (default) or by next due date
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: >
+          Sync token from a previous response. Returns {chores, deleted, sync_token} with only the
+          chores changed and the ids deleted since then; empty for a full snapshot in that shape.
+          overdue and sort are ignored in this mode.
     responses:
       200:
         description: List of active chores
+      304:
+        description: Not modified since the ETag in If-None-Match
       201:
         description: Chore created
       400:
-        description: Missing required fields
+        description: Missing required fields or invalid recurrence_days
     """
     if request.method == 'POST':
         data = request.json
@@ -55,20 +95,75 @@ def handle_chores():
         
         if not title or not points:
             return jsonify({'error': 'Title and points are required'}), 400
+        try:
+            recurrence_days = parse_recurrence_days(data.get('recurrence_days'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
             
         chore = Chore(
             title=title,
             description=data.get('description'),
             location=data.get('location', 'Inside'),
             points=int(points),
-            is_recurring=data.get('is_recurring', False)
+            is_recurring=data.get('is_recurring', False),
+            recurrence_days=recurrence_days
         )
+        chore.next_due_at = chore.compute_next_due()
         db.session.add(chore)
+        DataVersion.bump('chores')
+        db.session.flush()
+        created = chore.to_dict(schedules=[])
+        emit('chore.created', created)
         db.session.commit()
-        return jsonify(chore.to_dict()), 201
+        return jsonify(created), 201
+
+    # Each schedule's next occurrence must be materialized before it is listed
+    ensure_expanded()
+    if 'since' in request.args:
+        return sync_chores(request.args['since'])
 
-    chores = Chore.query.filter_by(is_deleted=False).order_by(Chore.created_at.desc()).all()
-    return jsonify([c.to_dict() for c in chores])
+    query = Chore.active()
+    if request.args.get('overdue', '').lower() in ['true', '1']:
+        query = query.filter(Chore.next_due_at <= datetime.utcnow())
+    if request.args.get('sort') == 'due':
+        query = query.order_by(Chore.next_due_at.is_(None), Chore.next_due_at)
+    else:
+        query = query.order_by(Chore.created_at.desc())
+    return jsonify(Chore.serialize_many(query.with_entities(*Chore.list_columns()).all()))
+
+def sync_chores(since):
+    now = datetime.utcnow()
+    try:
+        cutoff = changed_after(since)
+    except ValueError:
+        return jsonify({'error': 'Invalid sync token'}), 400
+
+    if cutoff is None:
+        rows = Chore.active().with_entities(*Chore.list_columns()).order_by(Chore.created_at.desc()).all()
+        changed, deleted = rows, []
+    else:
+        rows = Chore.query.with_entities(*Chore.list_columns(), Chore.is_deleted) \
+            .filter(Chore.updated_at > cutoff).order_by(Chore.updated_at).all()
+        changed = [r for r in rows if not r.is_deleted]
+        deleted = [r.id for r in rows if r.is_deleted]
+        # Tombstones for chores deleted since the token and archived since then
+        deleted += [chore_id for (chore_id,) in db.session.query(ChoreArchive.id)
+                    .filter(ChoreArchive.deleted_at > cutoff).order_by(ChoreArchive.deleted_at)]
+    return jsonify({
+        'chores': Chore.serialize_many(changed),
+        'deleted': deleted,
+        'sync_token': encode_token(now)
+    })
+
+def parse_recurrence_days(value):
+    """Positive whole days, or None for no interval; raises ValueError."""
+    if value in (None, ''):
+        return None
+    try:
+        days = int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f'recurrence_days must be a whole number of days, not {value!r}')
+    return days if days > 0 else None
 
 @chores_bp.route('/api/chores/<int:chore_id>', methods=['PUT', 'DELETE'])
 @login_required
@@ -99,9 +194,13 @@ def update_delete_chore(chore_id):
               type: integer
             is_recurring:
               type: boolean
+            recurrence_days:
+              type: integer
     responses:
       200:
         description: Chore updated/deleted
+      400:
+        description: Invalid recurrence_days
       404:
         description: Chore not found
     """
@@ -109,10 +208,17 @@ def update_delete_chore(chore_id):
     
     if request.method == 'DELETE':
         chore.is_deleted = True
+        DataVersion.bump('chores')
+        emit('chore.deleted', {'id': chore.id})
         db.session.commit()
         return jsonify({'message': 'Chore deleted'})
 
     data = request.json
+    if 'recurrence_days' in data:
+        try:
+            recurrence_days = parse_recurrence_days(data['recurrence_days'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     if 'title' in data:
         chore.title = data['title']
@@ -124,9 +230,15 @@ def update_delete_chore(chore_id):
         chore.points = int(data['points'])
     if 'is_recurring' in data:
         chore.is_recurring = data['is_recurring']
+    if 'recurrence_days' in data:
+        chore.recurrence_days = recurrence_days
+    chore.next_due_at = chore.compute_next_due()
+    DataVersion.bump('chores')
+    updated = chore.to_dict()
+    emit('chore.updated', updated)
         
     db.session.commit()
-    return jsonify(chore.to_dict())
+    return jsonify(updated)
 
 @chores_bp.route('/api/chores/<int:chore_id>/complete', methods=['POST'])
 @login_required
@@ -158,6 +270,8 @@ def complete_chore(chore_id):
         description: User ID is required
       404:
         description: Chore or User not found
+      409:
+        description: Chore was deleted or already completed
     """
     data = request.json
     user_id = data.get('user_id')
@@ -168,27 +282,117 @@ def complete_chore(chore_id):
     chore = Chore.query.get_or_404(chore_id)
     user = User.query.get_or_404(user_id)
     
-    # Create log
-    log = ChoreLog(
-        chore_id=chore.id,
-        user_id=user.id,
-        points_earned=chore.points
-    )
-    
-    # Update user points
-    user.total_points += chore.points
-    
-    # Handle non-recurring chores
-    if not chore.is_recurring:
-        chore.is_deleted = True
-        
-    db.session.add(log)
+    # Log, points, due dates and the daily rollup all commit together
+    try:
+        ChoreLog.record(chore, user.id, datetime.utcnow())
+    except ChoreUnavailable as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 409
+    user_total = db.session.query(User.total_points).filter_by(id=user.id).scalar()
+    emit('user.points', {'id': user.id, 'total_points': user_total})
     db.session.commit()
     
     return jsonify({
         'message': 'Chore completed',
         'points_earned': chore.points,
-        'user_total': user.total_points
+        'user_total': user_total
+    })
+
+@chores_bp.route('/api/chores/complete-batch', methods=['POST'])
+@login_required
+def complete_chores_batch():
+    """
+    Record many chore completions in one transaction
+    ---
+    tags:
+      - Chores
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - completions
+          properties:
+            completions:
+              type: array
+              items:
+                type: object
+                required:
+                  - chore_id
+                  - user_id
+                properties:
+                  chore_id:
+                    type: integer
+                  user_id:
+                    type: integer
+                  completed_at:
+                    type: string
+                    description: ISO timestamp, not in the future; defaults to now
+    responses:
+      200:
+        description: Per-entry results and updated user totals
+      400:
+        description: Missing or oversized completions list
+    """
+    data = request.json or {}
+    completions = data.get('completions')
+    if not isinstance(completions, list) or not completions:
+        return jsonify({'error': 'completions must be a non-empty list'}), 400
+    if len(completions) > MAX_BATCH_COMPLETIONS:
+        return jsonify({'error': f'At most {MAX_BATCH_COMPLETIONS} completions per request'}), 400
+
+    now = datetime.utcnow()
+    parsed = []
+    results = []
+    for index, entry in enumerate(completions):
+        try:
+            completed_at = now
+            if entry.get('completed_at'):
+                stamp = entry['completed_at']
+                completed_at = datetime.fromisoformat(stamp[:-1] if stamp.endswith('Z') else stamp)
+                if completed_at.tzinfo is not None:
+                    # Logs are stored as naive UTC
+                    completed_at = completed_at.astimezone(timezone.utc).replace(tzinfo=None)
+                if completed_at > now:
+                    raise ValueError('completed_at is in the future')
+            parsed.append((index, int(entry['chore_id']), int(entry['user_id']), completed_at))
+            results.append(None)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            results.append({'index': index, 'status': 'error', 'error': f'Invalid entry: {e}'})
+
+    chore_ids = {p[1] for p in parsed}
+    user_ids = {p[2] for p in parsed}
+    chores = {c.id: c for c in Chore.query.filter(Chore.id.in_(chore_ids))} if chore_ids else {}
+    known_users = {u for (u,) in db.session.query(User.id).filter(User.id.in_(user_ids))} if user_ids else set()
+
+    recorded = 0
+    for index, chore_id, user_id, completed_at in parsed:
+        chore = chores.get(chore_id)
+        if not chore or user_id not in known_users:
+            results[index] = {'index': index, 'status': 'error',
+                              'error': 'Chore not found' if not chore else 'User not found'}
+            continue
+        try:
+            # A failed claim changes nothing, so the rest of the batch can proceed
+            ChoreLog.record(chore, user_id, completed_at)
+        except ChoreUnavailable as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+        results[index] = {'index': index, 'status': 'completed', 'points_earned': chore.points}
+        recorded += 1
+
+    totals = dict(db.session.query(User.id, User.total_points).filter(User.id.in_(known_users))) if known_users else {}
+    credited = {user_id for index, _, user_id, _ in parsed if results[index]['status'] == 'completed'}
+    for user_id in sorted(credited):
+        emit('user.points', {'id': user_id, 'total_points': totals[user_id]})
+    db.session.commit()
+    return jsonify({
+        'results': results,
+        'completed': recorded,
+        'failed': len(completions) - recorded,
+        'user_totals': {str(k): v for k, v in totals.items()}
     })
 
 @chores_bp.route('/api/chores/<int:chore_id>', methods=['DELETE'])
@@ -211,6 +415,8 @@ def delete_chore(chore_id):
     """
     chore = Chore.query.get_or_404(chore_id)
     chore.is_deleted = True
+    DataVersion.bump('chores')
+    emit('chore.deleted', {'id': chore.id})
     db.session.commit()
     return jsonify({'message': 'Chore deleted'})
 
@@ -237,15 +443,16 @@ def send_calendar_invite(chore_id):
               type: integer
             datetime:
               type: string
+            recurrence:
+              type: string
+              enum: [weekly, biweekly, monthly]
     responses:
-      200:
-        description: Invite sent successfully
+      202:
+        description: Invite queued for delivery; poll /api/mail/jobs/{job_id} for status
       400:
         description: User ID or Datetime missing
       404:
         description: User or Chore not found
-      500:
-        description: Failed to send email
     """
     data = request.json
     user_id = data.get('user_id')
@@ -257,144 +464,41 @@ def send_calendar_invite(chore_id):
     if not dt_str:
         return jsonify({'error': 'Datetime is required'}), 400
         
-    try:
-        chore = Chore.query.get_or_404(chore_id)
-        user = User.query.get_or_404(user_id)
-        
-        if not user.email:
-            return jsonify({'error': 'User does not have an email address set up.'}), 400
-            
-        print(f"Preparing invite for {user.email} concerning {chore.title} at {dt_str}")
-        
-        # Create Calendar Event
-        c = Calendar()
-        e = Event()
-        e.name = f"Chore: {chore.title}"
-        e.begin = dt_str
-        e.description = f"Complete chore: {chore.title}. Points: {chore.points}"
-        if chore.description:
-            e.description += f"\n\nDescription: {chore.description}"
-        c.events.add(e)
-        
-        # Save Schedule to DB
-        try:
-            dt_parse = dt_str
-            if dt_parse.endswith('Z'):
-                dt_parse = dt_parse[:-1]
-            scheduled_dt = datetime.fromisoformat(dt_parse)
-            
-            schedule = ChoreSchedule(
-                chore_id=chore.id,
-                user_id=user.id,
-                scheduled_at=scheduled_dt
-            )
-            db.session.add(schedule)
-            db.session.commit()
-        except Exception as schedule_err:
-            print(f"Error saving schedule: {schedule_err}")
-        
-        ics_content = str(c)
-        
-        # Handle Recurrence
-        recurrence = data.get('recurrence')
-        if recurrence:
-            rrule = None
-            if recurrence == 'weekly':
-                rrule = 'FREQ=WEEKLY'
-            elif recurrence == 'biweekly':
-                rrule = 'FREQ=WEEKLY;INTERVAL=2'
-            elif recurrence == 'monthly':
-                rrule = 'FREQ=MONTHLY'
-                
-            if rrule:
-                # Inject RRULE before END:VEVENT
-                ics_content = ics_content.replace('END:VEVENT', f'RRULE:{rrule}\nEND:VEVENT')
-        
-        # Create Email (Mock)
-        msg = MIMEMultipart()
-        sender = current_app.config.get('MAIL_DEFAULT_SENDER')
-        msg['From'] = sender
-        msg['To'] = user.email
-        msg['Subject'] = f"Chore Reminder: {chore.title}"
-        
-        body = f"Hello {user.username},\n\nPlease find attached a calendar invite for your chore: {chore.title}."
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Attach ICS
-        part = MIMEBase('text', 'calendar', method='REQUEST', name='invite.ics')
-        part.set_payload(ics_content)
-        encoders.encode_base64(part)
-        part.add_header('Content-Disposition', 'attachment; filename="invite.ics"')
-        msg.attach(part)
-
-        # Send Email
-        api_key = current_app.config.get('MAIL_API_KEY')
-        server_conf = current_app.config.get('MAIL_SERVER')
-        username_conf = current_app.config.get('MAIL_USERNAME')
-        password_conf = current_app.config.get('MAIL_PASSWORD')
-        port_conf = current_app.config.get('MAIL_PORT')
-        sender = current_app.config.get('MAIL_DEFAULT_SENDER')
+    chore = Chore.query.get_or_404(chore_id)
+    user = User.query.get_or_404(user_id)
+    
+    if not user.email:
+        return jsonify({'error': 'User does not have an email address set up.'}), 400
         
-        if api_key:
-            # Send using Brevo API (v3) - Works on PythonAnywhere Free Tier
-            url = "https://api.brevo.com/v3/smtp/email"
-            headers = {
-                "accept": "application/json",
-                "api-key": api_key,
-                "content-type": "application/json"
-            }
-            
-            try:
-                import requests
-                import base64
-                
-                encoded_ics = base64.b64encode(ics_content.encode('utf-8')).decode('utf-8')
-                
-                payload = {
-                    "sender": {"email": sender, "name": "Chore Chart"},
-                    "to": [{"email": user.email, "name": user.username}],
-                    "subject": f"Chore Reminder: {chore.title}",
-                    "htmlContent": f"<html><body><p>Hello {user.username},</p><p>Please find attached a calendar invite for your chore: {chore.title}.</p></body></html>",
-                    "attachment": [
-                        {
-                            "name": "invite.ics", 
-                            "content": encoded_ics
-                        }
-                    ]
-                }
-
-                response = requests.post(url, json=payload, headers=headers)
-                
-                if response.status_code in [200, 201, 202]:
-                     print(f"Sent email via API to {user.email}")
-                     return jsonify({'message': 'Calendar invite sent to ' + user.email})
-                else:
-                     print(f"API Error: {response.text}")
-                     return jsonify({'error': f'Failed to send email via API: {response.text}'}), 500
-            except Exception as api_err:
-                 print(f"API Exception: {api_err}")
-                 return jsonify({'error': f'Failed to send email via API: {str(api_err)}'}), 500
-
-        elif server_conf and username_conf and password_conf:
-             try:
-                 with smtplib.SMTP(server_conf, port_conf) as server:
-                    if current_app.config.get('MAIL_USE_TLS'):
-                        server.starttls()
-                    server.login(username_conf, password_conf)
-                    server.send_message(msg)
-                 print(f"Sent email to {user.email}")
-                 return jsonify({'message': 'Calendar invite sent to ' + user.email})
-             except Exception as smtp_err:
-                 print(f"SMTP Error: {smtp_err}")
-                 if "111" in str(smtp_err) or "Connection refused" in str(smtp_err):
-                     return jsonify({'error': 'Failed to send email: Connection refused (PythonAnywhere free tier blocks SMTP port 587). Please configure MAIL_API_KEY to use HTTP API.'}), 500
-                 return jsonify({'error': f'Failed to send email: {str(smtp_err)}'}), 500
-        else:
-            print("--- EMAIL (MOCK - MISSING CONFIG) ---")
-            print(f"To: {user.email}")
-            print(f"Subject: {msg['Subject']}")
-            return jsonify({'message': 'Calendar invite generated (but email config missing)'})
+    # Schedule and outbox row commit together; the worker sends the email
+    schedule = ChoreSchedule(chore_id=chore.id, user_id=user.id)
+    recurrence = data.get('recurrence') or None
+    try:
+        schedule.set_recurrence(recurrence)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        dt_parse = dt_str[:-1] if dt_str.endswith('Z') else dt_str
+        scheduled_dt = datetime.fromisoformat(dt_parse)
+        if scheduled_dt.tzinfo is not None:
+            # Schedules are stored as naive UTC
+            scheduled_dt = scheduled_dt.astimezone(timezone.utc).replace(tzinfo=None)
+        ics_content = build_invite_ics(chore, dt_str, recurrence)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid datetime: {e}'}), 400
         
-    except Exception as e:
-        print(f"Error sending invite: {e}")
-        return jsonify({'error': f'Failed to send invite: {str(e)}'}), 500
+    schedule.scheduled_at = scheduled_dt
+    db.session.add(schedule)
+    db.session.flush()
+    expand_schedules([schedule], expansion_target(horizon()))
+    Chore.touch([chore.id])
+    DataVersion.bump('schedules')
+    emit_schedule_added(chore.id, user, scheduled_dt, recurrence)
+    job = enqueue(recipient_email=user.email, recipient_name=user.username,
+                  ics_content=ics_content, **invite_content(user, chore))
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Calendar invite queued for ' + user.email,
+        'job_id': job.id
+    }), 202
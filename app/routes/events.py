@@ -0,0 +1,51 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from app.events import stream
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/api/events', methods=['GET'])
+@login_required
+def get_events():
+    """
+    Live board updates (Server-Sent Events)
+    ---
+    tags:
+      - Events
+    produces:
+      - text/event-stream
+    parameters:
+      - name: Last-Event-ID
+        in: header
+        type: string
+        required: false
+        description: Resume after this event id (browsers send it on reconnect)
+      - name: last_event_id
+        in: query
+        type: string
+        required: false
+        description: Same as the Last-Event-ID header, for clients that cannot set headers
+    responses:
+      200:
+        description: >
+          Event stream of chore.created, chore.updated, chore.deleted, chore.completed,
+          user.created, user.updated, user.points, schedule.added and reset events
+      503:
+        description: Too many open event streams
+    """
+    broker = current_app.extensions['events']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    after, reset = broker.resume_point(last_event_id)
+    if not broker.connect():
+        return jsonify({'error': 'Too many open event streams'}), 503
+
+    body = stream(broker, after, reset, current_app.config['EVENTS_HEARTBEAT_SECONDS'],
+                  current_app.config['EVENTS_STREAM_SECONDS'])
+    response = current_app.response_class(body, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # The server closes the response however the stream ends, even before its
+    # first chunk; a generator's finally only runs once it has started
+    response.call_on_close(broker.disconnect)
+    return response
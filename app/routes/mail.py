@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required
+from app.models import OutboundEmail
+
+mail_bp = Blueprint('mail', __name__)
+
+@mail_bp.route('/api/mail/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_mail_job(job_id):
+    """
+    Get the delivery status of a queued email
+    ---
+    tags:
+      - Mail
+    parameters:
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job status (pending, sending, sent or dead)
+      404:
+        description: Job not found
+    """
+    job = OutboundEmail.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
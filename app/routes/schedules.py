@@ -0,0 +1,238 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import login_required
+from app.models import Chore, User, ChoreSchedule, DataVersion, ScheduleOccurrence, emit_schedule_added
+from app.extensions import db
+from app.mail import RRULES, build_calendar_ics, schedule_digest_content
+from app.outbox import enqueue
+from app.conditional import conditional
+from app.recurrence import ensure_expanded, expand_schedules, expansion_target, horizon
+from datetime import datetime, timedelta, timezone
+
+schedules_bp = Blueprint('schedules', __name__)
+
+MAX_BULK_ENTRIES = 500
+
+def parse_entry(entry):
+    """Validate one entry's shape. Returns (chore_id, user_id, dt_str, scheduled_dt, recurrence)."""
+    if not isinstance(entry, dict):
+        raise ValueError('Entry must be an object')
+    chore_id = entry.get('chore_id')
+    user_id = entry.get('user_id')
+    dt_str = entry.get('datetime')
+    recurrence = entry.get('recurrence') or None
+
+    if not chore_id or not user_id:
+        raise ValueError('chore_id and user_id are required')
+    if not dt_str:
+        raise ValueError('Datetime is required')
+    if not isinstance(dt_str, str):
+        raise ValueError('Datetime must be a string')
+    if recurrence and (not isinstance(recurrence, str) or recurrence not in RRULES):
+        raise ValueError(f"recurrence must be one of {', '.join(RRULES)}")
+
+    dt_parse = dt_str[:-1] if dt_str.endswith('Z') else dt_str
+    try:
+        scheduled_dt = datetime.fromisoformat(dt_parse)
+    except ValueError:
+        raise ValueError(f'Invalid datetime: {dt_str}')
+    if scheduled_dt.tzinfo is not None:
+        # Schedules are stored as naive UTC
+        scheduled_dt = scheduled_dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return int(chore_id), int(user_id), dt_str, scheduled_dt, recurrence
+
+def parse_window(args, max_days):
+    """Validate ?from=&to=. Returns (start, end); raises ValueError."""
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if not value:
+            raise ValueError(f'{name} is required')
+        try:
+            bound = datetime.fromisoformat(value[:-1] if value.endswith('Z') else value)
+        except ValueError:
+            raise ValueError(f'Invalid {name}: {value}')
+        if bound.tzinfo is not None:
+            bound = bound.astimezone(timezone.utc).replace(tzinfo=None)
+        bounds.append(bound)
+    start, end = bounds
+    if end <= start:
+        raise ValueError('to must be after from')
+    limit = timedelta(days=max_days)
+    if end - start > limit:
+        raise ValueError(f'The window may span at most {max_days} days')
+    if end > datetime.utcnow() + limit:
+        raise ValueError(f'to may be at most {max_days} days from now')
+    return start, end
+
+@schedules_bp.route('/api/schedules', methods=['GET'])
+@login_required
+@conditional('schedules', 'chores', 'users')
+def list_schedules():
+    """
+    Schedule occurrences in a time window
+    ---
+    tags:
+      - Schedules
+    parameters:
+      - name: from
+        in: query
+        type: string
+        required: true
+        description: Window start (ISO datetime, UTC), inclusive
+      - name: to
+        in: query
+        type: string
+        required: true
+        description: Window end (ISO datetime, UTC), exclusive; at most SCHEDULE_MAX_WINDOW_DAYS after from and after now
+    responses:
+      200:
+        description: Occurrences of every schedule on an active chore, soonest first; recurring schedules appear once per occurrence
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Missing, invalid or oversized window
+    """
+    try:
+        start, end = parse_window(request.args, current_app.config['SCHEDULE_MAX_WINDOW_DAYS'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    ensure_expanded(end)
+    rows = db.session.query(
+        ScheduleOccurrence.schedule_id, ScheduleOccurrence.chore_id, ScheduleOccurrence.user_id,
+        ScheduleOccurrence.starts_at, Chore.title, User.username,
+        ChoreSchedule.recurrence_freq, ChoreSchedule.recurrence_interval
+    ).join(ChoreSchedule, ChoreSchedule.id == ScheduleOccurrence.schedule_id) \
+        .join(Chore, Chore.id == ScheduleOccurrence.chore_id) \
+        .outerjoin(User, User.id == ScheduleOccurrence.user_id) \
+        .filter(ScheduleOccurrence.starts_at >= start, ScheduleOccurrence.starts_at < end,
+                Chore.is_deleted == db.false()) \
+        .order_by(ScheduleOccurrence.starts_at, ScheduleOccurrence.id)
+
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'occurrences': [{
+            'schedule_id': row.schedule_id,
+            'chore_id': row.chore_id,
+            'chore_title': row.title,
+            'user_id': row.user_id,
+            'user_name': row.username if row.username is not None else 'Unknown',
+            'starts_at': row.starts_at.isoformat(),
+            'recurrence': ChoreSchedule.recurrence_name(row.recurrence_freq, row.recurrence_interval)
+        } for row in rows]
+    })
+
+@schedules_bp.route('/api/schedules/bulk', methods=['POST'])
+@login_required
+def bulk_schedule():
+    """
+    Schedule many chores for many users in one call
+    ---
+    tags:
+      - Schedules
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - entries
+          properties:
+            entries:
+              type: array
+              items:
+                type: object
+                properties:
+                  chore_id:
+                    type: integer
+                  user_id:
+                    type: integer
+                  datetime:
+                    type: string
+                  recurrence:
+                    type: string
+                    enum: [weekly, biweekly, monthly]
+    responses:
+      200:
+        description: Per-entry results; each recipient gets one combined calendar invite
+      400:
+        description: Missing or oversized entries list
+    """
+    data = request.json or {}
+    entries = data.get('entries')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'entries must be a non-empty list'}), 400
+    if len(entries) > MAX_BULK_ENTRIES:
+        return jsonify({'error': f'At most {MAX_BULK_ENTRIES} entries per request'}), 400
+
+    results = []
+    parsed = []
+    for index, entry in enumerate(entries):
+        try:
+            parsed.append((index, parse_entry(entry)))
+            results.append(None)
+        except (ValueError, TypeError) as e:
+            results.append({'index': index, 'status': 'error', 'error': str(e)})
+
+    # Set-based lookups: one query for all chores, one for all users
+    chore_ids = {p[0] for _, p in parsed}
+    user_ids = {p[1] for _, p in parsed}
+    chores = {c.id: c for c in Chore.active().filter(Chore.id.in_(chore_ids))} if chore_ids else {}
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
+
+    accepted = []
+    for index, (chore_id, user_id, dt_str, scheduled_dt, recurrence) in parsed:
+        chore = chores.get(chore_id)
+        user = users.get(user_id)
+        error = None
+        if not chore:
+            error = 'Chore not found'
+        elif not user:
+            error = 'User not found'
+        elif not user.email:
+            error = 'User does not have an email address set up.'
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+
+        schedule = ChoreSchedule(chore_id=chore.id, user_id=user.id, scheduled_at=scheduled_dt)
+        schedule.set_recurrence(recurrence)
+        accepted.append((index, schedule, chore, user, dt_str, recurrence))
+
+    # One transaction for every schedule row plus one outbox row per recipient
+    db.session.add_all([a[1] for a in accepted])
+    if accepted:
+        db.session.flush()
+        expand_schedules([a[1] for a in accepted], expansion_target(horizon()))
+        Chore.touch({a[2].id for a in accepted})
+        DataVersion.bump('schedules')
+    for index, schedule, chore, user, dt_str, recurrence in accepted:
+        emit_schedule_added(chore.id, user, schedule.scheduled_at, recurrence)
+    by_user = {}
+    for index, schedule, chore, user, dt_str, recurrence in accepted:
+        by_user.setdefault(user.id, []).append((index, chore, user, dt_str, recurrence))
+
+    jobs = {}
+    for user_id, items in by_user.items():
+        user = items[0][2]
+        ics_content = build_calendar_ics([(chore, dt_str, recurrence) for _, chore, _, dt_str, recurrence in items])
+        jobs[user_id] = enqueue(recipient_email=user.email, recipient_name=user.username, ics_content=ics_content,
+                                **schedule_digest_content(user, [item[1] for item in items]))
+    db.session.commit()
+
+    for index, schedule, chore, user, dt_str, recurrence in accepted:
+        results[index] = {
+            'index': index,
+            'status': 'scheduled',
+            'schedule_id': schedule.id,
+            'job_id': jobs[user.id].id
+        }
+
+    return jsonify({
+        'results': results,
+        'scheduled': len(accepted),
+        'failed': len(entries) - len(accepted),
+        'invites': [{'user_id': user_id, 'job_id': job.id} for user_id, job in jobs.items()]
+    })
@@ -1,13 +1,26 @@
 from flask import Blueprint, jsonify, request
 from flask_login import login_required
-from app.models import ChoreLog, User
+from app.models import ChoreLog, ChoreLogSummary, Chore, ChoreArchive, User, DailyUserPoints
+from app.conditional import conditional
+from app.cache import cached, stats as cache_stats
 from app.extensions import db
 from datetime import datetime, timedelta
+import base64
 
 stats_bp = Blueprint('stats', __name__)
 
+def encode_cursor(log):
+    raw = f"{log.completed_at.isoformat()},{log.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    completed_at, log_id = raw.rsplit(',', 1)
+    return datetime.fromisoformat(completed_at), int(log_id)
+
 @stats_bp.route('/api/stats/history', methods=['GET'])
 @login_required
+@conditional('chores', 'users')
 def get_stats_history():
     """
     Get paginated activity history
@@ -19,21 +32,46 @@ def get_stats_history():
         in: query
         type: integer
         default: 1
+        description: Offset pagination (legacy). Ignored when after/before is given.
       - name: per_page
         in: query
         type: integer
         default: 10
+      - name: after
+        in: query
+        type: string
+        description: Cursor pagination. Return entries older than this cursor; pass it empty for the first page.
+      - name: before
+        in: query
+        type: string
+        description: Cursor pagination. Return entries newer than this cursor.
+      - name: include_total
+        in: query
+        type: boolean
+        default: false
+        description: Include the total entry count in cursor mode (read from the daily rollup)
     responses:
       200:
         description: List of activity logs with pagination info
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid cursor
     """
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+    query = ChoreLog.list_query()
+
+    if 'after' in request.args or 'before' in request.args:
+        return cursor_page(query, per_page)
 
-    pagination = ChoreLog.query.order_by(ChoreLog.completed_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    page = request.args.get('page', 1, type=int)
+    pagination = query.order_by(ChoreLog.completed_at.desc(), ChoreLog.id.desc()) \
+        .paginate(page=page, per_page=per_page, error_out=False, count=False)
+    # Count chore_log alone; counting the joined projection cannot use a covering index
+    pagination.total = db.session.query(db.func.count(ChoreLog.id)).scalar()
     
     return jsonify({
-        'logs': [l.to_dict() for l in pagination.items],
+        'logs': [ChoreLog.row_to_dict(l) for l in pagination.items],
         'total': pagination.total,
         'pages': pagination.pages,
         'page': page,
@@ -42,36 +80,194 @@ def get_stats_history():
         'has_prev': pagination.has_prev
     })
 
+def cursor_page(query, per_page):
+    """Keyset pagination over (completed_at, id), newest first."""
+    before = request.args.get('before')
+    cursor = before or request.args.get('after')
+    key = db.tuple_(ChoreLog.completed_at, ChoreLog.id)
+
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(key > position if before else key < position)
+
+    if before:
+        # Walk forwards from the cursor, then flip back to newest-first
+        logs = query.order_by(ChoreLog.completed_at, ChoreLog.id).limit(per_page + 1).all()
+        has_prev = len(logs) > per_page
+        logs = list(reversed(logs[:per_page]))
+        has_next = True
+    else:
+        logs = query.order_by(ChoreLog.completed_at.desc(), ChoreLog.id.desc()).limit(per_page + 1).all()
+        has_next = len(logs) > per_page
+        logs = logs[:per_page]
+        has_prev = bool(cursor)
+
+    data = {
+        'logs': [ChoreLog.row_to_dict(l) for l in logs],
+        'per_page': per_page,
+        'has_next': has_next and bool(logs),
+        'has_prev': has_prev and bool(logs),
+        'next_cursor': encode_cursor(logs[-1]) if has_next and logs else None,
+        'prev_cursor': encode_cursor(logs[0]) if has_prev and logs else None
+    }
+    compacted_before = ChoreLogSummary.compacted_before()
+    # Where /api/stats/history/summary takes over once the individual entries run out
+    data['summarized_before'] = compacted_before.strftime('%Y-%m') if compacted_before else None
+    if request.args.get('include_total', '').lower() in ['true', '1']:
+        data['total'] = history_total(compacted_before)
+    return jsonify(data)
+
+def history_total(compacted_before):
+    """Entries still in chore_log, counted from the daily rollup."""
+    if compacted_before is None:
+        return db.session.query(db.func.coalesce(db.func.sum(DailyUserPoints.count), 0)).scalar()
+    # The rollup also counts compacted days; a partly compacted month is counted from chore_log
+    boundary = datetime.combine(compacted_before, datetime.min.time())
+    recent = db.session.query(db.func.coalesce(db.func.sum(DailyUserPoints.count), 0)) \
+        .filter(DailyUserPoints.date >= compacted_before).scalar()
+    older = db.session.query(db.func.count(ChoreLog.id)).filter(ChoreLog.completed_at < boundary).scalar()
+    return recent + older
+
+MAX_SUMMARY_MONTHS = 12
+
+@stats_bp.route('/api/stats/history/summary', methods=['GET'])
+@login_required
+@conditional('chores', 'users')
+def get_history_summary():
+    """
+    Get compacted activity history, one entry per user and chore per month
+    ---
+    tags:
+      - Stats
+    parameters:
+      - name: before
+        in: query
+        type: string
+        description: Only months before this one (YYYY-MM); use summarized_before from /api/stats/history
+      - name: months
+        in: query
+        type: integer
+        default: 3
+        description: Months per page (max 12)
+    responses:
+      200:
+        description: Summarized months, newest first, and the cursor for the next page
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid month
+    """
+    months = min(max(request.args.get('months', 3, type=int), 1), MAX_SUMMARY_MONTHS)
+    query = db.session.query(ChoreLogSummary.month).distinct()
+    if request.args.get('before'):
+        try:
+            before = datetime.strptime(request.args['before'], '%Y-%m').date()
+        except ValueError:
+            return jsonify({'error': 'before must be YYYY-MM'}), 400
+        query = query.filter(ChoreLogSummary.month < before)
+    selected = [m for (m,) in query.order_by(ChoreLogSummary.month.desc()).limit(months + 1)]
+    has_next = len(selected) > months
+    selected = selected[:months]
+
+    rows = db.session.query(
+        ChoreLogSummary.month, ChoreLogSummary.user_id, ChoreLogSummary.chore_id,
+        ChoreLogSummary.points, ChoreLogSummary.count, User.username,
+        db.func.coalesce(Chore.title, ChoreArchive.title).label('chore_title')
+    ).outerjoin(User, User.id == ChoreLogSummary.user_id) \
+        .outerjoin(Chore, Chore.id == ChoreLogSummary.chore_id) \
+        .outerjoin(ChoreArchive, ChoreArchive.id == ChoreLogSummary.chore_id) \
+        .filter(ChoreLogSummary.month.in_(selected)) \
+        .order_by(ChoreLogSummary.month.desc(), ChoreLogSummary.points.desc()).all() if selected else []
+
+    by_month = {m: {'month': m.strftime('%Y-%m'), 'points': 0, 'count': 0, 'entries': []} for m in selected}
+    for row in rows:
+        month = by_month[row.month]
+        month['points'] += row.points
+        month['count'] += row.count
+        month['entries'].append({
+            'user_id': row.user_id,
+            'username': row.username if row.username is not None else 'Unknown',
+            'chore_id': row.chore_id,
+            'chore_title': row.chore_title if row.chore_title is not None else 'Unknown',
+            'points_earned': row.points,
+            'count': row.count
+        })
+
+    return jsonify({
+        'months': [by_month[m] for m in selected],
+        'next_before': selected[-1].strftime('%Y-%m') if has_next else None
+    })
+
+CHART_BUCKETS = ('day', 'week', 'month')
+MAX_CHART_DAYS = 365
+
+def bucket_key(day, bucket):
+    if bucket == 'week':
+        # Weeks start on Monday
+        return (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+    if bucket == 'month':
+        return day.strftime('%Y-%m')
+    return day.strftime('%Y-%m-%d')
+
+def utc_today():
+    return datetime.utcnow().date()
+
 @stats_bp.route('/api/stats/charts', methods=['GET'])
 @login_required
+@conditional('users', clock=utc_today)
+@cached('charts')
 def get_chart_data():
     """
     Get data for charts
     ---
     tags:
       - Stats
+    parameters:
+      - name: days
+        in: query
+        type: integer
+        default: 7
+        description: Length of the timeline window in days (max 365)
+      - name: bucket
+        in: query
+        type: string
+        enum: [day, week, month]
+        default: day
     responses:
       200:
         description: Objects containing data for distribution and timeline charts
+      304:
+        description: Not modified since the ETag in If-None-Match
+      400:
+        description: Invalid bucket
     """
+    days = min(max(request.args.get('days', 7, type=int), 1), MAX_CHART_DAYS)
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in CHART_BUCKETS:
+        return jsonify({'error': f"bucket must be one of {', '.join(CHART_BUCKETS)}"}), 400
+
     # 1. Points Distribution (Total points per user)
-    users = User.query.all()
-    distribution = {u.username: u.total_points for u in users if u.total_points > 0}
+    users = User.query.filter(User.total_points > 0).all()
+    distribution = {u.username: u.total_points for u in users}
     
-    # 2. Activity / Momentum (Last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    logs = ChoreLog.query.filter(ChoreLog.completed_at >= seven_days_ago).all()
+    # 2. Activity / Momentum, read from the daily rollup rather than ChoreLog
+    start = utc_today() - timedelta(days=days - 1)
+    rows = db.session.query(DailyUserPoints.date, User.username, DailyUserPoints.points) \
+        .join(User, User.id == DailyUserPoints.user_id) \
+        .filter(DailyUserPoints.date >= start) \
+        .all()
     
-    # Organize by date -> user -> points
+    # Organize by bucket -> user -> points
     timeline = {} # "YYYY-MM-DD": {"UserA": 10, "UserB": 20}
     
-    for log in logs:
-        date_str = log.completed_at.strftime('%Y-%m-%d')
-        if date_str not in timeline:
-            timeline[date_str] = {}
-        
-        user_name = log.user.username
-        timeline[date_str][user_name] = timeline[date_str].get(user_name, 0) + log.points_earned
+    for day, user_name, points in rows:
+        key = bucket_key(day, bucket)
+        if key not in timeline:
+            timeline[key] = {}
+        timeline[key][user_name] = timeline[key].get(user_name, 0) + points
 
     # Sort timeline
     sorted_dates = sorted(timeline.keys())
@@ -80,6 +276,22 @@ def get_chart_data():
         'distribution': distribution,
         'timeline': {
             'dates': sorted_dates,
-            'data': timeline
+            'data': timeline,
+            'days': days,
+            'bucket': bucket
         }
     })
+
+@stats_bp.route('/api/stats/cache', methods=['GET'])
+@login_required
+def get_cache_stats():
+    """
+    Response cache hit/miss counters for this process
+    ---
+    tags:
+      - Stats
+    responses:
+      200:
+        description: Counters per cached endpoint (hits, misses, waits, recomputes, errors)
+    """
+    return jsonify(cache_stats.snapshot())
@@ -1,14 +1,26 @@
 from flask import Blueprint, jsonify, request, url_for
 from flask_login import login_required
-from app.models import User
+from app.models import User, Chore, DataVersion, ScheduleOccurrence
+from app.conditional import conditional
+from app.sync import changed_after, encode_token
+from app.cache import cached
 from app.extensions import db
+from app.events import emit
 from werkzeug.utils import secure_filename
+from datetime import datetime
 import os
 
 users_bp = Blueprint('users', __name__)
 
+def touch_scheduled_chores(user_id):
+    """Chores carry their upcoming schedules' user name and avatar, so mark them changed."""
+    Chore.touch([chore_id for (chore_id,) in db.session.query(ScheduleOccurrence.chore_id).distinct().filter(
+        ScheduleOccurrence.user_id == user_id, ScheduleOccurrence.starts_at > datetime.utcnow())])
+
 @users_bp.route('/api/users', methods=['GET', 'POST'])
 @login_required
+@conditional('users')
+@cached('leaderboard')
 def handle_users():
     """
     Manage users
@@ -27,6 +39,8 @@ def handle_users():
     responses:
       200:
         description: List of users
+      304:
+        description: Not modified since the ETag in If-None-Match
       201:
         description: User created
       400:
@@ -42,14 +56,35 @@ def handle_users():
         
         user = User(username=username)
         db.session.add(user)
+        DataVersion.bump('users')
+        db.session.flush()
+        created = user.to_dict()
+        emit('user.created', created)
         db.session.commit()
-        return jsonify(user.to_dict()), 201
+        return jsonify(created), 201
+
+    if 'since' in request.args:
+        return sync_users(request.args['since'])
     
-    users = User.query.order_by(User.total_points.desc()).all()
-    return jsonify([u.to_dict() for u in users])
+    users = User.query.with_entities(*User.list_columns()).order_by(User.total_points.desc()).all()
+    return jsonify([User.row_to_dict(u) for u in users])
+
+def sync_users(since):
+    now = datetime.utcnow()
+    try:
+        cutoff = changed_after(since)
+    except ValueError:
+        return jsonify({'error': 'Invalid sync token'}), 400
+
+    query = User.query.with_entities(*User.list_columns())
+    if cutoff is not None:
+        query = query.filter(User.updated_at > cutoff)
+    users = query.order_by(User.total_points.desc()).all()
+    return jsonify({'users': [User.row_to_dict(u) for u in users], 'sync_token': encode_token(now)})
 
 @users_bp.route('/api/users/<int:user_id>', methods=['GET'])
 @login_required
+@conditional('users')
 def get_user(user_id):
     """
     Get user details
@@ -64,6 +99,8 @@ def get_user(user_id):
     responses:
       200:
         description: User details
+      304:
+        description: Not modified since the ETag in If-None-Match
       404:
         description: User not found
     """
@@ -114,9 +151,13 @@ def update_user(user_id):
         user.pronouns = data['pronouns']
     if 'email' in data:
         user.email = data['email']
+    touch_scheduled_chores(user.id)
+    DataVersion.bump('users')
+    updated = user.to_dict()
+    emit('user.updated', updated)
         
     db.session.commit()
-    return jsonify(user.to_dict())
+    return jsonify(updated)
 
 @users_bp.route('/api/users/<int:user_id>/upload-picture', methods=['POST'])
 @login_required
@@ -155,7 +196,11 @@ def upload_profile_picture(user_id):
         filename = secure_filename(f"user_{user_id}_{file.filename}")
         # Assuming app.config['UPLOAD_FOLDER'] is globally available or we need to access via current_app
         from flask import current_app
+        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
         file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
         user.profile_picture = url_for('static', filename=f'uploads/{filename}')
+        touch_scheduled_chores(user.id)
+        DataVersion.bump('users')
+        emit('user.updated', user.to_dict())
         db.session.commit()
         return jsonify({'message': 'File uploaded', 'url': user.profile_picture})
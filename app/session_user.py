@@ -0,0 +1,143 @@
+"""The logged-in user, without a database query on every request.
+
+flask-login calls load_user() on each authenticated request, and the
+dashboard makes many API calls on load. Those calls only need the user's
+identity. load_user() therefore returns a SessionUser: a small
+__slots__ object holding a few columns, not attached to the session. It
+is kept in a per-process TTL cache.
+
+Changes to a User through the ORM, such as the profile endpoints or a
+deletion, drop its entry when the session commits. Another worker process
+serves its own copy for at most SESSION_USER_CACHE_TTL seconds.
+Code that needs the full row loads it with User.query.get(current_user.id).
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class SessionUser:
+    """What flask-login needs from a user, plus the columns templates show."""
+
+    COLUMNS = ('id', 'username', 'first_name', 'last_name', 'email', 'profile_picture')
+    __slots__ = COLUMNS
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, row):
+        for name in self.COLUMNS:
+            setattr(self, name, getattr(row, name))
+
+    def get_id(self):
+        return str(self.id)
+
+    def __eq__(self, other):
+        return hasattr(other, 'get_id') and self.get_id() == other.get_id()
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<SessionUser {self.id} {self.username}>'
+
+
+class SessionUserCache:
+    """Thread-safe LRU of SessionUser by id with a TTL."""
+
+    def __init__(self, ttl=60.0, max_entries=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # user_id -> (expires_at, SessionUser)
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """Cached user for `user_id`, calling load(user_id) on a miss."""
+        if self.ttl <= 0:
+            return load(user_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+            generation = self._generation
+        user = load(user_id)
+        with self._lock:
+            # Unknown ids are not cached, and neither is a row read while an
+            # invalidation went past: it may predate the change
+            if user is None or generation != self._generation:
+                return user
+            self._entries[user_id] = (now + self.ttl, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def query_session_user(user_id):
+    from app.extensions import db
+    from app.models import User
+
+    row = db.session.query(*[getattr(User, name) for name in SessionUser.COLUMNS]) \
+        .filter(User.id == user_id).first()
+    return SessionUser(row) if row is not None else None
+
+
+def init_session_users(app):
+    app.extensions['session_users'] = SessionUserCache(app.config['SESSION_USER_CACHE_TTL'],
+                                                       app.config['SESSION_USER_CACHE_SIZE'])
+
+
+def load_session_user(user_id):
+    return current_app.extensions['session_users'].get(user_id, query_session_user)
+
+
+def _invalidate(user_ids):
+    if not has_app_context():
+        return
+    cache = current_app.extensions.get('session_users')
+    if cache is not None:
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+
+def _note_changed_user(mapper, connection, target):
+    # Dropped now, and again after commit so a request that refilled the entry
+    # from the pre-commit row in the meantime does not keep it
+    _invalidate([target.id])
+    Session.object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+def _after_commit(session):
+    _invalidate(session.info.pop('changed_user_ids', ()))
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('changed_user_ids', None)
+
+
+def register_invalidation(user_model):
+    event.listen(user_model, 'after_update', _note_changed_user)
+    event.listen(user_model, 'after_delete', _note_changed_user)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_soft_rollback', _after_rollback)
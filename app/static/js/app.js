@@ -4,14 +4,108 @@ let chores = [];
 let activeUser = null;
 let weatherCache = null;
 let weatherCacheTimestamp = 0;
+let liveEvents = null;
 
 // Initialization
 document.addEventListener('DOMContentLoaded', () => {
+    // Subscribe before the first fetch so no change falls between the two
+    connectLiveEvents();
     fetchUsers();
     fetchChores();
     fetchWeather(true);
 });
 
+// -- Live updates --
+
+// True while /api/events is connected; our own writes then come back as events
+function isLive() {
+    return liveEvents !== null && liveEvents.readyState === EventSource.OPEN;
+}
+
+// Refetch only when live updates are unavailable
+function refreshIfNotLive(...fetchers) {
+    if (!isLive()) fetchers.forEach(fetcher => fetcher());
+}
+
+function connectLiveEvents() {
+    if (!window.EventSource) return;
+
+    // The browser reconnects on its own and sends Last-Event-ID to resume
+    liveEvents = new EventSource('/api/events');
+    const handlers = {
+        'chore.created': upsertChore,
+        'chore.updated': upsertChore,
+        'chore.deleted': data => removeChore(data.id),
+        'chore.completed': applyCompletion,
+        'user.created': upsertUser,
+        'user.updated': upsertUser,
+        'user.points': data => upsertUser({ id: data.id, total_points: data.total_points }),
+        'schedule.added': addSchedule,
+        // Missed events (server restart or a long disconnect): start over
+        'reset': () => { fetchUsers(); fetchChores(); }
+    };
+    Object.entries(handlers).forEach(([type, handler]) => {
+        liveEvents.addEventListener(type, e => handler(JSON.parse(e.data)));
+    });
+}
+
+function upsertChore(chore) {
+    const index = chores.findIndex(c => c.id === chore.id);
+    if (index >= 0) {
+        chores[index] = chore;
+    } else {
+        chores.unshift(chore);
+    }
+    renderChores();
+}
+
+function removeChore(choreId) {
+    chores = chores.filter(c => c.id !== choreId);
+    renderChores();
+}
+
+function applyCompletion(data) {
+    if (data.is_deleted) {
+        removeChore(data.chore_id);
+        return;
+    }
+    const chore = chores.find(c => c.id === data.chore_id);
+    if (!chore || !('last_completed_at' in data)) return;
+
+    chore.last_completed_at = data.last_completed_at;
+    if (data.next_due_at) {
+        chore.next_due_at = data.next_due_at;
+        chore.is_overdue = new Date(data.next_due_at + 'Z') <= new Date();
+    } else {
+        delete chore.next_due_at;
+        delete chore.is_overdue;
+    }
+    renderChores();
+}
+
+function upsertUser(change) {
+    const user = users.find(u => u.id === change.id);
+    if (user) {
+        Object.assign(user, change);
+    } else if (change.username) {
+        users.push(change);
+    } else {
+        return;
+    }
+    renderUserSelect();
+    renderLeaderboard();
+}
+
+function addSchedule(data) {
+    const chore = chores.find(c => c.id === data.chore_id);
+    if (!chore) return;
+
+    const { chore_id, ...schedule } = data;
+    chore.schedules = [...(chore.schedules || []), schedule]
+        .sort((a, b) => a.scheduled_at.localeCompare(b.scheduled_at));
+    renderChores();
+}
+
 // -- API Interaction --
 
 async function fetchUsers() {
@@ -49,7 +143,7 @@ async function handleAddUser(e) {
         if (res.ok) {
             closeModal('userModal');
             document.getElementById('newUsername').value = '';
-            fetchUsers();
+            refreshIfNotLive(fetchUsers);
         } else {
             showToast('Failed to create user', 'error');
         }
@@ -66,6 +160,7 @@ async function handleSaveChore(e) {
     const location = document.getElementById('choreLocation').value;
     const points = document.getElementById('chorePoints').value;
     const is_recurring = document.getElementById('choreRecurring').checked;
+    const recurrence_days = document.getElementById('choreRecurrenceDays').value || null;
 
     const url = id ? `/api/chores/${id}` : '/api/chores';
     const method = id ? 'PUT' : 'POST';
@@ -74,12 +169,12 @@ async function handleSaveChore(e) {
         const res = await fetch(url, {
             method: method,
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ title, description, location, points, is_recurring })
+            body: JSON.stringify({ title, description, location, points, is_recurring, recurrence_days })
         });
 
         if (res.ok) {
             closeModal('choreModal');
-            fetchChores();
+            refreshIfNotLive(fetchChores);
         } else {
             showToast('Failed to save chore', 'error');
         }
@@ -108,9 +203,8 @@ async function completeChore(choreId, points) {
 
         if (res.ok) {
             showToast(`Chore completed! ${activeUser.username} earned ${data.points_earned} points.`, 'success');
-            // Refresh data
-            await fetchUsers();
-            await fetchChores();
+            // Live clients get the new points and due dates as events
+            refreshIfNotLive(fetchUsers, fetchChores);
         }
     } catch (err) {
         console.error(err);
@@ -126,7 +220,7 @@ async function deleteChore(choreId) {
         });
 
         if (res.ok) {
-            fetchChores();
+            refreshIfNotLive(fetchChores);
         }
     } catch (err) {
         console.error(err);
@@ -207,7 +301,7 @@ function renderChores() {
                         <img src="${s.user_avatar || 'https://api.dicebear.com/9.x/avataaars/svg?seed=' + s.user_name}" alt="${s.user_name}" class="scheduled-avatar">
                         <div class="avatar-tooltip">
                             ${s.user_name}<br>
-                            ${new Date(s.scheduled_at.endsWith('Z') ? s.scheduled_at : s.scheduled_at + 'Z').toLocaleString([], { month: 'numeric', day: 'numeric', hour: 'numeric', minute: '2-digit' })}
+                            ${new Date(s.scheduled_at.endsWith('Z') ? s.scheduled_at : s.scheduled_at + 'Z').toLocaleString([], { month: 'numeric', day: 'numeric', hour: 'numeric', minute: '2-digit' })}${s.recurrence ? ` (${s.recurrence})` : ''}
                         </div>
                     </div>
                 `).join('')}
@@ -229,6 +323,7 @@ function renderChores() {
                     <div style="font-size: 0.8rem; color: var(--secondary); margin-bottom: 1rem;">
                         <span style="display:inline-block; transform: rotate(45deg); margin-right:4px;">↻</span> Recurring
                         ${c.last_completed_at ? `<span style="color: var(--text-muted);"> • Last done: ${new Date(c.last_completed_at).toLocaleDateString()}</span>` : ''}
+                        ${c.next_due_at ? `<span style="color: ${c.is_overdue ? 'var(--danger)' : 'var(--text-muted)'};"> • ${c.is_overdue ? 'Overdue since' : 'Due'}: ${new Date(c.next_due_at).toLocaleDateString()}</span>` : ''}
                         <span style="color: var(--text-muted); padding-left: 5px; border-left: 1px solid var(--border); margin-left: 5px;"> ${c.location || 'Inside'}</span>
                     </div>`
                 : `
@@ -279,6 +374,7 @@ function openChoreModal(choreId = null) {
     const locationInput = document.getElementById('choreLocation');
     const pointsInput = document.getElementById('chorePoints');
     const recurringInput = document.getElementById('choreRecurring');
+    const recurrenceDaysInput = document.getElementById('choreRecurrenceDays');
 
     if (choreId) {
         const chore = chores.find(c => c.id === choreId);
@@ -291,6 +387,7 @@ function openChoreModal(choreId = null) {
         locationInput.value = chore.location || 'Inside';
         pointsInput.value = chore.points;
         recurringInput.checked = chore.is_recurring;
+        recurrenceDaysInput.value = chore.recurrence_days || '';
     } else {
         titleEl.textContent = 'Create New Chore';
         idInput.value = '';
@@ -299,6 +396,7 @@ function openChoreModal(choreId = null) {
         locationInput.value = 'Inside';
         pointsInput.value = '10';
         recurringInput.checked = false;
+        recurrenceDaysInput.value = '';
     }
 
     openModal('choreModal');
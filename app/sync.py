@@ -0,0 +1,41 @@
+"""Incremental sync for the list endpoints.
+
+`GET /api/chores?since=<token>` and `GET /api/users?since=<token>` return
+only the rows whose updated_at moved after the token, plus a new token to
+send next time. Soft-deleted chores come back as tombstone ids. An empty
+`since=` returns a full snapshot in the same shape, which is how a client
+gets its first token.
+
+A token is the server's clock read *before* the query runs, so anything
+committed after that read is picked up by the next sync. A transaction
+that stamped updated_at before the read but committed after the query
+would be missed by a strict comparison, so the lookup reaches back
+SYNC_SAFETY_SECONDS further. Rows in that window may be sent twice;
+clients apply changes by id, so a repeat is harmless.
+"""
+from datetime import datetime, timedelta
+import base64
+
+from flask import current_app
+
+
+def encode_token(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode('utf-8')).decode('ascii')
+
+
+def decode_token(token):
+    """The datetime in a sync token. Raises ValueError for anything malformed."""
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    except (UnicodeError, TypeError, base64.binascii.Error) as e:
+        raise ValueError(str(e))
+
+
+def changed_after(token):
+    """
+    The updated_at cutoff for a `since` token, or None for a full snapshot.
+    Raises ValueError for a malformed token.
+    """
+    if not token:
+        return None
+    return decode_token(token) - timedelta(seconds=current_app.config['SYNC_SAFETY_SECONDS'])
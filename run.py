@@ -1,4 +1,20 @@
-from app import app
+import os
+from app import create_app
+from app.outbox import OutboxWorker
+from app.reminders import ReminderScheduler
+
+app = create_app()
 
 if __name__ == '__main__':
+    # With the reloader the app runs in a child process; start the worker only there
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from app.migrations import init_db
+
+        # The dev server keeps its schema current; deployments run `flask --app run init-db`
+        with app.app_context():
+            init_db()
+        if app.config['MAIL_WORKER_IN_PROCESS']:
+            OutboxWorker(app).start()
+        if app.config['REMINDER_IN_PROCESS']:
+            ReminderScheduler(app).start()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,29 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.archive import archive_chores
+from app.migrations import init_db
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(description="Move long-deleted chores into chore_archive, in batches.")
+    parser.add_argument('--older-than-days', type=int, default=app.config['ARCHIVE_AFTER_DAYS'])
+    parser.add_argument('--batch-size', type=int, default=app.config['ARCHIVE_BATCH_SIZE'])
+    parser.add_argument('--pause', type=float, default=app.config['ARCHIVE_PAUSE_SECONDS'],
+                        help="Seconds to sleep between batches")
+    parser.add_argument('--max-batches', type=int, help="Stop after this many batches; the next run resumes")
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+        result = archive_chores(args.older_than_days, args.batch_size, args.pause, args.max_batches)
+    print(f"Archived {result['archived']} chores in {result['batches']} batches "
+          f"(resumed after id {result['resumed_from']}).")
+    if not result['finished']:
+        print(f"Stopped after id {result['position']}; run again to continue.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import Chore, ChoreLog, DataVersion
+
+app = create_app()
+
+def backfill():
+    with app.app_context():
+        # One set-based pass over chore_log instead of loading logs per chore
+        last_completed = db.session.query(db.func.max(ChoreLog.completed_at)) \
+            .filter(ChoreLog.chore_id == Chore.id) \
+            .scalar_subquery()
+        updated = Chore.query.update({Chore.last_completed_at: last_completed}, synchronize_session=False)
+        print(f"Backfilled last_completed_at on {updated} chores.")
+
+        # next_due_at only needs the (few) chores with a recurrence interval
+        due = Chore.query.filter(Chore.is_recurring == True, Chore.recurrence_days.isnot(None)).all()
+        for chore in due:
+            chore.next_due_at = chore.compute_next_due()
+        DataVersion.bump('chores')
+        db.session.commit()
+        print(f"Computed next_due_at for {len(due)} recurring chores.")
+
+if __name__ == "__main__":
+    backfill()
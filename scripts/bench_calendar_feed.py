@@ -0,0 +1,115 @@
+"""Calendar feed generation time for a user with many schedules.
+
+Inserts --events schedules (a quarter of them recurring) for one user, then
+times GET /api/users/<id>/calendar.ics cold (built and streamed), warm
+(served from the response cache) and conditional (304 from If-None-Match).
+If the ics package (0.7, not in requirements.txt) is installed it also
+times building the same feed as ics.Calendar objects, the way invites used
+to be built; without it that comparison is skipped.
+
+    python scripts/bench_calendar_feed.py --events 5000
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, ChoreSchedule, User
+from app.ical import chore_description, chore_summary
+from datetime import datetime, timedelta
+import argparse
+import statistics
+import time
+
+try:
+    from ics import Calendar, Event
+    from ics.grammar.parse import ContentLine
+except ImportError:  # optional, only for the comparison run
+    Calendar = None
+
+app = create_app({'LOGIN_DISABLED': True})
+with app.app_context():
+    init_db()
+
+def median_ms(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def build_with_ics(rows):
+    calendar = Calendar()
+    for row in rows:
+        event = Event()
+        event.name = chore_summary(row)
+        event.begin = row.scheduled_at
+        event.uid = f"chore-{row.chore_id}-{row.scheduled_at:%Y%m%dT%H%M%S}@chore-chart"
+        event.description = chore_description(row)
+        if row.recurrence_freq:
+            event.extra.append(ContentLine(name='RRULE', value=f'FREQ={row.recurrence_freq}'))
+        calendar.events.add(event)
+    return calendar.serialize()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calendar feed generation.")
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    with app.app_context():
+        user = User(username="CalendarBench")
+        chores = [Chore(title=f"Calendar Bench Chore {i}", points=i % 10 + 1,
+                        description="Bench chore, with an escaped; description") for i in range(50)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+        start = datetime.utcnow().replace(microsecond=0)
+        db.session.execute(db.insert(ChoreSchedule.__table__), [{
+            'chore_id': chore_ids[i % len(chore_ids)], 'user_id': user_id,
+            'scheduled_at': start + timedelta(hours=i), 'created_at': start,
+            'recurrence_freq': 'WEEKLY' if i % 4 == 0 else None,
+            'recurrence_interval': 1 if i % 4 == 0 else None
+        } for i in range(args.events)])
+        db.session.commit()
+
+    url = f'/api/users/{user_id}/calendar.ics'
+    try:
+        def cold():
+            # A fresh ETag each round: touch the user so the cached body is stale
+            with app.app_context():
+                User.query.filter_by(id=user_id).update({User.updated_at: datetime.utcnow()})
+                db.session.commit()
+            return client.get(url).get_data()
+
+        body = cold()
+        etag = client.get(url).headers['ETag']
+        print(f"{args.events} events, {len(body) / 1024:.0f} KiB feed")
+        print(f"  cold (query + write + stream): {median_ms(cold, args.rounds):8.1f} ms")
+        print(f"  warm (response cache):         {median_ms(lambda: client.get(url).get_data(), args.rounds):8.1f} ms")
+        print(f"  304 (If-None-Match):           "
+              f"{median_ms(lambda: client.get(url, headers={'If-None-Match': etag}), args.rounds):8.1f} ms")
+
+        if Calendar is None:
+            print("  ics package not installed; skipping the ics.Calendar comparison")
+        else:
+            with app.app_context():
+                rows = db.session.query(
+                    ChoreSchedule.chore_id, ChoreSchedule.scheduled_at, ChoreSchedule.recurrence_freq,
+                    Chore.title, Chore.points, Chore.description
+                ).join(Chore, Chore.id == ChoreSchedule.chore_id).filter(ChoreSchedule.user_id == user_id).all()
+            print(f"  ics.Calendar (objects only):   {median_ms(lambda: build_with_ics(rows), args.rounds):8.1f} ms")
+    finally:
+        with app.app_context():
+            # Clean up
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Multi-process read/write throughput against one SQLite file.
+
+Runs the same workload twice on a scratch database: once the way the app
+connected before (rollback journal, synchronous=FULL, pysqlite's 5 second
+busy wait) and once with the pragmas app/db_engine.py applies. Writer
+processes record completions (insert a chore_log row and bump the user's
+points in one transaction); reader processes run the leaderboard and
+recent-history queries.
+
+    python scripts/bench_db_concurrency.py --writers 4 --readers 4 --seconds 5
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db_engine import configure_engine
+from app.extensions import db
+from app import models  # registers the tables on db.metadata
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+
+CONFIGS = {
+    'before': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    },
+    'tuned': {
+        'SQLITE_JOURNAL_MODE': 'WAL',
+        'SQLITE_SYNCHRONOUS': 'NORMAL',
+        'SQLITE_BUSY_TIMEOUT_MS': 5000,
+        'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+        'SQLITE_CACHE_SIZE': -64000,
+    },
+}
+
+USERS = 20
+CHORES = 50
+
+def make_engine(path, config):
+    # timeout=0 turns off pysqlite's own busy handler so busy_timeout alone decides
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+    configure_engine(engine, config)
+    return engine
+
+def seed(path, config, history):
+    engine = make_engine(path, config)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text('INSERT INTO user (username, total_points) VALUES (:u, 0)'),
+                     [{'u': f'bench{i}'} for i in range(USERS)])
+        conn.execute(text('INSERT INTO chore (title, points, is_recurring, is_deleted, created_at) '
+                          'VALUES (:t, :p, 1, 0, CURRENT_TIMESTAMP)'),
+                     [{'t': f'chore{i}', 'p': 1 + i % 10} for i in range(CHORES)])
+        conn.execute(text('INSERT INTO chore_log (chore_id, user_id, points_earned, completed_at) '
+                          'VALUES (:c, :u, 1, CURRENT_TIMESTAMP)'),
+                     [{'c': 1 + i % CHORES, 'u': 1 + i % USERS} for i in range(history)])
+    engine.dispose()
+
+def writer(path, config, deadline, queue):
+    engine = make_engine(path, config)
+    rng = random.Random(os.getpid())
+    done = locked = 0
+    while time.time() < deadline:
+        user_id = rng.randint(1, USERS)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text('INSERT INTO chore_log (chore_id, user_id, points_earned, completed_at) '
+                                  'VALUES (:c, :u, 3, CURRENT_TIMESTAMP)'),
+                             {'c': rng.randint(1, CHORES), 'u': user_id})
+                conn.execute(text('UPDATE user SET total_points = total_points + 3 WHERE id = :u'), {'u': user_id})
+            done += 1
+        except OperationalError:
+            locked += 1
+    queue.put(('write', done, locked))
+
+def reader(path, config, deadline, queue):
+    engine = make_engine(path, config)
+    done = locked = 0
+    while time.time() < deadline:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text('SELECT id, username, total_points FROM user ORDER BY total_points DESC')).all()
+                conn.execute(text('SELECT id, chore_id, user_id, completed_at FROM chore_log '
+                                  'ORDER BY completed_at DESC, id DESC LIMIT 20')).all()
+            done += 1
+        except OperationalError:
+            locked += 1
+    queue.put(('read', done, locked))
+
+def run(name, config, args):
+    directory = tempfile.mkdtemp(prefix='bench_db_')
+    path = os.path.join(directory, 'bench.db')
+    seed(path, config, args.history)
+
+    ctx = multiprocessing.get_context('fork')
+    queue = ctx.Queue()
+    deadline = time.time() + args.seconds
+    procs = [ctx.Process(target=writer, args=(path, config, deadline, queue)) for _ in range(args.writers)]
+    procs += [ctx.Process(target=reader, args=(path, config, deadline, queue)) for _ in range(args.readers)]
+    for p in procs:
+        p.start()
+    totals = {'write': [0, 0], 'read': [0, 0]}
+    for _ in procs:
+        kind, done, locked = queue.get()
+        totals[kind][0] += done
+        totals[kind][1] += locked
+    for p in procs:
+        p.join()
+
+    print(f"{name:>8}: writes {totals['write'][0] / args.seconds:8.0f}/s ({totals['write'][1]} locked)   "
+          f"reads {totals['read'][0] / args.seconds:8.0f}/s ({totals['read'][1]} locked)")
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite before/tuned pragmas under concurrent load.")
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--history', type=int, default=20000, help="chore_log rows seeded before the run")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer and {args.readers} reader processes, {args.seconds:g}s per configuration")
+    for name, config in CONFIGS.items():
+        run(name, config, args)
+
+if __name__ == "__main__":
+    main()
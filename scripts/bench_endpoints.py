@@ -0,0 +1,278 @@
+"""Latency, query count and peak memory for every /api/* endpoint.
+
+Drives each endpoint through the Flask test client against whatever
+DATABASE_URL points at, normally a household from generate_household.py:
+
+    export DATABASE_URL=sqlite:////tmp/bench.db
+    python scripts/generate_household.py --reset --fixed-now --chores 20000 --history 500000
+    python scripts/bench_endpoints.py --output before.json
+    ... change something, regenerate with the same arguments ...
+    python scripts/bench_endpoints.py --output after.json --compare before.json
+
+For each endpoint it reports p50/p95/p99/max latency, SQL statements per
+request and the peak Python heap allocated while serving one request
+(tracemalloc, measured in a separate pass so it does not slow the timed
+requests). Reads run first, then writes. The writes really commit, so
+regenerate the database between runs that are meant to be compared.
+
+--output writes the results as JSON. --compare prints the difference from
+an earlier file and exits non-zero if any endpoint's p95 got more than
+--threshold percent (and --min-delta-ms) slower, or if it now runs more
+queries.
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import User, Chore, ChoreLog, ChoreSchedule, OutboundEmail
+from app.cache import reset_caches
+from sqlalchemy import event
+from datetime import datetime, timedelta
+import argparse
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+# (name, method, build) where build(ctx, i) returns (url, request kwargs).
+# Ordered so that writes come after every read and each write finds the
+# rows an earlier one created (chores.update edits chores.create's chores).
+READS = [
+    ('chores.list', 'GET', lambda ctx, i: ('/api/chores', {})),
+    ('chores.overdue', 'GET', lambda ctx, i: ('/api/chores?overdue=true', {})),
+    ('chores.sort_due', 'GET', lambda ctx, i: ('/api/chores?sort=due', {})),
+    ('users.list', 'GET', lambda ctx, i: ('/api/users', {})),
+    ('users.get', 'GET', lambda ctx, i: (f"/api/users/{ctx['users'][i % len(ctx['users'])]}", {})),
+    ('history.page', 'GET', lambda ctx, i: ('/api/stats/history?page=1', {})),
+    ('history.deep_page', 'GET', lambda ctx, i: ('/api/stats/history?page=1000&per_page=50', {})),
+    ('history.cursor', 'GET', lambda ctx, i: ('/api/stats/history?after=', {})),
+    ('history.cursor_next', 'GET', lambda ctx, i: (f"/api/stats/history?per_page=50&after={ctx['cursor']}", {})),
+    ('history.cursor_total', 'GET', lambda ctx, i: ('/api/stats/history?after=&include_total=true', {})),
+    ('charts.week', 'GET', lambda ctx, i: ('/api/stats/charts?days=7', {})),
+    ('charts.year_by_month', 'GET', lambda ctx, i: ('/api/stats/charts?days=365&bucket=month', {})),
+    ('stats.cache', 'GET', lambda ctx, i: ('/api/stats/cache', {})),
+]
+
+def pick(ctx, key, i):
+    return ctx[key][i % len(ctx[key])]
+
+def in_days(days, i):
+    return (datetime(2030, 1, 1) + timedelta(days=days, minutes=i)).isoformat()
+
+WRITES = [
+    ('chores.create', 'POST', lambda ctx, i: ('/api/chores', {'json': {
+        'title': f'Bench Chore {i}', 'points': 10, 'is_recurring': True, 'recurrence_days': 7}})),
+    ('chores.update', 'PUT', lambda ctx, i: (f"/api/chores/{pick(ctx, 'created', i)}", {'json': {'points': 11 + i % 5}})),
+    ('chores.complete', 'POST', lambda ctx, i: (f"/api/chores/{pick(ctx, 'chores', i)}/complete",
+                                                {'json': {'user_id': pick(ctx, 'users', i)}})),
+    ('chores.complete_batch', 'POST', lambda ctx, i: ('/api/chores/complete-batch', {'json': {'completions': [
+        {'chore_id': pick(ctx, 'chores', i * 10 + n), 'user_id': pick(ctx, 'users', i + n)} for n in range(10)]}})),
+    ('users.create', 'POST', lambda ctx, i: ('/api/users', {'json': {'username': f"bench_{ctx['run']}_{i}"}})),
+    ('users.update', 'PUT', lambda ctx, i: (f"/api/users/{pick(ctx, 'users', i)}", {'json': {'first_name': f'Bench {i}'}})),
+    ('users.upload_picture', 'POST', lambda ctx, i: (f"/api/users/{pick(ctx, 'users', i)}/upload-picture", {
+        'data': {'file': (io.BytesIO(b'\x89PNG\r\n\x1a\n' + b'\0' * 2048), 'bench.png')},
+        'content_type': 'multipart/form-data'})),
+    ('chores.invite', 'POST', lambda ctx, i: (f"/api/chores/{pick(ctx, 'chores', i)}/invite", {'json': {
+        'user_id': pick(ctx, 'users', i), 'datetime': in_days(0, i), 'recurrence': 'weekly'}})),
+    ('schedules.bulk', 'POST', lambda ctx, i: ('/api/schedules/bulk', {'json': {'entries': [
+        {'chore_id': pick(ctx, 'chores', i * 5 + n), 'user_id': pick(ctx, 'users', i + n),
+         'datetime': in_days(n, i)} for n in range(5)]}})),
+    ('mail.job', 'GET', lambda ctx, i: (f"/api/mail/jobs/{pick(ctx, 'jobs', i)}", {})),
+    ('chores.delete', 'DELETE', lambda ctx, i: (f"/api/chores/{ctx['created'].pop()}", {})),
+]
+
+def collect(name, ctx, res):
+    """Remember ids created by one write for the writes that follow it."""
+    body = res.get_json(silent=True) or {}
+    if name == 'chores.create' and 'id' in body:
+        ctx['created'].append(body['id'])
+    elif name == 'chores.invite' and 'job_id' in body:
+        ctx['jobs'].append(body['job_id'])
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+def dataset_counts():
+    return {model.__tablename__: db.session.query(db.func.count()).select_from(model).scalar()
+            for model in (User, Chore, ChoreLog, ChoreSchedule, OutboundEmail)}
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def context():
+    # Invites need an address, so only users with one are picked
+    user_ids = [u for (u,) in db.session.query(User.id).filter(User.email != None).order_by(User.id).limit(50)]
+    chore_ids = [c for (c,) in db.session.query(Chore.id).filter(Chore.is_deleted == False, Chore.is_recurring == True)
+                 .order_by(Chore.id).limit(200)]
+    if not user_ids or not chore_ids:
+        print("The database has no users or recurring chores; run generate_household.py first.")
+        sys.exit(1)
+    return {'users': user_ids, 'chores': chore_ids, 'created': [], 'jobs': [], 'run': int(time.time())}
+
+def bench(client, name, method, build, ctx, args, statements):
+    """Time one endpoint; returns its result dict."""
+    def call(i):
+        url, kwargs = build(ctx, i)
+        res = client.open(url, method=method, **kwargs)
+        if res.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {res.status_code}: {res.get_data(as_text=True)[:200]}")
+        collect(name, ctx, res)
+        return res
+
+    counter = 0
+    for _ in range(args.warmup):
+        call(counter)
+        counter += 1
+
+    latencies, queries = [], []
+    status = None
+    for _ in range(args.requests):
+        statements[0] = 0
+        start = time.perf_counter()
+        res = call(counter)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(statements[0])
+        status = res.status_code
+        counter += 1
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(args.memory_requests):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            call(counter)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+            counter += 1
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'method': method,
+        'status': status,
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries': max(queries),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Print per-endpoint deltas against a baseline; returns the regressed endpoint names."""
+    regressed = []
+    print(f"\ncompared with {baseline['meta'].get('revision') or 'baseline'}:")
+    print(f"  {'endpoint':<24} {'p95 before':>10} {'p95 after':>10} {'change':>8} {'queries':>9}")
+    for name, now in results['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            print(f"  {name:<24} {'-':>10} {now['p95_ms']:>10.2f} {'new':>8}")
+            continue
+        change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        slower = change > threshold and now['p95_ms'] - before['p95_ms'] > min_delta_ms
+        more_queries = now['queries'] > before['queries']
+        flag = '  <-- regression' if slower or more_queries else ''
+        print(f"  {name:<24} {before['p95_ms']:>10.2f} {now['p95_ms']:>10.2f} {change:>+7.1f}% "
+              f"{before['queries']:>4}->{now['queries']:<4}{flag}")
+        if flag:
+            regressed.append(name)
+    if baseline['meta'].get('dataset') != results['meta']['dataset']:
+        print("  note: the datasets differ; regenerate with the same arguments for a like-for-like comparison")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every /api/* endpoint through the test client.")
+    parser.add_argument('--requests', type=int, default=50, help="Timed requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--memory-requests', type=int, default=3, help="Requests per endpoint traced for memory")
+    parser.add_argument('--only', help="Comma-separated endpoint names or prefixes, e.g. history,users.list")
+    parser.add_argument('--reads-only', action='store_true', help="Skip endpoints that write")
+    parser.add_argument('--cache-backend', default='none', choices=['none', 'local'],
+                        help="Response cache during the run; 'none' measures the uncached work")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Earlier --output file to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed p95 slowdown, percent")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help="Ignore p95 slowdowns smaller than this, which are usually noise")
+    args = parser.parse_args()
+
+    app.config['LOGIN_DISABLED'] = True
+    app.config['CACHE_BACKEND'] = args.cache_backend
+    app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp(prefix='bench_uploads_')
+    reset_caches()
+    client = app.test_client()
+
+    endpoints = READS if args.reads_only else READS + WRITES
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(',')]
+        names = {e[0] for e in endpoints if any(e[0].startswith(w) for w in wanted)}
+        # Writes that depend on ids from another write bring it along
+        needs = {'chores.update': 'chores.create', 'chores.delete': 'chores.create', 'mail.job': 'chores.invite'}
+        extra = {needs[n] for n in names if n in needs} - names
+        endpoints = [e for e in READS + WRITES if e[0] in names | extra]
+
+    with app.app_context():
+        statements = [0]
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements[0] += 1
+
+        ctx = context()
+        first_page = client.get('/api/stats/history?after=&per_page=50').get_json()
+        ctx['cursor'] = first_page.get('next_cursor') or ''
+        results = {'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'database': db.engine.url.render_as_string(hide_password=True),
+            'dataset': dataset_counts(),
+            'args': vars(args)
+        }, 'endpoints': {}}
+
+        print(f"{'endpoint':<24} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'queries':>8} {'peak KiB':>9}")
+        event.listen(db.engine, 'before_cursor_execute', on_execute)
+        try:
+            for name, method, build in endpoints:
+                result = bench(client, name, method, build, ctx, args, statements)
+                results['endpoints'][name] = result
+                print(f"{name:<24} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                      f"{result['max_ms']:>8.2f} {result['queries']:>8} {result['peak_kib']:>9.1f}")
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', on_execute)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressed:
+            print(f"FAILURE: {len(regressed)} endpoint(s) regressed: {', '.join(regressed)}")
+            sys.exit(1)
+        print("SUCCESS: no endpoint regressed")
+
+if __name__ == "__main__":
+    main()
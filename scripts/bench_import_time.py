@@ -0,0 +1,101 @@
+"""Import-time and boot-time budget for the app package.
+
+Runs fresh interpreters (the timings only mean something cold) and checks
+that:
+
+  * `import app` stays under --import-budget-ms, as measured by
+    `python -X importtime`; the slowest modules are listed;
+  * `create_app()` stays under --boot-budget-ms of wall time;
+  * neither imports the modules that are deferred to first use (flasgger);
+  * neither touches the database: a probe SQLite path must not exist after boot.
+
+Exits non-zero on any regression, so it can run in CI.
+
+    python scripts/bench_import_time.py --runs 5
+"""
+import sys, os
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFERRED_MODULES = ('flasgger',)
+
+BOOT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({'boot_ms': elapsed * 1000,
+                  'loaded': sorted(m for m in %r if m in sys.modules)}))
+""" % (DEFERRED_MODULES,)
+
+def run(args, env):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard app import and boot time against regressions.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=50)
+    parser.add_argument('--boot-budget-ms', type=float, default=1500)
+    parser.add_argument('--top', type=int, default=8, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    probe_dir = tempfile.mkdtemp(prefix='bench_import_')
+    probe_db = os.path.join(probe_dir, 'probe.db')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{probe_db}')
+
+    import_ms, boot_ms, loaded = [], [], set()
+    slowest = {}
+    for _ in range(args.runs):
+        modules = parse_importtime(run(['-X', 'importtime', '-c', 'import app'], env).stderr)
+        import_ms.append(modules['app'][1] / 1000)
+        for name, (self_us, _) in modules.items():
+            slowest[name] = slowest.get(name, 0) + self_us / args.runs
+
+        result = json.loads(run(['-c', BOOT_PROBE], env).stdout.strip().splitlines()[-1])
+        boot_ms.append(result['boot_ms'])
+        loaded.update(result['loaded'])
+
+    import_median = statistics.median(import_ms)
+    boot_median = statistics.median(boot_ms)
+    print(f"import app:   median {import_median:7.1f} ms over {args.runs} runs (budget {args.import_budget_ms:g} ms)")
+    print(f"create_app(): median {boot_median:7.1f} ms over {args.runs} runs (budget {args.boot_budget_ms:g} ms)")
+    print("slowest modules by self time during `import app`:")
+    for name, self_us in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:7.1f} ms  {name}")
+
+    ok = True
+    if import_median > args.import_budget_ms:
+        ok = False
+        print(f"FAILURE: import app takes {import_median:.1f} ms")
+    if boot_median > args.boot_budget_ms:
+        ok = False
+        print(f"FAILURE: create_app() takes {boot_median:.1f} ms")
+    if loaded:
+        ok = False
+        print(f"FAILURE: deferred modules imported at boot: {', '.join(sorted(loaded))}")
+    if os.path.exists(probe_db):
+        ok = False
+        print("FAILURE: importing or booting the app touched the database")
+    if ok:
+        print("SUCCESS: import and boot are within budget, with no deferred imports or database access")
+    else:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Rows/sec serialized by the list endpoints, before and after projection.
+
+For /api/chores, /api/users and /api/stats/history, times three ways of
+producing the response body for a large payload (default 10k rows):
+
+    orm+json      load mapped instances, to_dict() each, Flask's json encoder
+    rows+json     select only the needed columns as tuples, Flask's encoder
+    rows+orjson   column tuples and the FAST_JSON provider
+
+and checks the three bodies decode to the same data.
+
+    python scripts/bench_json_serialization.py --rows 10000
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog
+from app.json_provider import FastJSONProvider, orjson
+from flask.json.provider import DefaultJSONProvider
+from datetime import datetime, timedelta
+import argparse
+import json
+import time
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+PREFIX = 'JsonBench'
+
+def seed(rows):
+    now = datetime.utcnow()
+    db.session.execute(db.insert(User.__table__), [
+        {'username': f'{PREFIX}User{i}', 'total_points': i % 500, 'created_at': now,
+         'first_name': 'Bench', 'last_name': f'User {i}', 'email': f'bench{i}@example.com'}
+        for i in range(rows)])
+    db.session.execute(db.insert(Chore.__table__), [
+        {'title': f'{PREFIX} Chore {i}', 'description': 'Benchmark chore', 'location': 'Inside',
+         'points': 1 + i % 20, 'is_recurring': i % 2 == 0, 'is_deleted': False,
+         'created_at': now - timedelta(minutes=i), 'recurrence_days': 7 if i % 2 == 0 else None,
+         'last_completed_at': now - timedelta(days=1) if i % 2 == 0 else None,
+         'next_due_at': now + timedelta(days=6) if i % 2 == 0 else None}
+        for i in range(rows)])
+    db.session.commit()
+    user_ids = [u for (u,) in db.session.query(User.id).filter(User.username.like(f'{PREFIX}%'))]
+    chore_ids = [c for (c,) in db.session.query(Chore.id).filter(Chore.title.like(f'{PREFIX}%'))]
+    db.session.execute(db.insert(ChoreLog.__table__), [
+        {'chore_id': chore_ids[i % len(chore_ids)], 'user_id': user_ids[i % len(user_ids)],
+         'points_earned': 5, 'completed_at': now - timedelta(minutes=i)}
+        for i in range(rows)])
+    db.session.commit()
+    return user_ids, chore_ids
+
+def cleanup():
+    chore_ids = db.session.query(Chore.id).filter(Chore.title.like(f'{PREFIX}%')).scalar_subquery()
+    ChoreLog.query.filter(ChoreLog.chore_id.in_(chore_ids)).delete(synchronize_session=False)
+    Chore.query.filter(Chore.title.like(f'{PREFIX}%')).delete(synchronize_session=False)
+    User.query.filter(User.username.like(f'{PREFIX}%')).delete(synchronize_session=False)
+    db.session.commit()
+
+def chores_orm(limit):
+    chores = Chore.active().order_by(Chore.created_at.desc()).limit(limit).all()
+    return Chore.serialize_many(chores)
+
+def chores_rows(limit):
+    rows = Chore.active().with_entities(*Chore.list_columns()).order_by(Chore.created_at.desc()).limit(limit).all()
+    return Chore.serialize_many(rows)
+
+def users_orm(limit):
+    return [u.to_dict() for u in User.query.order_by(User.total_points.desc()).limit(limit).all()]
+
+def users_rows(limit):
+    rows = User.query.with_entities(*User.list_columns()).order_by(User.total_points.desc()).limit(limit).all()
+    return [User.row_to_dict(u) for u in rows]
+
+def history_orm(limit):
+    logs = ChoreLog.query.options(db.joinedload(ChoreLog.chore), db.joinedload(ChoreLog.user)) \
+        .order_by(ChoreLog.completed_at.desc(), ChoreLog.id.desc()).limit(limit).all()
+    return [l.to_dict() for l in logs]
+
+def history_rows(limit):
+    rows = ChoreLog.list_query().order_by(ChoreLog.completed_at.desc(), ChoreLog.id.desc()).limit(limit).all()
+    return [ChoreLog.row_to_dict(r) for r in rows]
+
+ENDPOINTS = [
+    ('/api/chores', chores_orm, chores_rows),
+    ('/api/users', users_orm, users_rows),
+    ('/api/stats/history', history_orm, history_rows),
+]
+
+def timed(build, encode, limit, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        data = build(limit)
+        built = time.perf_counter()
+        body = encode(data)
+        done = time.perf_counter()
+        if best is None or done - start < best[0]:
+            best = (done - start, built - start, done - built, len(data), body)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization.")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    default = DefaultJSONProvider(app)
+    encoders = {'json': lambda data: default.dumps(data, separators=(',', ':'))}
+    if orjson is not None:
+        fast = FastJSONProvider(app)
+        encoders['orjson'] = fast.dumps_bytes
+    else:
+        print("orjson is not installed; only the standard encoder is measured")
+
+    with app.app_context():
+        cleanup()
+        seed(args.rows)
+        ok = True
+        try:
+            print(f"{'endpoint':<20} {'variant':<12} {'rows':>6} {'build ms':>9} {'encode ms':>10} {'rows/sec':>10}")
+            for name, orm_build, rows_build in ENDPOINTS:
+                variants = [('orm+json', orm_build, 'json'), ('rows+json', rows_build, 'json')]
+                if 'orjson' in encoders:
+                    variants.append(('rows+orjson', rows_build, 'orjson'))
+                bodies = []
+                for label, build, encoder in variants:
+                    total, build_s, encode_s, count, body = timed(build, encoders[encoder], args.rows, args.repeat)
+                    # Ties in the sort order may come back in any order
+                    bodies.append(sorted(json.loads(body), key=lambda item: item['id']))
+                    print(f"{name:<20} {label:<12} {count:>6} {build_s * 1000:>9.1f} {encode_s * 1000:>10.1f} "
+                          f"{count / total:>10.0f}")
+                if any(b != bodies[0] for b in bodies[1:]):
+                    ok = False
+                    print(f"FAILURE: {name} bodies differ between variants")
+            if ok:
+                print("SUCCESS: every variant produces the same data")
+        finally:
+            cleanup()
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
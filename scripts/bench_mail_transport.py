@@ -0,0 +1,59 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.mail import deliver, deliver_batch
+from app.mail_transport import close_transports
+from mail_standins import StandInAPI, StandInSMTP
+from types import SimpleNamespace
+import argparse
+import time
+
+def make_jobs(count):
+    ics = "BEGIN:VCALENDAR\nVERSION:2.0\nBEGIN:VEVENT\nSUMMARY:Chore: Bench\nEND:VEVENT\nEND:VCALENDAR"
+    return [SimpleNamespace(id=i, recipient_email=f"user{i}@example.com", recipient_name=f"user{i}",
+                            subject="Chore Reminder: Bench", text_body="Hello", html_body="<p>Hello</p>",
+                            ics_content=ics)
+            for i in range(count)]
+
+def run(label, config, jobs, standin, batch_size=1):
+    close_transports()
+    before = standin.connections
+    start = time.perf_counter()
+    if batch_size == 1:
+        for job in jobs:
+            deliver(job, config)
+    else:
+        for i in range(0, len(jobs), batch_size):
+            results = deliver_batch(jobs[i:i + batch_size], config)
+            assert not any(results.values()), results
+    elapsed = time.perf_counter() - start
+    close_transports()
+    print(f"{label:<32} {elapsed / len(jobs) * 1000:8.2f} ms/invite  "
+          f"{standin.connections - before:4d} connections")
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-invite delivery latency with and without connection pooling.")
+    parser.add_argument('--invites', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.03,
+                        help="Simulated connection setup cost in seconds (TCP + TLS + AUTH)")
+    args = parser.parse_args()
+    jobs = make_jobs(args.invites)
+    base = {'MAIL_DEFAULT_SENDER': 'bench@example.com', 'MAIL_TIMEOUT': 10, 'MAIL_POOL_SIZE': 4}
+
+    print(f"{args.invites} invites, {args.latency * 1000:.0f} ms connection setup")
+    with StandInSMTP(latency=args.latency) as smtp:
+        smtp_config = dict(base, MAIL_SERVER='127.0.0.1', MAIL_PORT=smtp.port, MAIL_USERNAME='bench',
+                           MAIL_PASSWORD='bench', MAIL_USE_TLS=False)
+        run("SMTP, new connection per invite", dict(smtp_config, MAIL_CONNECTION_POOLING=False), jobs, smtp)
+        run("SMTP, pooled", dict(smtp_config, MAIL_CONNECTION_POOLING=True), jobs, smtp)
+
+    with StandInAPI(latency=args.latency) as api:
+        api_config = dict(base, MAIL_API_KEY='bench', MAIL_API_URL=api.url)
+        run("API, new session per invite", dict(api_config, MAIL_CONNECTION_POOLING=False), jobs, api)
+        run("API, keep-alive session", dict(api_config, MAIL_CONNECTION_POOLING=True), jobs, api)
+        calls = len(api.requests)
+        run("API, keep-alive + batches of 10", dict(api_config, MAIL_CONNECTION_POOLING=True), jobs, api, batch_size=10)
+        print(f"{'':<32} {len(api.requests) - calls} API calls for {args.invites} invites")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Reminder scheduler cost with many pending schedules.
+
+Inserts --pending one-off schedules (and their occurrences) spread evenly
+over the next --days days, then times the scheduler's first load, a quiet
+tick, a tick after new schedules arrive, and dispatching a burst of due
+reminders. Every SELECT on schedule_occurrence is checked with EXPLAIN
+QUERY PLAN; none may scan the table.
+
+    python scripts/bench_reminders.py --pending 100000
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, ChoreSchedule, OutboundEmail, ScheduleOccurrence, User
+from app.recurrence import FULLY_EXPANDED
+from app.reminders import ReminderScheduler
+from datetime import datetime, timedelta
+from sqlalchemy import event
+import argparse
+import time
+
+app = create_app({'REMINDER_RESYNC_SECONDS': 3600})
+with app.app_context():
+    init_db()
+
+EMAIL = 'reminder-bench@example.com'
+
+def insert_schedules(chore_ids, user_id, starts):
+    """One-off schedules with their occurrence already materialized."""
+    table = ChoreSchedule.__table__
+    created = datetime.utcnow()
+    with app.app_context():
+        first = db.session.query(db.func.coalesce(db.func.max(ChoreSchedule.id), 0)).scalar() + 1
+        db.session.execute(db.insert(table), [{
+            'id': first + i, 'chore_id': chore_ids[i % len(chore_ids)], 'user_id': user_id,
+            'scheduled_at': start, 'created_at': created, 'expanded_until': FULLY_EXPANDED
+        } for i, start in enumerate(starts)])
+        db.session.execute(db.insert(ScheduleOccurrence.__table__), [{
+            'schedule_id': first + i, 'chore_id': chore_ids[i % len(chore_ids)], 'user_id': user_id,
+            'starts_at': start
+        } for i, start in enumerate(starts)])
+        db.session.commit()
+
+def measured(fn):
+    """(result, ms, statements, scans of schedule_occurrence) for one call."""
+    seen = {'statements': 0, 'scans': 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        seen['statements'] += 1
+        if statement.lstrip().upper().startswith('SELECT') and 'schedule_occurrence' in statement:
+            plan = ' '.join(str(r[-1]) for r in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters))
+            seen['scans'] += 'SCAN schedule_occurrence' in plan
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+    return result, elapsed, seen['statements'], seen['scans']
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the due reminder scheduler.")
+    parser.add_argument('--pending', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--burst', type=int, default=1000, help="reminders due at once for the dispatch timing")
+    parser.add_argument('--concurrency', type=int, default=2)
+    args = parser.parse_args()
+
+    with app.app_context():
+        user = User(username="ReminderBench", email=EMAIL)
+        chores = [Chore(title=f"Reminder Bench Chore {i}", points=1) for i in range(50)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+
+    now = datetime.utcnow().replace(microsecond=0)
+    lead = timedelta(minutes=app.config['REMINDER_LEAD_MINUTES'])
+    spacing = timedelta(days=args.days) / args.pending
+    scheduler = ReminderScheduler(app, concurrency=args.concurrency)
+    try:
+        # Pending schedules start after the window, so they stay in the table only
+        start = now + lead + timedelta(minutes=app.config['REMINDER_WINDOW_MINUTES'] + 1)
+        insert_schedules(chore_ids, user_id, [start + spacing * i for i in range(args.pending)])
+        print(f"{args.pending} pending schedules over {args.days} days")
+
+        def tick(at):
+            with app.app_context():
+                return scheduler.refresh(at)
+
+        def report(label, fn):
+            added, ms, statements, scanned = measured(fn)
+            print(f"  {label + ':':22} {ms:8.1f} ms  {statements:3} statements  +{added} on heap ({len(scheduler)})")
+            return scanned
+
+        scans = report('first load', lambda: tick(now))
+        scans += report('quiet tick', lambda: tick(now + timedelta(seconds=5)))
+        insert_schedules(chore_ids, user_id, [now + lead + timedelta(minutes=5, seconds=i) for i in range(50)])
+        scans += report('tick after 50 new', lambda: tick(now + timedelta(seconds=10)))
+        scans += report('tick an hour on', lambda: tick(now + timedelta(hours=1)))
+
+        # A burst due at the same moment
+        due_at = now + timedelta(hours=2)
+        insert_schedules(chore_ids, user_id, [due_at + lead + timedelta(seconds=i % 60) for i in range(args.burst)])
+        counts, ms, statements, scanned = measured(lambda: scheduler.run_once(due_at + timedelta(minutes=1)))
+        scans += scanned
+        print(f"  {'dispatch burst:':22} {ms:8.1f} ms  {statements:3} statements  "
+              f"{counts['sent']} sent ({counts['sent'] / ms * 1000:.0f}/s), {counts['expired']} expired")
+        print(f"  schedule_occurrence scans: {scans}")
+    finally:
+        scheduler.stop()
+        with app.app_context():
+            # Clean up
+            OutboundEmail.query.filter_by(recipient_email=EMAIL).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+if __name__ == "__main__":
+    main()
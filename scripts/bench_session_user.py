@@ -0,0 +1,125 @@
+"""Authenticated-request overhead with and without the session user cache.
+
+Logs a user in on two apps, one with SESSION_USER_CACHE_TTL=0 (load the
+user from the database on every request, as before) and one with the
+default TTL. It then times a cheap authenticated endpoint, interleaving
+rounds so machine noise hits both alike. It also checks that a profile
+edit shows up on the next request and that a deleted user is logged out.
+
+    python scripts/bench_session_user.py --requests 500
+"""
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import User
+from flask import jsonify
+from flask_login import current_user, login_required
+from sqlalchemy import event
+import argparse
+import time
+
+cached_app = create_app({'CACHE_BACKEND': 'none'})
+uncached_app = create_app({'CACHE_BACKEND': 'none', 'SESSION_USER_CACHE_TTL': 0})
+with cached_app.app_context():
+    init_db()
+
+@login_required
+def whoami():
+    return jsonify({'id': current_user.id, 'first_name': current_user.first_name,
+                    'type': type(current_user._get_current_object()).__name__})
+
+for target in (cached_app, uncached_app):
+    target.add_url_rule('/bench/whoami', 'bench_whoami', whoami)
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def logged_in_client(target, user_id):
+    client = target.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+def queries_for(target, client, url):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with target.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        res = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+    return res, len(statements)
+
+def timed(client, url, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(url)
+    return (time.perf_counter() - start) / n
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the session user cache.")
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with cached_app.app_context():
+        user = User(username="SessionCacheBench", first_name="Before")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    ok = True
+    url = '/api/stats/cache'
+    try:
+        clients = {'uncached': logged_in_client(uncached_app, user_id), 'cached': logged_in_client(cached_app, user_id)}
+        apps = {'uncached': uncached_app, 'cached': cached_app}
+        for name, client in clients.items():
+            client.get(url)
+            res, queries = queries_for(apps[name], client, url)
+            print(f"   {name}: {queries} queries per authenticated request to {url}")
+            if name == 'cached':
+                ok &= check(res.status_code == 200 and queries == 0, "a cached session user costs no query")
+
+        best = {name: float('inf') for name in clients}
+        for _ in range(args.rounds):
+            for name, client in clients.items():
+                best[name] = min(best[name], timed(client, url, args.requests))
+        for name, seconds in best.items():
+            print(f"   {name:<9} {seconds * 1e6:8.0f} us/request  {1 / seconds:8.0f} req/s")
+        print(f"   saved {(best['uncached'] - best['cached']) * 1e6:.0f} us per authenticated request")
+        ok &= check(best['cached'] < best['uncached'], "the cache makes authenticated requests cheaper")
+
+        client = clients['cached']
+        body = client.get('/bench/whoami').get_json()
+        ok &= check(body['type'] == 'SessionUser' and body['first_name'] == 'Before',
+                    f"current_user is a SessionUser ({body['type']})")
+        client.put(f'/api/users/{user_id}', json={'first_name': 'After'})
+        body = client.get('/bench/whoami').get_json()
+        ok &= check(body['first_name'] == 'After', "a profile edit is visible on the next request")
+
+        with cached_app.app_context():
+            db.session.delete(db.session.get(User, user_id))
+            db.session.commit()
+        res = client.get('/bench/whoami')
+        ok &= check(res.status_code in (302, 401), f"a deleted user is logged out ({res.status_code})")
+    finally:
+        with cached_app.app_context():
+            # Clean up
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Local stand-in for the shared cache, for verification and benchmarks.
+
+StandInRedis speaks the subset of the Redis protocol app.cache.RedisCache
+uses (GET, SET with NX/PX, DEL, PING, SELECT, AUTH), keeps everything in a
+dict and counts the commands it receives.
+"""
+import socketserver
+import threading
+import time
+
+
+class StandInRedis:
+    def __init__(self):
+        self.data = {}  # key -> (expires_at or None, value)
+        self.commands = {}
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+            def handle(self):
+                while True:
+                    args = self.read_command()
+                    if args is None:
+                        return
+                    self.wfile.write(standin.execute(args))
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"redis://127.0.0.1:{self.server.server_address[1]}/0"
+
+    def execute(self, args):
+        verb = args[0].decode().upper()
+        with self._lock:
+            self.commands[verb] = self.commands.get(verb, 0) + 1
+            now = time.monotonic()
+            if verb in ('PING', 'SELECT', 'AUTH'):
+                return b'+OK\r\n' if verb != 'PING' else b'+PONG\r\n'
+            key = args[1]
+            entry = self.data.get(key)
+            if entry and entry[0] is not None and entry[0] <= now:
+                del self.data[key]
+                entry = None
+            if verb == 'GET':
+                return b'$-1\r\n' if entry is None else b'$%d\r\n%s\r\n' % (len(entry[1]), entry[1])
+            if verb == 'DEL':
+                return b':%d\r\n' % (1 if self.data.pop(key, None) else 0)
+            if verb == 'SET':
+                options = [a.decode().upper() for a in args[3:]]
+                if 'NX' in options and entry is not None:
+                    return b'$-1\r\n'
+                expires = None
+                if 'PX' in options:
+                    expires = now + int(options[options.index('PX') + 1]) / 1000
+                self.data[key] = (expires, args[2])
+                return b'+OK\r\n'
+            return b'-ERR unknown command\r\n'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
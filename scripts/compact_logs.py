@@ -0,0 +1,28 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.compaction import compact_logs
+from app.migrations import init_db
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold old chore_log rows into monthly summaries, in chunks.")
+    parser.add_argument('--retention-days', type=int, default=app.config['LOG_RETENTION_DAYS'])
+    parser.add_argument('--batch-size', type=int, default=app.config['LOG_COMPACTION_BATCH_SIZE'])
+    parser.add_argument('--pause', type=float, default=app.config['LOG_COMPACTION_PAUSE_SECONDS'],
+                        help="Seconds to sleep between chunks")
+    parser.add_argument('--max-batches', type=int, help="Stop after this many chunks; the next run continues")
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+        result = compact_logs(args.retention_days, args.batch_size, args.pause, args.max_batches)
+    print(f"Compacted {result['compacted']} logs from before {result['horizon']} in {result['batches']} chunks.")
+    if not result['finished']:
+        print(f"Stopped after log id {result['position']}; run again to continue.")
+
+if __name__ == "__main__":
+    main()
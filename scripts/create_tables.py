@@ -1,13 +1,18 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import create_app
 from app.extensions import db
+from app.migrations import upgrade
+
+app = create_app()
 
 def create_table():
     with app.app_context():
         db.create_all()
         print("Created tables.")
+        for name in upgrade():
+            print(f"Applied migration: {name}")
 
 if __name__ == "__main__":
     create_table()
@@ -1,9 +1,11 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import create_app
 from app.extensions import db
-from app.models import User
+from app.models import User, ChoreLog, ChoreLogSummary, DailyUserPoints, DataVersion, ScheduleOccurrence
+
+app = create_app()
 
 def delete_user(username):
     with app.app_context():
@@ -16,17 +18,21 @@ def delete_user(username):
             # but usually 'ondelete' is needed in DB definition or SQLAlchemy handles manual delete.
             # However, simpler manual deletion of related records is safer if unsure.
             
-            # Delete related logs
-            if user.logs:
-                for log in user.logs:
-                    db.session.delete(log)
+            # Delete related logs in one statement rather than loading them all
+            ChoreLog.query.filter_by(user_id=user.id).delete(synchronize_session=False)
             
-            # Delete related schedules if any
+            # Delete the user's rows from the daily points rollup and the compacted history
+            DailyUserPoints.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+            ChoreLogSummary.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+
+            # Delete related schedules if any, and their materialized occurrences
+            ScheduleOccurrence.query.filter_by(user_id=user.id).delete(synchronize_session=False)
             if hasattr(user, 'schedules'):
                 for schedule in user.schedules:
                     db.session.delete(schedule)
 
             db.session.delete(user)
+            DataVersion.bump(*DataVersion.NAMES)
             db.session.commit()
             print(f"User {username} and related data deleted successfully.")
         else:
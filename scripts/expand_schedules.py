@@ -0,0 +1,26 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.recurrence import ensure_expanded
+from datetime import datetime, timedelta
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Materialize schedule occurrences ahead of time, so reads never have to.")
+    parser.add_argument('--days', type=int, default=app.config['SCHEDULE_HORIZON_DAYS'],
+                        help="Expand every schedule at least this many days past now")
+    parser.add_argument('--batch-size', type=int, default=app.config['SCHEDULE_EXPAND_BATCH'])
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+        added = ensure_expanded(datetime.utcnow() + timedelta(days=args.days), args.batch_size)
+    print(f"Added {added} occurrences up to {args.days} days ahead.")
+
+if __name__ == "__main__":
+    main()
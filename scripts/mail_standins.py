@@ -0,0 +1,135 @@
+"""Local stand-ins for the mail providers, for verification and benchmarks.
+
+StandInAPI accepts Brevo-style JSON POSTs; StandInSMTP speaks just enough
+SMTP (EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET, QUIT) for smtplib. Both
+record what they receive and can simulate latency and failures.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import socketserver
+import threading
+import time
+
+
+class StandInAPI:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = []
+        self.fail_next = []  # status codes to return before succeeding again
+        self.connections = 0
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with standin._lock:
+                    standin.connections += 1
+                # Simulated TCP/TLS setup cost, paid once per connection
+                time.sleep(standin.latency)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with standin._lock:
+                    standin.requests.append(json.loads(body))
+                    status = standin.fail_next.pop(0) if standin.fail_next else 201
+                reply = json.dumps({'messageId': str(len(standin.requests))}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v3/smtp/email"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInSMTP:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self.connections = 0
+        self.refuse = set()  # recipient addresses answered with 550
+        self.drop_on_rset = False  # hang up instead of answering RSET
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write((line + '\r\n').encode())
+
+            def handle(self):
+                with standin._lock:
+                    standin.connections += 1
+                # Simulated connect + TLS + AUTH round trips
+                time.sleep(standin.latency)
+                self.reply('220 stand-in ESMTP')
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb == 'EHLO':
+                        self.wfile.write(b'250-stand-in\r\n250-AUTH PLAIN LOGIN\r\n250 OK\r\n')
+                    elif verb == 'HELO':
+                        self.reply('250 stand-in')
+                    elif verb == 'AUTH':
+                        self.reply('235 Authentication successful')
+                    elif verb == 'MAIL':
+                        sender, recipients = command, []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        if any(address in command for address in standin.refuse):
+                            self.reply('550 No such user')
+                            continue
+                        recipients.append(command)
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if chunk in (b'.\r\n', b'.\n', b''):
+                                break
+                            data.append(chunk)
+                        with standin._lock:
+                            standin.messages.append((sender, recipients, b''.join(data)))
+                        self.reply('250 OK queued')
+                    elif verb == 'RSET' and standin.drop_on_rset:
+                        return
+                    elif verb in ('NOOP', 'RSET'):
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
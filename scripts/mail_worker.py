@@ -0,0 +1,30 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.outbox import OutboxWorker
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver queued emails from the mail outbox.")
+    parser.add_argument('--concurrency', type=int, default=app.config['MAIL_WORKER_CONCURRENCY'])
+    parser.add_argument('--once', action='store_true', help="Drain one batch and exit")
+    args = parser.parse_args()
+
+    worker = OutboxWorker(app, concurrency=args.concurrency)
+    if args.once:
+        results = worker.run_once()
+        print(f"Processed {len(results)} jobs: {results}")
+        worker.stop()
+        return
+
+    print(f"Mail worker running with concurrency {worker.concurrency}. Ctrl+C to stop.")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+if __name__ == "__main__":
+    main()
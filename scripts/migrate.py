@@ -0,0 +1,23 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import MIGRATIONS, applied_versions, init_db
+from app.extensions import db
+
+app = create_app()
+
+def migrate():
+    with app.app_context():
+        # Creates any missing tables first, like `flask --app run init-db`
+        applied = init_db()
+        for name in applied:
+            print(f"Applied migration: {name}")
+
+        with db.engine.begin() as conn:
+            done = applied_versions(conn)
+        current = max(done) if done else 0
+        print(f"Schema at version {current} of {MIGRATIONS[-1][0]}.")
+
+if __name__ == "__main__":
+    migrate()
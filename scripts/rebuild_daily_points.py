@@ -0,0 +1,19 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.extensions import db
+from app.models import DailyUserPoints, DataVersion
+
+app = create_app()
+
+def rebuild():
+    with app.app_context():
+        print("Rebuilding daily_user_points from chore_log...")
+        DailyUserPoints.rebuild()
+        DataVersion.bump('users')
+        db.session.commit()
+        print(f"Rollup now has {DailyUserPoints.query.count()} rows.")
+
+if __name__ == "__main__":
+    rebuild()
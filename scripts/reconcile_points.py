@@ -0,0 +1,36 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.reconcile import reconcile
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(description="Check users' total_points against their completion history.")
+    parser.add_argument('--full', action='store_true', help="Sum all history, not just logs since the last run")
+    parser.add_argument('--repair', action='store_true', help="Correct drifted totals")
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+        report = reconcile(full=args.full, repair=args.repair)
+
+    print(f"{report['mode'].capitalize()} check of {report['users_checked']} users in {report['seconds']}s "
+          f"(log high-water mark {report['high_water_mark']}).")
+    for d in report['drifted']:
+        print(f"  {d['username']} (id {d['user_id']}): total_points {d['total_points']}, "
+              f"history {d['expected']}, drift {d['drift']:+d}")
+    if report['conflict']:
+        print("Another run finished first; nothing was saved or repaired. Run again.")
+    elif report['drifted']:
+        print(f"Repaired {report['repaired']} users." if args.repair else "Run with --repair to correct them.")
+    else:
+        print("No drift.")
+    if report['drifted'] and not report['repaired']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.reminders import ReminderScheduler
+import argparse
+
+app = create_app()
+
+def main():
+    parser = argparse.ArgumentParser(description="Email due reminders for scheduled chores.")
+    parser.add_argument('--concurrency', type=int, default=app.config['REMINDER_CONCURRENCY'])
+    parser.add_argument('--once', action='store_true', help="Send what is due now and exit")
+    args = parser.parse_args()
+
+    with app.app_context():
+        init_db()
+    scheduler = ReminderScheduler(app, concurrency=args.concurrency)
+    if args.once:
+        counts = scheduler.run_once()
+        print(f"Reminders: {counts}")
+        scheduler.stop()
+        return
+
+    print(f"Reminder scheduler running with concurrency {scheduler.concurrency}. Ctrl+C to stop.")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import create_app
 from app.extensions import db
 from app.models import User
 
+app = create_app()
+
 def seed_admin():
     with app.app_context():
         # WARNING: This will reset the database to ensure schema changes are applied
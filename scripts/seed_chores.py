@@ -1,12 +1,14 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import create_app
 from app.extensions import db
-from app.models import Chore, User, ChoreLog
+from app.models import Chore, User, ChoreLog, DailyUserPoints, DataVersion
 from datetime import datetime, timedelta
 import random
 
+app = create_app()
+
 def seed_data():
     with app.app_context():
         print("Starting seed process...")
@@ -105,9 +107,12 @@ def seed_data():
             
             # Update user points (approximate, since we are re-seeding)
             user.total_points += chore.points
+            chore.mark_completed(completed_time)
+            DailyUserPoints.record(user.id, completed_time, chore.points)
             
             db.session.add(log)
         
+        DataVersion.bump(*DataVersion.NAMES)
         db.session.commit()
         print("Database seeded successfully with Users, Pictures, Chores, Locations, and History!")
 
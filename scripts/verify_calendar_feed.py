@@ -0,0 +1,118 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreSchedule, OutboundEmail, ScheduleOccurrence
+from app.ical import fold
+from app.cache import stats
+from datetime import datetime, timedelta
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def logged_in_client(user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+def verify():
+    anonymous = app.test_client()
+    now = datetime.utcnow().replace(microsecond=0)
+
+    ok = True
+    folded = fold('DESCRIPTION:' + 'é' * 100)
+    ok &= check(all(len(line.encode('utf-8')) <= 75 for line in folded.split('\r\n')) and
+                folded.replace('\r\n ', '') == 'DESCRIPTION:' + 'é' * 100,
+                "long lines fold at 75 octets without splitting characters")
+
+    with app.app_context():
+        user = User(username="CalendarVerifier", email="calendar@example.com")
+        chores = [Chore(title="Feed Chore, with; specials", points=4, description="Line one\nLine two"),
+                  Chore(title="Feed Chore Two", points=2)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+
+    client = logged_in_client(user_id)
+    try:
+        start = now + timedelta(days=2)
+        client.post(f'/api/chores/{chore_ids[0]}/invite', json={
+            'user_id': user_id, 'datetime': start.isoformat() + 'Z', 'recurrence': 'biweekly'})
+
+        url = client.get(f'/api/users/{user_id}/calendar').get_json()['url']
+        ok &= check(anonymous.get(f'/api/users/{user_id}/calendar.ics').status_code == 403,
+                    "the feed needs a token without a login")
+        ok &= check(anonymous.get(f'/api/users/{user_id}/calendar.ics?token=wrong').status_code == 403,
+                    "a wrong token is refused")
+
+        res = anonymous.get(url)
+        body = res.get_data(as_text=True)
+        ok &= check(res.status_code == 200 and res.mimetype == 'text/calendar'
+                    and 'Content-Length' not in res.headers, "the token URL streams text/calendar")
+        ok &= check(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n') and
+                    body.count('BEGIN:VEVENT') == 1, "one VEVENT per schedule")
+        stamp = start.strftime('%Y%m%dT%H%M%S')
+        ok &= check(f'UID:chore-{chore_ids[0]}-{stamp}@chore-chart' in body and f'DTSTART:{stamp}Z' in body,
+                    "the feed shares its UID with the emailed invite")
+        ok &= check('RRULE:FREQ=WEEKLY;INTERVAL=2' in body and 'SUMMARY:Chore: Feed Chore\\, with\\; specials' in body
+                    and 'Line one\\nLine two' in body.replace('\r\n ', ''),
+                    "recurrence and escaped text are written")
+        with app.app_context():
+            invite = OutboundEmail.query.filter_by(recipient_email='calendar@example.com').first()
+            ok &= check(invite is not None and f'UID:chore-{chore_ids[0]}-{stamp}@chore-chart' in invite.ics_content,
+                        "invites are written by the same VEVENT writer")
+
+        etag, modified = res.headers['ETag'], res.headers['Last-Modified']
+        ok &= check(anonymous.get(url, headers={'If-None-Match': etag}).status_code == 304, "If-None-Match gives 304")
+        ok &= check(anonymous.get(url, headers={'If-Modified-Since': modified}).status_code == 304,
+                    "If-Modified-Since gives 304")
+        cached = anonymous.get(url)
+        ok &= check(stats.snapshot()['calendar']['hits'] == 1 and cached.get_data(as_text=True) == body,
+                    "the next request is served from cache")
+
+        # Another user's schedule leaves this feed alone; this user's new one moves it
+        with app.app_context():
+            other = User(username="CalendarVerifierOther")
+            db.session.add(other)
+            db.session.flush()
+            db.session.add(ChoreSchedule(chore_id=chore_ids[1], user_id=other.id, scheduled_at=now))
+            db.session.commit()
+        ok &= check(anonymous.get(url, headers={'If-None-Match': etag}).status_code == 304,
+                    "other users' schedules do not change the feed")
+        client.post('/api/schedules/bulk', json={'entries': [
+            {'chore_id': chore_ids[1], 'user_id': user_id, 'datetime': (now + timedelta(days=5)).isoformat() + 'Z'}]})
+        res = anonymous.get(url, headers={'If-None-Match': etag})
+        ok &= check(res.status_code == 200 and res.get_data(as_text=True).count('BEGIN:VEVENT') == 2,
+                    "a new schedule for this user rebuilds the feed")
+
+        etag = res.headers['ETag']
+        client.delete(f'/api/chores/{chore_ids[1]}')
+        res = anonymous.get(url, headers={'If-None-Match': etag})
+        ok &= check(res.status_code == 200 and res.get_data(as_text=True).count('BEGIN:VEVENT') == 1,
+                    "deleting a chore drops its events")
+    finally:
+        with app.app_context():
+            # Clean up
+            OutboundEmail.query.filter_by(recipient_email='calendar@example.com').delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter(ScheduleOccurrence.chore_id.in_(chore_ids)).delete(synchronize_session=False)
+            ChoreSchedule.query.filter(ChoreSchedule.chore_id.in_(chore_ids)).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter(User.username.in_(['CalendarVerifier', 'CalendarVerifierOther'])) \
+                .delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
@@ -1,11 +1,16 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import create_app
+from app.migrations import init_db
 from app.extensions import db
 from app.models import Chore, User, ChoreLog
 from datetime import datetime, timedelta
 
+app = create_app()
+with app.app_context():
+    init_db()
+
 def verify():
     with app.app_context():
         # Create a test user if needed
@@ -33,6 +38,7 @@ def verify():
         now = datetime.utcnow()
         log = ChoreLog(chore_id=chore.id, user_id=user.id, points_earned=10, completed_at=now)
         db.session.add(log)
+        chore.mark_completed(now)
         db.session.commit()
 
         # Check again
@@ -0,0 +1,120 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.archive import archive_chores, CHECKPOINT
+from app.migrations import init_db
+from app.extensions import db
+from app.models import (Chore, ChoreArchive, User, ChoreLog, ChoreSchedule, DailyUserPoints,
+                        MaintenanceCheckpoint, ScheduleOccurrence)
+from app.sync import encode_token
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+app = create_app({'LOGIN_DISABLED': True, 'SYNC_SAFETY_SECONDS': 0})
+with app.app_context():
+    init_db()
+
+# Backdated far enough that only this script's chores fall before the cutoff
+DELETED_AT = datetime(2000, 1, 1)
+CUTOFF_DAYS = (datetime.utcnow() - datetime(2001, 1, 1)).days
+ONE_OFFS = 5
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def query_plans(client, url):
+    plans = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM chore ' in statement:
+            plans.append(' '.join(str(r[-1]) for r in
+                                  conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)))
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    return plans
+
+def verify():
+    client = app.test_client()
+
+    with app.app_context():
+        user = User(username="ArchiveVerifier")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    chore_ids = []
+    ok = True
+    try:
+        for i in range(ONE_OFFS + 1):
+            res = client.post('/api/chores', json={'title': f'Archive One-off {i}', 'points': 2})
+            chore_ids.append(res.get_json()['id'])
+            client.post(f'/api/chores/{chore_ids[-1]}/complete', json={'user_id': user_id})
+        archived_ids, newest = chore_ids[:-1], chore_ids[-1]
+
+        with app.app_context():
+            db.session.add(ChoreSchedule(chore_id=archived_ids[0], user_id=user_id,
+                                         scheduled_at=datetime.utcnow() + timedelta(days=1)))
+            Chore.query.filter(Chore.id.in_(chore_ids)).update({Chore.updated_at: DELETED_AT},
+                                                               synchronize_session=False)
+            MaintenanceCheckpoint.load(CHECKPOINT).position = 0
+            db.session.commit()
+            token = encode_token(DELETED_AT - timedelta(days=1))
+
+            first = archive_chores(CUTOFF_DAYS, batch_size=2, pause=0, max_batches=1)
+            ok &= check(first['archived'] == 2 and not first['finished'],
+                        f"a run stopped after one batch archives one batch ({first})")
+            position = MaintenanceCheckpoint.load(CHECKPOINT).position
+            ok &= check(position == archived_ids[1], f"the checkpoint records the last archived id ({position})")
+
+            rest = archive_chores(CUTOFF_DAYS, batch_size=2, pause=0)
+            ok &= check(rest['resumed_from'] == archived_ids[1] and rest['archived'] == ONE_OFFS - 2
+                        and rest['finished'], f"the next run resumes from the checkpoint ({rest})")
+            ok &= check(MaintenanceCheckpoint.load(CHECKPOINT).position == 0, "a finished pass resets the checkpoint")
+            db.session.commit()
+
+            live = {c for (c,) in db.session.query(Chore.id).filter(Chore.id.in_(chore_ids))}
+            ok &= check(live == {newest}, "archived chores leave the chore table; the newest id stays")
+            moved = {c for (c,) in db.session.query(ChoreArchive.id).filter(ChoreArchive.id.in_(chore_ids))}
+            ok &= check(moved == set(archived_ids), "they are in chore_archive under the same ids")
+            ok &= check(not ChoreSchedule.query.filter_by(chore_id=archived_ids[0]).count(),
+                        "their schedules are dropped")
+
+            log = ChoreLog.query.filter_by(chore_id=archived_ids[0]).first()
+            ok &= check(log.to_dict()['chore_title'] == 'Archive One-off 0', "ChoreLog.to_dict() resolves archived titles")
+
+        history = client.get('/api/stats/history?after=&per_page=100').get_json()['logs']
+        titles = {l['chore_id']: l['chore_title'] for l in history if l['user_id'] == user_id}
+        ok &= check(all(titles.get(c) == f'Archive One-off {i}' for i, c in enumerate(chore_ids)),
+                    "history still shows the titles of archived chores")
+
+        body = client.get('/api/chores', query_string={'since': token}).get_json()
+        ok &= check(set(archived_ids) <= set(body['deleted']), "sync tokens older than the archival still get tombstones")
+
+        for url, index in (('/api/chores', 'ix_chore_active_created_at'),
+                           ('/api/chores?overdue=true&sort=due', 'ix_chore_active_next_due_at')):
+            with app.app_context():
+                plans = query_plans(client, url)
+            ok &= check(any(index in p for p in plans), f"{url} reads the partial index {index}")
+    finally:
+        with app.app_context():
+            # Clean up
+            ChoreLog.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreArchive.query.filter(ChoreArchive.id.in_(chore_ids)).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
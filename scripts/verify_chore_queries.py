@@ -0,0 +1,82 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, ChoreSchedule, ScheduleOccurrence
+from sqlalchemy import event
+from datetime import datetime, timedelta
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+def count_board_queries(client):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        res = client.get('/api/chores')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+
+    assert res.status_code == 200, res.status_code
+    return len(statements), len(res.get_json())
+
+def add_chores(user, count):
+    """Add recurring chores, each with history and an upcoming schedule."""
+    now = datetime.utcnow()
+    created = []
+    for i in range(count):
+        chore = Chore(title=f"Query Count Chore {i}", points=5, is_recurring=True)
+        db.session.add(chore)
+        db.session.flush()
+        for days_ago in range(3):
+            db.session.add(ChoreLog(chore_id=chore.id, user_id=user.id, points_earned=5,
+                                    completed_at=now - timedelta(days=days_ago)))
+        db.session.add(ChoreSchedule(chore_id=chore.id, user_id=user.id,
+                                     scheduled_at=now + timedelta(days=1)))
+        created.append(chore)
+    db.session.commit()
+    return created
+
+def verify():
+    app.config['LOGIN_DISABLED'] = True
+    client = app.test_client()
+
+    with app.app_context():
+        user = User(username="QueryCountVerifier")
+        db.session.add(user)
+        db.session.commit()
+
+        created = []
+        try:
+            created += add_chores(user, 5)
+            small_queries, small_rows = count_board_queries(client)
+
+            created += add_chores(user, 50)
+            large_queries, large_rows = count_board_queries(client)
+
+            print(f"{small_rows} chores -> {small_queries} queries")
+            print(f"{large_rows} chores -> {large_queries} queries")
+            if small_queries == large_queries:
+                print("SUCCESS: GET /api/chores query count does not grow with the number of chores")
+            else:
+                print("FAILURE: GET /api/chores query count grows with the number of chores")
+                sys.exit(1)
+        finally:
+            # Clean up
+            ids = [c.id for c in created]
+            ChoreLog.query.filter(ChoreLog.chore_id.in_(ids)).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter(ScheduleOccurrence.chore_id.in_(ids)).delete(synchronize_session=False)
+            ChoreSchedule.query.filter(ChoreSchedule.chore_id.in_(ids)).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(ids)).delete(synchronize_session=False)
+            db.session.delete(user)
+            db.session.commit()
+
+if __name__ == "__main__":
+    verify()
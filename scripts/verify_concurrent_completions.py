@@ -0,0 +1,114 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, DailyUserPoints
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import random
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+def hammer(worker_id, users, recurring_ids, one_off_ids, rounds):
+    """One thread's share of completions, mixing single and batch calls."""
+    client = app.test_client()
+    rng = random.Random(worker_id)
+    statuses = []
+    for _ in range(rounds):
+        if rng.random() < 0.3:
+            completions = [{'chore_id': rng.choice(recurring_ids + one_off_ids), 'user_id': rng.choice(users)}
+                           for _ in range(rng.randint(2, 6))]
+            res = client.post('/api/chores/complete-batch', json={'completions': completions})
+        else:
+            res = client.post(f'/api/chores/{rng.choice(recurring_ids + one_off_ids)}/complete',
+                              json={'user_id': rng.choice(users)})
+        statuses.append(res.status_code)
+    return statuses
+
+def verify():
+    parser = argparse.ArgumentParser(description="Concurrent completions must never lose or double-count points.")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=25)
+    args = parser.parse_args()
+
+    app.config['LOGIN_DISABLED'] = True
+    with app.app_context():
+        users = [User(username=f"StressUser{i}", total_points=0) for i in range(4)]
+        recurring = [Chore(title=f"Stress Recurring {i}", points=3 + i, is_recurring=True) for i in range(3)]
+        one_off = [Chore(title=f"Stress One-off {i}", points=10 + i) for i in range(20)]
+        db.session.add_all(users + recurring + one_off)
+        db.session.commit()
+        user_ids = [u.id for u in users]
+        recurring_ids = [c.id for c in recurring]
+        one_off_ids = [c.id for c in one_off]
+        chore_ids = recurring_ids + one_off_ids
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            futures = [pool.submit(hammer, i, user_ids, recurring_ids, one_off_ids, args.rounds)
+                       for i in range(args.threads)]
+            statuses = [s for f in futures for s in f.result()]
+
+        with app.app_context():
+            totals = dict(db.session.query(User.id, User.total_points).filter(User.id.in_(user_ids)))
+            earned = dict(db.session.query(ChoreLog.user_id, db.func.sum(ChoreLog.points_earned))
+                          .filter(ChoreLog.user_id.in_(user_ids)).group_by(ChoreLog.user_id))
+            per_one_off = dict(db.session.query(ChoreLog.chore_id, db.func.count(ChoreLog.id))
+                               .filter(ChoreLog.chore_id.in_(one_off_ids)).group_by(ChoreLog.chore_id))
+
+        counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+        print(f"{len(statuses)} requests from {args.threads} threads: {counts}")
+
+        ok = True
+        for user_id in user_ids:
+            if totals[user_id] != earned.get(user_id, 0):
+                ok = False
+                print(f"FAILURE: user {user_id} total_points={totals[user_id]} but SUM(points_earned)={earned.get(user_id, 0)}")
+        if ok:
+            print("SUCCESS: every total_points matches SUM(ChoreLog.points_earned)")
+
+        doubled = {c: n for c, n in per_one_off.items() if n > 1}
+        if doubled:
+            ok = False
+            print(f"FAILURE: one-off chores completed more than once: {doubled}")
+        else:
+            print(f"SUCCESS: {len(per_one_off)} one-off chores completed exactly once each")
+
+        # Offset timestamps are stored as UTC; future ones are refused per entry
+        local = (datetime.utcnow() - timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        future = (datetime.utcnow() + timedelta(hours=1)).isoformat() + 'Z'
+        res = app.test_client().post('/api/chores/complete-batch', json={'completions': [
+            {'chore_id': recurring_ids[0], 'user_id': user_ids[0], 'completed_at': local.isoformat() + '+02:00'},
+            {'chore_id': recurring_ids[1], 'user_id': user_ids[0], 'completed_at': future}]}).get_json()
+        with app.app_context():
+            stored = db.session.query(ChoreLog.id).filter(ChoreLog.chore_id == recurring_ids[0],
+                                                          ChoreLog.completed_at == local - timedelta(hours=2)).count()
+        if res['results'][0]['status'] == 'completed' and stored == 1:
+            print("SUCCESS: an offset completed_at is stored as UTC")
+        else:
+            ok = False
+            print(f"FAILURE: an offset completed_at is stored as UTC ({res['results'][0]}, {stored} logs at UTC time)")
+        if res['results'][1]['status'] == 'error' and 'future' in res['results'][1]['error']:
+            print("SUCCESS: a completed_at in the future is an entry error")
+        else:
+            ok = False
+            print(f"FAILURE: a completed_at in the future is an entry error ({res['results'][1]})")
+
+        if not ok:
+            sys.exit(1)
+    finally:
+        with app.app_context():
+            # Clean up
+            ChoreLog.query.filter(ChoreLog.chore_id.in_(chore_ids)).delete(synchronize_session=False)
+            DailyUserPoints.query.filter(DailyUserPoints.user_id.in_(user_ids)).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+if __name__ == "__main__":
+    verify()
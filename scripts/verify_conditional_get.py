@@ -0,0 +1,92 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, DailyUserPoints
+from sqlalchemy import event
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+def get(client, url, etag=None):
+    """GET url, returning (response, SQL statements run)."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    headers = {'If-None-Match': etag} if etag else {}
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        res = client.get(url, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    return res, statements
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def verify():
+    app.config['LOGIN_DISABLED'] = True
+    client = app.test_client()
+    urls = ['/api/chores', '/api/users', '/api/stats/history?page=1', '/api/stats/charts?days=7']
+
+    with app.app_context():
+        user = User(username="ETagVerifier")
+        chore = Chore(title="ETag Chore", points=4, is_recurring=True, recurrence_days=3)
+        db.session.add_all([user, chore])
+        db.session.commit()
+        user_id, chore_id = user.id, chore.id
+
+        ok = True
+        try:
+            tags = {}
+            for url in urls:
+                first, _ = get(client, url)
+                etag = first.headers.get('ETag')
+                ok &= check(first.status_code == 200 and bool(etag) and not etag.startswith('W/'),
+                            f"{url} returns a strong ETag")
+                ok &= check('no-cache' in first.headers.get('Cache-Control', ''), f"{url} sends Cache-Control: no-cache")
+
+                again, statements = get(client, url, etag)
+                touches_tables = [s for s in statements if 'data_version' not in s and 'max(' not in s]
+                ok &= check(again.status_code == 304 and not again.data,
+                            f"{url} answers a matching If-None-Match with an empty 304")
+                ok &= check(not touches_tables,
+                            f"{url} 304 runs {len(statements)} counter lookup(s) and no table queries")
+                tags[url] = etag
+
+            res = client.post(f'/api/chores/{chore_id}/complete', json={'user_id': user_id})
+            assert res.status_code == 200, res.get_json()
+            for url in urls:
+                after, _ = get(client, url, tags[url])
+                ok &= check(after.status_code == 200 and after.headers.get('ETag') != tags[url],
+                            f"{url} changes after a completion")
+                tags[url] = after.headers.get('ETag')
+
+            res = client.put(f'/api/users/{user_id}', json={'first_name': 'Etag'})
+            assert res.status_code == 200
+            after, _ = get(client, '/api/users', tags['/api/users'])
+            ok &= check(after.status_code == 200, "/api/users changes after a profile update")
+            unchanged, _ = get(client, '/api/users', after.headers.get('ETag'))
+            ok &= check(unchanged.status_code == 304, "/api/users is 304 again once refetched")
+
+            other, _ = get(client, '/api/stats/charts?days=30', tags['/api/stats/charts?days=7'])
+            ok &= check(other.status_code == 200, "ETags differ between query strings")
+        finally:
+            # Clean up
+            ChoreLog.query.filter_by(chore_id=chore_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter_by(id=chore_id).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,83 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from sqlalchemy import event
+from datetime import date, timedelta
+import re
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+# Every read endpoint the dashboard and stats pages hit
+ENDPOINTS = [
+    '/api/chores',
+    '/api/chores?overdue=true',
+    '/api/users',
+    '/api/users/1',
+    '/api/stats/history?page=1&per_page=10',
+    '/api/stats/history?after=&include_total=1',
+    '/api/stats/history?after=MjAyNi0wMS0wMVQwMDowMDowMCwx',
+    '/api/stats/charts',
+    '/api/stats/history/summary',
+    f'/api/schedules?from={date.today()}&to={date.today() + timedelta(days=30)}',
+    '/api/users/1/calendar.ics',
+]
+
+# A plain "SCAN <table>" (no USING ... INDEX) is a full table scan.
+# "SCAN CONSTANT ROW" is a SELECT without FROM (the ETag clock lookup).
+FULL_SCAN = re.compile(r'\bSCAN (?!CONSTANT ROW)(\w+)\b(?! USING)')
+
+# Rollup tables hold one row per user per day; scanning them is the point
+ROLLUP_TABLES = {'daily_user_points', 'chore_log_summary'}
+
+def capture_selects(client, url):
+    captured = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        res = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+
+    assert res.status_code in (200, 404), f"{url} -> {res.status_code}"
+    return captured
+
+def verify():
+    app.config['LOGIN_DISABLED'] = True
+    client = app.test_client()
+    failures = 0
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            print("EXPLAIN QUERY PLAN check only supports SQLite.")
+            return
+
+        for url in ENDPOINTS:
+            for statement, parameters in capture_selects(client, url):
+                with db.engine.connect() as conn:
+                    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                details = [row[-1] for row in plan]
+                scans = [m.group(1) for d in details for m in [FULL_SCAN.search(d)]
+                         if m and m.group(1) not in ROLLUP_TABLES]
+                if scans:
+                    failures += 1
+                    print(f"FAILURE: {url} full scan of {', '.join(scans)}")
+                    print(f"    {' '.join(statement.split())}")
+                    for d in details:
+                        print(f"    -> {d}")
+                else:
+                    print(f"SUCCESS: {url} {'; '.join(details)}")
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
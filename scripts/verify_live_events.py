@@ -0,0 +1,164 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, ChoreSchedule, DailyUserPoints, OutboundEmail, ScheduleOccurrence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from werkzeug.test import EnvironBuilder
+import json
+import threading
+import time
+
+app = create_app({'LOGIN_DISABLED': True, 'EVENTS_HEARTBEAT_SECONDS': 0.1})
+with app.app_context():
+    init_db()
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+class Stream:
+    """Reads SSE messages from a streamed test client response."""
+
+    def __init__(self, client, last_event_id=None):
+        headers = {'Last-Event-ID': last_event_id} if last_event_id else {}
+        self.response = client.get('/api/events', headers=headers, buffered=False)
+        self.chunks = iter(self.response.response)
+        self.buffer = ''
+
+    def messages(self, count, timeout=5):
+        """The next `count` events as dicts with id, event and data; keepalives are skipped."""
+        found = []
+        deadline = time.monotonic() + timeout
+        while len(found) < count and time.monotonic() < deadline:
+            chunk = next(self.chunks)
+            self.buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+            while '\n\n' in self.buffer:
+                block, self.buffer = self.buffer.split('\n\n', 1)
+                fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line and not line.startswith(':'))
+                if 'event' in fields:
+                    fields['data'] = json.loads(fields['data'])
+                    found.append(fields)
+        return found
+
+    def close(self):
+        self.response.close()
+
+def verify():
+    client = app.test_client()
+    broker = app.extensions['events']
+
+    with app.app_context():
+        user = User(username="LiveEventsVerifier", email="live@example.com")
+        chore = Chore(title="Live Chore", points=7, is_recurring=True, recurrence_days=2)
+        db.session.add_all([user, chore])
+        db.session.commit()
+        user_id, chore_id = user.id, chore.id
+
+    ok = True
+    created_id = None
+    streams = []
+    try:
+        stream = Stream(client)
+        streams.append(stream)
+        ok &= check(stream.response.mimetype == 'text/event-stream', "/api/events is an event stream")
+
+        res = client.post('/api/chores', json={'title': 'Live One-off', 'points': 3})
+        created_id = res.get_json()['id']
+        client.put(f'/api/chores/{created_id}', json={'points': 4})
+        client.post(f'/api/chores/{chore_id}/complete', json={'user_id': user_id})
+        client.post(f'/api/chores/{chore_id}/invite', json={
+            'user_id': user_id, 'datetime': (datetime.utcnow() + timedelta(days=1)).isoformat() + 'Z'})
+        client.put(f'/api/users/{user_id}', json={'first_name': 'Live'})
+        client.delete(f'/api/chores/{created_id}')
+        rejected = client.post(f'/api/chores/{created_id}/complete', json={'user_id': user_id})
+
+        received = stream.messages(8)
+        kinds = [m['event'] for m in received]
+        expected = ['chore.created', 'chore.updated', 'chore.completed', 'user.points',
+                    'schedule.added', 'user.updated', 'chore.deleted']
+        ok &= check(kinds[:7] == expected, f"writes arrive as deltas in commit order ({kinds})")
+        by_kind = {m['event']: m['data'] for m in received}
+        ok &= check(by_kind.get('chore.updated', {}).get('points') == 4, "chore.updated carries the edited chore")
+        completed = by_kind.get('chore.completed', {})
+        ok &= check(completed.get('chore_id') == chore_id and completed.get('next_due_at') is not None,
+                    "chore.completed carries the new due date")
+        with app.app_context():
+            total = db.session.get(User, user_id).total_points
+        ok &= check(by_kind.get('user.points') == {'id': user_id, 'total_points': total},
+                    f"user.points carries the new total ({total})")
+        ok &= check(by_kind.get('schedule.added', {}).get('user_name') == 'LiveEventsVerifier',
+                    "schedule.added matches the board's schedule entries")
+        ok &= check(rejected.status_code == 409 and len(received) == 7,
+                    "a rolled-back completion publishes nothing")
+
+        # Reconnect after the second event: exactly the rest, in order
+        resumed = Stream(client, received[1]['id'])
+        streams.append(resumed)
+        replay = resumed.messages(5)
+        ok &= check([m['id'] for m in replay] == [m['id'] for m in received[2:7]],
+                    "Last-Event-ID resumes right after the given event")
+
+        stale = Stream(client, 'deadbeef-3')
+        streams.append(stale)
+        ok &= check(stale.messages(1)[0]['event'] == 'reset', "an id from another process gets a reset")
+
+        # Straight through WSGI: the test client would pull the first chunk itself
+        open_before = broker.clients
+        environ = EnvironBuilder(path='/api/events').get_environ()
+        app.wsgi_app(environ, lambda status, headers, exc_info=None: None).close()
+        ok &= check(broker.clients == open_before, "a stream closed before its first chunk frees its slot")
+
+        limit = broker.max_clients
+        broker.max_clients = broker.clients
+        try:
+            ok &= check(client.get('/api/events').status_code == 503, "EVENTS_MAX_CLIENTS is enforced")
+        finally:
+            broker.max_clients = limit
+
+        # Fan-out: many idle subscribers, one publish
+        subscribers = 200
+        ready = threading.Barrier(subscribers + 1)
+
+        def listen(_):
+            sub = Stream(app.test_client())
+            next(sub.chunks)  # retry: line
+            ready.wait()
+            try:
+                return sub.messages(1, timeout=10)
+            finally:
+                sub.close()
+
+        with ThreadPoolExecutor(max_workers=subscribers) as pool:
+            futures = [pool.submit(listen, i) for i in range(subscribers)]
+            ready.wait()
+            start = time.perf_counter()
+            client.put(f'/api/chores/{chore_id}', json={'points': 8})
+            results = [f.result() for f in futures]
+            elapsed = time.perf_counter() - start
+        delivered = sum(1 for r in results if r and r[0]['event'] == 'chore.updated')
+        ok &= check(delivered == subscribers,
+                    f"one update reaches all {subscribers} idle subscribers ({delivered} in {elapsed * 1000:.0f} ms)")
+    finally:
+        for s in streams:
+            s.close()
+        with app.app_context():
+            # Clean up
+            job_ids = [j for (j,) in db.session.query(OutboundEmail.id).filter_by(recipient_email='live@example.com')]
+            OutboundEmail.query.filter(OutboundEmail.id.in_(job_ids)).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreLog.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_([chore_id, created_id or -1])).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
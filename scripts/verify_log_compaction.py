@@ -0,0 +1,108 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.compaction import compact_logs, CHECKPOINT
+from app.migrations import init_db
+from app.extensions import db
+from app.models import (Chore, User, ChoreLog, ChoreLogSummary, DailyUserPoints, MaintenanceCheckpoint)
+from datetime import datetime, timedelta
+
+app = create_app({'LOGIN_DISABLED': True})
+with app.app_context():
+    init_db()
+
+# Backdated far enough that only this script's logs fall before the horizon (2002-01-01)
+MONTHS = [datetime(2001, 1, 10), datetime(2001, 2, 10), datetime(2001, 3, 10)]
+PER_MONTH = 10
+RETENTION_DAYS = (datetime.utcnow() - datetime(2002, 1, 15)).days
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def user_points(user_id):
+    total = db.session.get(User, user_id).total_points
+    daily = db.session.query(db.func.sum(DailyUserPoints.points)).filter_by(user_id=user_id).scalar()
+    return total, daily
+
+def verify():
+    client = app.test_client()
+
+    with app.app_context():
+        user = User(username="CompactionVerifier")
+        chores = [Chore(title="Compaction Chore A", points=3, is_recurring=True),
+                  Chore(title="Compaction Chore B", points=5, is_recurring=True)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+
+        for start in MONTHS:
+            for i in range(PER_MONTH):
+                ChoreLog.record(chores[i % 2], user_id, start + timedelta(hours=i))
+        db.session.commit()
+        before = user_points(user_id)
+        MaintenanceCheckpoint.load(CHECKPOINT).position = 0
+        db.session.commit()
+
+    ok = True
+    try:
+        with app.app_context():
+            first = compact_logs(RETENTION_DAYS, batch_size=7, pause=0, max_batches=2)
+            ok &= check(first['compacted'] == 14 and not first['finished'] and first['horizon'] == '2002-01-01',
+                        f"a run stopped after two chunks compacts two chunks ({first})")
+            ok &= check(MaintenanceCheckpoint.load(CHECKPOINT).position == first['position'] > 0,
+                        "the checkpoint records the last log compacted")
+
+            rest = compact_logs(RETENTION_DAYS, batch_size=7, pause=0)
+            ok &= check(rest['compacted'] == len(MONTHS) * PER_MONTH - 14 and rest['finished'],
+                        f"the next run compacts the rest ({rest})")
+            db.session.commit()
+
+            ok &= check(ChoreLog.query.filter_by(user_id=user_id).count() == 0, "compacted logs are deleted")
+            summaries = ChoreLogSummary.query.filter_by(user_id=user_id).all()
+            ok &= check(len(summaries) == len(MONTHS) * 2, f"one summary row per month and chore ({len(summaries)})")
+            ok &= check(sum(s.points for s in summaries) == before[0] and sum(s.count for s in summaries) == 30,
+                        "summaries add up to the compacted points and completions")
+            ok &= check(user_points(user_id) == before, f"user total and daily rollup are unchanged ({before})")
+
+            DailyUserPoints.rebuild()
+            db.session.commit()
+            ok &= check(user_points(user_id) == before, "rebuilding the daily rollup keeps compacted days")
+
+            user = db.session.get(User, user_id)
+            ok &= check(user.logs.count() == 0, "User.logs is a query, not a loaded list")
+
+        page = client.get('/api/stats/history?after=&include_total=1').get_json()
+        ok &= check(page['summarized_before'] == '2001-04', f"history points to the summaries ({page['summarized_before']})")
+        with app.app_context():
+            remaining = ChoreLog.query.count()
+        ok &= check(page['total'] == remaining, f"include_total counts the entries still listed ({page['total']})")
+
+        summary = client.get('/api/stats/history/summary?before=2001-04&months=2').get_json()
+        ok &= check([m['month'] for m in summary['months']] == ['2001-03', '2001-02'] and summary['next_before'] == '2001-02',
+                    "summary pages run newest first with a cursor")
+        march = summary['months'][0] if summary['months'] else {}
+        ok &= check(march.get('count') == PER_MONTH and
+                    {e['chore_title'] for e in march.get('entries', [])} == {'Compaction Chore A', 'Compaction Chore B'},
+                    "a summarized month lists its chores with counts and titles")
+        older = client.get(f"/api/stats/history/summary?before={summary['next_before']}").get_json()
+        ok &= check([m['month'] for m in older['months']] == ['2001-01'] and older['next_before'] is None,
+                    "the last summary page has no cursor")
+        ok &= check(client.get('/api/stats/history/summary?before=March').status_code == 400, "an invalid month is rejected")
+    finally:
+        with app.app_context():
+            # Clean up
+            ChoreLog.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreLogSummary.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,139 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreSchedule, OutboundEmail, ScheduleOccurrence
+from app.outbox import OutboxWorker
+from app.mail_transport import SMTPConnectionPool, SMTPTransport
+from email.message import EmailMessage
+from mail_standins import StandInAPI, StandInSMTP
+from datetime import datetime, timedelta
+import base64
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+failures = []
+
+def check(condition, message):
+    print(f"{'SUCCESS' if condition else 'FAILURE'}: {message}")
+    if not condition:
+        failures.append(message)
+
+def make_due(job_id):
+    """Skip the backoff wait so the next run_once() retries the job."""
+    OutboundEmail.query.filter_by(id=job_id).update({OutboundEmail.next_attempt_at: datetime.utcnow()})
+    db.session.commit()
+
+def invite(client, chore, user):
+    res = client.post(f'/api/chores/{chore.id}/invite', json={
+        'user_id': user.id,
+        'datetime': (datetime.utcnow() + timedelta(days=1)).isoformat() + 'Z',
+        'recurrence': 'weekly'
+    })
+    return res.status_code, res.get_json()
+
+def verify():
+    app.config['LOGIN_DISABLED'] = True
+    app.config['MAIL_MAX_ATTEMPTS'] = 3
+    client = app.test_client()
+    worker = OutboxWorker(app, concurrency=2)
+
+    with app.app_context():
+        user = User(username="OutboxVerifier", email="outbox@example.com")
+        chore = Chore(title="Outbox Verify Chore", points=5)
+        db.session.add_all([user, chore])
+        db.session.commit()
+        job_ids = []
+
+        try:
+            # 1. HTTP API delivery
+            with StandInAPI() as api:
+                app.config.update(MAIL_API_KEY='test-key', MAIL_API_URL=api.url)
+
+                status, body = invite(client, chore, user)
+                job_ids.append(body.get('job_id'))
+                check(status == 202 and body.get('job_id'), f"invite returns 202 with a job id ({status})")
+                check(client.get(f"/api/mail/jobs/{body['job_id']}").get_json()['status'] == 'pending',
+                      "job is pending before the worker runs")
+                check(len(api.requests) == 0, "no provider call happens inside the request")
+
+                worker.run_once()
+                check(client.get(f"/api/mail/jobs/{body['job_id']}").get_json()['status'] == 'sent',
+                      "worker delivers the job via the API")
+                ics = base64.b64decode(api.requests[-1]['attachment'][0]['content']).decode()
+                check('RRULE:FREQ=WEEKLY' in ics, "API payload carries the ICS attachment")
+
+                # 2. Retry with backoff, then dead-letter
+                api.fail_next = [503, 503, 503]
+                status, body = invite(client, chore, user)
+                job_ids.append(body['job_id'])
+                worker.run_once()
+                job = db.session.get(OutboundEmail, body['job_id'])
+                db.session.refresh(job)
+                check(job.status == 'pending' and job.attempts == 1 and job.next_attempt_at > datetime.utcnow(),
+                      "failed job is rescheduled with backoff")
+                for _ in range(2):
+                    make_due(job.id)
+                    worker.run_once()
+                db.session.refresh(job)
+                check(job.status == 'dead' and job.attempts == 3, "job is dead-lettered after max attempts")
+
+                # 3. Permanent errors are dead-lettered immediately
+                api.fail_next = [400]
+                status, body = invite(client, chore, user)
+                job_ids.append(body['job_id'])
+                worker.run_once()
+                check(client.get(f"/api/mail/jobs/{body['job_id']}").get_json()['status'] == 'dead',
+                      "4xx response is not retried")
+
+            # 4. SMTP delivery
+            with StandInSMTP() as smtp:
+                app.config.update(MAIL_API_KEY=None, MAIL_SERVER='127.0.0.1', MAIL_PORT=smtp.port,
+                                  MAIL_USERNAME='user', MAIL_PASSWORD='secret', MAIL_USE_TLS=False)
+                status, body = invite(client, chore, user)
+                job_ids.append(body['job_id'])
+                worker.run_once()
+                check(client.get(f"/api/mail/jobs/{body['job_id']}").get_json()['status'] == 'sent'
+                      and len(smtp.messages) == 1, "worker delivers the job via SMTP")
+
+            # 5. A refused recipient on a connection that then drops
+            with StandInSMTP() as smtp:
+                smtp.refuse, smtp.drop_on_rset = {'gone@example.com'}, True
+                pool = SMTPConnectionPool('127.0.0.1', smtp.port, 'user', 'secret', use_tls=False,
+                                          max_size=1, timeout=2)
+
+                def build_message(job, sender):
+                    message = EmailMessage()
+                    message['From'], message['To'], message['Subject'] = sender, job.recipient_email, 'Test'
+                    message.set_content('Test')
+                    return message
+
+                transport = SMTPTransport(pool, 'chores@example.com', build_message)
+                jobs = [OutboundEmail(id=-1, recipient_email='gone@example.com'),
+                        OutboundEmail(id=-2, recipient_email='outbox@example.com')]
+                results = transport.send_batch(jobs)
+                check(results[-1].permanent and results[-2] is not None and pool._open == 0,
+                      "a connection that drops on RSET is closed and leaves the pool")
+                smtp.refuse = set()
+                results = transport.send_batch(jobs[1:])
+                check(results[-2] is None, "the pool still hands out connections afterwards")
+                transport.close()
+        finally:
+            worker.stop()
+            # Clean up
+            OutboundEmail.query.filter(OutboundEmail.id.in_([j for j in job_ids if j])).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(chore_id=chore.id).delete()
+            ChoreSchedule.query.filter_by(chore_id=chore.id).delete()
+            db.session.delete(chore)
+            db.session.delete(user)
+            db.session.commit()
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,155 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+import logging
+import re
+import time
+
+app = create_app({'LOGIN_DISABLED': True, 'CACHE_BACKEND': 'none', 'METRICS_TRACE_SAMPLE_RATE': 1.0})
+with app.app_context():
+    init_db()
+
+SAMPLE = re.compile(r'^[a-z_]+(\{[^}]*\})? -?[0-9.e+-]+$|^[a-z_]+(\{[^}]*\})? \+Inf$')
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def sample(text, name, **labels):
+    """Value of one exposition line, or None."""
+    wanted = ','.join(f'{k}="{v}"' for k, v in labels.items())
+    for line in text.splitlines():
+        if line.startswith(name + '{') and line[len(name) + 1:].startswith(wanted):
+            rest = line[len(name) + 1 + len(wanted):]
+            if rest.startswith('}'):
+                return float(line.rsplit(' ', 1)[1])
+    return None
+
+class Captured(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+def requests_per_second(target, url, n):
+    client = target.test_client()
+    for _ in range(20):
+        client.get(url)
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(url)
+    return n / (time.perf_counter() - start)
+
+def verify():
+    client = app.test_client()
+    ok = True
+
+    with app.app_context():
+        user = User(username="MetricsVerifier")
+        chore = Chore(title="Metrics Chore", points=3)
+        db.session.add_all([user, chore])
+        db.session.commit()
+        user_id, chore_id = user.id, chore.id
+
+    try:
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', on_execute)
+        try:
+            for _ in range(3):
+                client.get('/api/users')
+        finally:
+            with app.app_context():
+                event.remove(db.engine, 'before_cursor_execute', on_execute)
+        client.get('/no/such/page')
+
+        res = client.get('/metrics')
+        text = res.get_data(as_text=True)
+        ok &= check(res.status_code == 200 and res.mimetype == 'text/plain', "/metrics serves text/plain")
+        bad = [l for l in text.splitlines() if not l.startswith('#') and not SAMPLE.match(l)]
+        ok &= check(not bad, f"every sample line is valid exposition format ({bad[:2]})")
+
+        count = sample(text, 'chore_chart_http_requests_total', endpoint='users.handle_users', method='GET', status='200')
+        ok &= check(count == 3, f"request counter for users.handle_users is 3 ({count})")
+        ok &= check(sample(text, 'chore_chart_http_requests_total', endpoint='unmatched', method='GET', status='404') == 1,
+                    "unmatched URLs are counted under a single label")
+        latency = sample(text, 'chore_chart_http_request_duration_seconds_count', endpoint='users.handle_users', method='GET')
+        ok &= check(latency == 3, "latency histogram has 3 observations")
+        sql_sum = sample(text, 'chore_chart_db_statements_per_request_sum', endpoint='users.handle_users', method='GET')
+        ok &= check(sql_sum == len(statements), f"statement histogram matches the engine ({sql_sum} vs {len(statements)})")
+        size = sample(text, 'chore_chart_http_response_size_bytes_count', endpoint='users.handle_users', method='GET')
+        ok &= check(size == 3, "response sizes are recorded")
+
+        traces = client.get('/metrics/traces').get_json()
+        user_traces = [t for t in traces if t['endpoint'] == 'users.handle_users']
+        ok &= check(len(user_traces) == 3 and all(t['statements'] for t in user_traces),
+                    "sampled requests keep their SQL statements")
+
+        captured = Captured()
+        app.logger.addHandler(captured)
+        try:
+            slow_app = create_app({'LOGIN_DISABLED': True, 'METRICS_SLOW_QUERY_MS': 0, 'CACHE_BACKEND': 'none'})
+            slow_app.test_client().get(f'/api/users/{user_id}')
+            text = slow_app.test_client().get('/metrics').get_data(as_text=True)
+        finally:
+            app.logger.removeHandler(captured)
+        slow = [m for m in captured.messages if m.startswith('Slow query') and 'users.get_user' in m]
+        ok &= check(bool(slow), f"slow queries are logged with their endpoint ({slow[:1]})")
+        ok &= check((sample(text, 'chore_chart_db_slow_statements_total', endpoint='users.get_user') or 0) > 0,
+                    "slow statements are counted")
+
+        # Statements that raise never reach after_cursor_execute
+        with app.app_context(), db.engine.connect() as conn:
+            for _ in range(20):
+                try:
+                    conn.exec_driver_sql('SELECT * FROM no_such_table')
+                except OperationalError:
+                    pass
+            leftover = sum(len(v) for v in conn.info.values() if isinstance(v, list))
+        ok &= check(leftover == 0, "failed statements leave no timing state on the pooled connection")
+
+        closed = create_app({'CACHE_BACKEND': 'none'}).test_client()
+        ok &= check(closed.get('/metrics').status_code == 401 and closed.get('/metrics/traces').status_code == 401,
+                    "without METRICS_TOKEN the metrics need a login")
+        locked = create_app({'LOGIN_DISABLED': True, 'METRICS_TOKEN': 's3cret'}).test_client()
+        ok &= check(locked.get('/metrics').status_code == 401, "METRICS_TOKEN protects /metrics")
+        ok &= check(locked.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200,
+                    "the bearer token unlocks /metrics")
+
+        # Overhead with the production defaults (1% sampling) against metrics off
+        on = create_app({'LOGIN_DISABLED': True, 'CACHE_BACKEND': 'none'})
+        off = create_app({'LOGIN_DISABLED': True, 'CACHE_BACKEND': 'none', 'METRICS_ENABLED': False})
+        url = f'/api/users/{user_id}'
+        rates = {'off': [], 'on': []}
+        # Interleaved rounds, best of each, so machine noise affects both sides alike
+        for _ in range(8):
+            rates['off'].append(requests_per_second(off, url, 200))
+            rates['on'].append(requests_per_second(on, url, 200))
+        best_off, best_on = max(rates['off']), max(rates['on'])
+        overhead_us = (1 / best_on - 1 / best_off) * 1e6
+        print(f"   {url}: {best_off:.0f} req/s without metrics, {best_on:.0f} req/s with ({overhead_us:+.0f} us/request)")
+        ok &= check(best_on >= best_off * 0.85, "metrics cost less than 15% on a cheap endpoint")
+    finally:
+        with app.app_context():
+            # Clean up
+            Chore.query.filter_by(id=chore_id).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,140 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, DailyUserPoints, MaintenanceCheckpoint
+from app import reconcile as reconcile_module
+from app.reconcile import reconcile, compare_query, CHECKPOINT
+import threading
+
+app = create_app({'LOGIN_DISABLED': True, 'ADMIN_TOKEN': 'verify-admin'})
+with app.app_context():
+    init_db()
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def drift_of(report, user_ids):
+    return {d['user_id']: d['drift'] for d in report['drifted'] if d['user_id'] in user_ids}
+
+def verify():
+    client = app.test_client()
+
+    with app.app_context():
+        users = [User(username="ReconcileVerifierA"), User(username="ReconcileVerifierB")]
+        chore = Chore(title="Reconcile Chore", points=5, is_recurring=True)
+        db.session.add_all(users + [chore])
+        db.session.commit()
+        user_ids, chore_id = [u.id for u in users], chore.id
+        reconcile(full=True)  # baseline for the incremental runs below
+
+    ok = True
+    try:
+        for user_id in user_ids * 3:
+            client.post(f'/api/chores/{chore_id}/complete', json={'user_id': user_id})
+
+        with app.app_context():
+            report = reconcile()
+            ok &= check(report['mode'] == 'incremental' and not drift_of(report, user_ids),
+                        f"incremental run after completions finds no drift ({report['seconds']}s)")
+
+        # Drift both ways: a bumped counter, and a log lost from history since the last run
+        a, b = user_ids
+        client.post(f'/api/chores/{chore_id}/complete', json={'user_id': b})
+        with app.app_context():
+            User.query.filter_by(id=a).update({User.total_points: User.total_points + 50})
+            lost = ChoreLog.query.filter_by(user_id=b).order_by(ChoreLog.id.desc()).first()
+            db.session.delete(lost)
+            db.session.commit()
+
+            report = reconcile()
+            ok &= check(drift_of(report, user_ids) == {a: 50, b: 5},
+                        f"incremental run reports drift per user ({drift_of(report, user_ids)})")
+            total_a = db.session.get(User, a).total_points
+            ok &= check(report['repaired'] == 0 and total_a == 50 + 15, "without repair nothing changes")
+
+        # Repair while completions keep landing
+        stop = threading.Event()
+        completions = []
+
+        def complete():
+            worker = app.test_client()
+            while not stop.is_set():
+                completions.append(worker.post(f'/api/chores/{chore_id}/complete', json={'user_id': a}).status_code)
+
+        writer = threading.Thread(target=complete)
+        writer.start()
+        try:
+            with app.app_context():
+                repaired = reconcile(full=True, repair=True)
+        finally:
+            stop.set()
+            writer.join()
+        ok &= check(set(drift_of(repaired, user_ids)) == {a, b} and repaired['repaired'] >= 2,
+                    f"full run repairs in one UPDATE ({repaired['repaired']} users, {len(completions)} concurrent completions)")
+
+        with app.app_context():
+            after = reconcile(full=True)
+            ok &= check(not drift_of(after, user_ids), "totals match history after a repair under concurrent writes")
+
+            User.query.filter_by(id=a).update({User.total_points: User.total_points + 3})
+            db.session.commit()
+            confirmed = reconcile(repair=True)
+            ok &= check(confirmed['mode'] == 'full' and drift_of(confirmed, user_ids) == {a: 3},
+                        "an incremental run that finds drift re-checks in full before repairing")
+
+            # Another run finishing between this run's read and its checkpoint claim
+            original = reconcile_module.compare_query
+
+            def racing_compare_query(high_water=None):
+                with db.engine.begin() as conn:
+                    conn.execute(db.update(MaintenanceCheckpoint).where(MaintenanceCheckpoint.name == CHECKPOINT)
+                                 .values(processed=MaintenanceCheckpoint.processed + 1))
+                return original(high_water)
+
+            reconcile_module.compare_query = racing_compare_query
+            try:
+                User.query.filter_by(id=a).update({User.total_points: User.total_points + 7})
+                db.session.commit()
+                raced = reconcile(repair=True)
+            finally:
+                reconcile_module.compare_query = original
+            ok &= check(raced['conflict'] and raced['repaired'] == 0, "a run that loses the checkpoint race repairs nothing")
+            reconcile(full=True, repair=True)
+
+            def plan(query):
+                sql = str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+                return ' '.join(str(r[-1]) for r in db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)))
+
+            ok &= check('COVERING INDEX ix_chore_log_user_id_completed_at' in plan(compare_query()),
+                        "the full sum reads only the covering index")
+            ok &= check('SEARCH chore_log USING INTEGER PRIMARY KEY (rowid>?)' in plan(compare_query(1)),
+                        "the incremental sum reads only logs above the high-water mark")
+
+            logs = ChoreLog.query.count()
+            full = reconcile(full=True)
+            incremental = reconcile()
+            print(f"    {logs} logs: full {full['seconds']}s, incremental {incremental['seconds']}s")
+
+        denied = client.post('/api/admin/reconcile', json={})
+        allowed = client.post('/api/admin/reconcile', json={'full': True},
+                              headers={'Authorization': 'Bearer verify-admin'})
+        ok &= check(denied.status_code == 403 and allowed.status_code == 200 and allowed.get_json()['mode'] == 'full',
+                    "/api/admin/reconcile requires ADMIN_TOKEN")
+    finally:
+        with app.app_context():
+            # Clean up
+            ChoreLog.query.filter(ChoreLog.user_id.in_(user_ids)).delete(synchronize_session=False)
+            DailyUserPoints.query.filter(DailyUserPoints.user_id.in_(user_ids)).delete(synchronize_session=False)
+            Chore.query.filter_by(id=chore_id).delete(synchronize_session=False)
+            User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
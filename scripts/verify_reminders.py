@@ -0,0 +1,135 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreSchedule, OutboundEmail, ScheduleOccurrence
+from app.reminders import ReminderScheduler
+from datetime import datetime, timedelta
+from sqlalchemy import event
+import threading
+
+app = create_app({'LOGIN_DISABLED': True, 'REMINDER_LEAD_MINUTES': 60, 'REMINDER_GRACE_MINUTES': 30,
+                  'REMINDER_WINDOW_MINUTES': 120, 'REMINDER_RESYNC_SECONDS': 3600})
+with app.app_context():
+    init_db()
+
+EMAIL = 'reminders@example.com'
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def reminders_queued():
+    with app.app_context():
+        return OutboundEmail.query.filter_by(recipient_email=EMAIL).filter(
+            OutboundEmail.subject.like('Chore Due Soon:%')).count()
+
+def capture_plans(fn):
+    plans = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'schedule_occurrence' in statement:
+            plans.append(' '.join(str(r[-1]) for r in
+                                  conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+    return result, plans
+
+def verify():
+    client = app.test_client()
+    now = datetime.utcnow().replace(microsecond=0)
+
+    with app.app_context():
+        user = User(username="ReminderVerifier", email=EMAIL)
+        chores = [Chore(title=f"Reminder Chore {i}", points=2) for i in range(4)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+
+    def schedule(chore_id, starts_at, recurrence=None):
+        client.post('/api/schedules/bulk', json={'entries': [{
+            'chore_id': chore_id, 'user_id': user_id, 'datetime': starts_at.isoformat() + 'Z',
+            'recurrence': recurrence}]})
+
+    ok = True
+    scheduler = ReminderScheduler(app, concurrency=2, batch_size=2)
+    try:
+        invites = reminders_queued()
+        schedule(chore_ids[0], now + timedelta(minutes=30))             # due now
+        schedule(chore_ids[1], now + timedelta(minutes=90))             # due in 30 minutes
+        schedule(chore_ids[2], now - timedelta(minutes=45))             # reminder 105 minutes late
+        schedule(chore_ids[3], now + timedelta(minutes=40), 'weekly')   # due now, then weekly
+
+        counts, plans = capture_plans(lambda: scheduler.run_once(now))
+        ok &= check(counts['sent'] == 2 and counts['expired'] == 0, f"the first tick sends what is due ({counts})")
+        ok &= check(not any('SCAN schedule_occurrence' in p for p in plans),
+                    "loading the heap never scans schedule_occurrence")
+        ok &= check(len(scheduler) == 1, f"the heap holds only the window ({len(scheduler)} entry)")
+
+        counts = scheduler.run_once(now)
+        ok &= check(counts['sent'] == 0, "a second tick sends nothing again")
+
+        # A schedule added after the heap was loaded is picked up incrementally
+        schedule(chore_ids[0], now + timedelta(minutes=50))
+        counts, plans = capture_plans(lambda: scheduler.run_once(now + timedelta(seconds=5)))
+        ok &= check(counts['sent'] == 1, f"new schedules join the heap on the next tick ({counts})")
+        ok &= check(plans and all('SEARCH schedule_occurrence' in p for p in plans),
+                    f"incremental refreshes are index range scans ({plans})")
+
+        later = now + timedelta(minutes=31)
+        counts = scheduler.run_once(later)
+        ok &= check(counts['sent'] == 1, "the heap fires entries as their time comes")
+
+        # Exactly once across schedulers racing over the same due occurrences
+        with app.app_context():
+            db.session.add_all([ChoreSchedule(chore_id=chore_ids[i % 2], user_id=user_id,
+                                              scheduled_at=now + timedelta(minutes=31 + i)) for i in range(20)])
+            db.session.commit()
+        racers = [ReminderScheduler(app, concurrency=2, batch_size=3) for _ in range(3)]
+        results = []
+        threads = [threading.Thread(target=lambda r=r: results.append(r.run_once(now))) for r in racers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sent = sum(r['sent'] for r in results)
+        ok &= check(sent == 20, f"three schedulers queue each of 20 reminders exactly once ({results})")
+        for racer in racers:
+            racer.stop()
+
+        # Deleted chores are claimed but not emailed
+        schedule(chore_ids[1], now + timedelta(minutes=170))
+        client.delete(f'/api/chores/{chore_ids[1]}')
+        counts = ReminderScheduler(app).run_once(now + timedelta(minutes=110))
+        ok &= check(counts['skipped'] >= 1 and counts['sent'] == 0, f"deleted chores are skipped ({counts})")
+
+        with app.app_context():
+            unsent = ScheduleOccurrence.query.filter_by(user_id=user_id).filter(
+                ScheduleOccurrence.starts_at == now - timedelta(minutes=45)).one()
+            ok &= check(unsent.reminded_at is None, "reminders past the grace period are dropped, not sent")
+        ok &= check(reminders_queued() - invites == 24, f"{reminders_queued() - invites} reminder emails in the outbox")
+    finally:
+        scheduler.stop()
+        with app.app_context():
+            # Clean up
+            OutboundEmail.query.filter_by(recipient_email=EMAIL).delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
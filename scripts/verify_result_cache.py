@@ -0,0 +1,122 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, DailyUserPoints
+from app.cache import reset_caches, stats
+from cache_standin import StandInRedis
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+app = create_app()
+with app.app_context():
+    init_db()
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def counts(namespace):
+    return stats.snapshot().get(namespace, dict.fromkeys(stats.FIELDS, 0))
+
+def delta(before, namespace):
+    after = counts(namespace)
+    return {k: after[k] - before[k] for k in after}
+
+def run_checks(client, user_id, chore_id):
+    ok = True
+
+    before = counts('leaderboard')
+    first = client.get('/api/users')
+    second = client.get('/api/users')
+    d = delta(before, 'leaderboard')
+    ok &= check(d['misses'] == 1 and d['hits'] == 1 and first.data == second.data,
+                f"/api/users: first request misses, second hits ({d})")
+
+    res = client.post('/api/chores', json={'title': 'Cache Unrelated Chore', 'points': 1})
+    unrelated_id = res.get_json()['id']
+    before = counts('leaderboard')
+    client.get('/api/users')
+    ok &= check(delta(before, 'leaderboard')['hits'] == 1, "creating a chore leaves the leaderboard cached")
+
+    before = counts('leaderboard')
+    client.post(f'/api/chores/{chore_id}/complete', json={'user_id': user_id})
+    res = client.get('/api/users')
+    mine = next(u for u in res.get_json() if u['id'] == user_id)
+    ok &= check(delta(before, 'leaderboard')['misses'] == 1 and mine['total_points'] > 0,
+                "complete_chore() invalidates the leaderboard")
+
+    before = counts('leaderboard')
+    client.put(f'/api/users/{user_id}', json={'first_name': 'Cached'})
+    res = client.get('/api/users')
+    mine = next(u for u in res.get_json() if u['id'] == user_id)
+    ok &= check(delta(before, 'leaderboard')['misses'] == 1 and mine['first_name'] == 'Cached',
+                "a user edit invalidates the leaderboard")
+
+    # Stampede: after an invalidation, many concurrent requests, one recompute
+    client.post(f'/api/chores/{chore_id}/complete', json={'user_id': user_id})
+    before = counts('charts')
+    barrier = threading.Barrier(16)
+
+    def fetch(_):
+        local = app.test_client()
+        barrier.wait()
+        return local.get('/api/stats/charts?days=30').data
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        bodies = list(pool.map(fetch, range(16)))
+    d = delta(before, 'charts')
+    ok &= check(d['recomputes'] == 1 and len(set(bodies)) == 1,
+                f"16 concurrent chart requests after invalidation recompute once ({d})")
+
+    Chore.query.filter_by(id=unrelated_id).delete(synchronize_session=False)
+    db.session.commit()
+    return ok
+
+def verify():
+    app.config['LOGIN_DISABLED'] = True
+    client = app.test_client()
+
+    with app.app_context():
+        user = User(username="CacheVerifier")
+        chore = Chore(title="Cache Chore", points=6, is_recurring=True)
+        db.session.add_all([user, chore])
+        db.session.commit()
+        user_id, chore_id = user.id, chore.id
+
+        ok = True
+        try:
+            for backend in ('local', 'redis'):
+                print(f"-- {backend} backend")
+                with StandInRedis() as redis:
+                    app.config['CACHE_BACKEND'] = backend
+                    app.config['CACHE_URL'] = redis.url
+                    reset_caches()
+                    ok &= run_checks(client, user_id, chore_id)
+                    if backend == 'redis':
+                        ok &= check(redis.commands.get('SET', 0) > 0, f"entries stored in the shared cache ({redis.commands})")
+
+            app.config['CACHE_BACKEND'] = 'none'
+            reset_caches()
+            uncached = client.get('/api/stats/charts?days=30').data
+            app.config['CACHE_BACKEND'] = 'local'
+            reset_caches()
+            client.get('/api/stats/charts?days=30')
+            ok &= check(client.get('/api/stats/charts?days=30').data == uncached, "cached body matches the uncached one")
+        finally:
+            app.config['CACHE_BACKEND'] = 'local'
+            reset_caches()
+            # Clean up
+            ChoreLog.query.filter_by(chore_id=chore_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter_by(id=chore_id).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
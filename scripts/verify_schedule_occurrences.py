@@ -0,0 +1,148 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreSchedule, OutboundEmail, ScheduleOccurrence
+from app.recurrence import FULLY_EXPANDED, ensure_expanded, expand_schedules, occurrences
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+app = create_app({'LOGIN_DISABLED': True})
+with app.app_context():
+    init_db()
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def window(client, start, end):
+    res = client.get('/api/schedules', query_string={'from': start.isoformat(), 'to': end.isoformat()})
+    return res.status_code, (res.get_json() or {}).get('occurrences', [])
+
+def count_statements(fn):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    return result, len(statements)
+
+def verify():
+    client = app.test_client()
+    now = datetime.utcnow().replace(microsecond=0)
+
+    ok = True
+    monthly = list(occurrences(datetime(2025, 1, 31, 9), 'MONTHLY', 1, datetime(2025, 1, 1), datetime(2025, 8, 1)))
+    ok &= check([m.month for m in monthly] == [1, 3, 5, 7], "monthly on the 31st skips shorter months (RFC 5545)")
+    weekly = list(occurrences(datetime(2025, 1, 6), 'WEEKLY', 2, datetime(2025, 3, 1), datetime(2025, 4, 1)))
+    ok &= check(weekly == [datetime(2025, 3, 3), datetime(2025, 3, 17), datetime(2025, 3, 31)],
+                "biweekly jumps straight to the window")
+
+    with app.app_context():
+        user = User(username="OccurrenceVerifier", email="occurrences@example.com")
+        chores = [Chore(title=f"Occurrence Chore {i}", points=3) for i in range(3)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id, chore_ids = user.id, [c.id for c in chores]
+    weekly_chore, once_chore, bulk_chore = chore_ids
+
+    try:
+        # Started three weeks ago and repeating: the board shows the next date
+        started = now - timedelta(days=20)
+        res = client.post(f'/api/chores/{weekly_chore}/invite', json={
+            'user_id': user_id, 'datetime': started.isoformat() + 'Z', 'recurrence': 'weekly'})
+        ok &= check(res.status_code == 202, f"invite with recurrence is accepted ({res.status_code})")
+        client.post(f'/api/chores/{once_chore}/invite', json={
+            'user_id': user_id, 'datetime': (now + timedelta(days=3)).isoformat() + 'Z'})
+        res = client.post('/api/schedules/bulk', json={'entries': [
+            {'chore_id': bulk_chore, 'user_id': user_id, 'datetime': (now + timedelta(days=1)).isoformat() + 'Z',
+             'recurrence': 'monthly'}]})
+        ok &= check(res.get_json()['scheduled'] == 1, "bulk scheduling stores a monthly recurrence")
+
+        with app.app_context():
+            schedule = ChoreSchedule.query.filter_by(chore_id=weekly_chore).one()
+            ok &= check((schedule.recurrence_freq, schedule.recurrence_interval) == ('WEEKLY', 1),
+                        "the recurrence is stored as FREQ and INTERVAL")
+            ok &= check(schedule.expanded_until > now + timedelta(days=app.config['SCHEDULE_HORIZON_DAYS']),
+                        "new schedules are expanded past the horizon when created")
+            once = ChoreSchedule.query.filter_by(chore_id=once_chore).one()
+            ok &= check(once.expanded_until == FULLY_EXPANDED and
+                        ScheduleOccurrence.query.filter_by(schedule_id=once.id).count() == 1,
+                        "a single occurrence is materialized once")
+
+        board = {c['id']: c for c in client.get('/api/chores').get_json()}
+        entries = board[weekly_chore]['schedules']
+        ok &= check(len(entries) == 1 and entries[0]['recurrence'] == 'weekly' and
+                    entries[0]['scheduled_at'] == (started + timedelta(weeks=3)).isoformat(),
+                    f"the board lists a recurring schedule once, at its next occurrence ({entries})")
+        ok &= check(board[once_chore]['schedules'][0]['recurrence'] is None, "single schedules have no recurrence")
+
+        status, listed = window(client, now, now + timedelta(days=60))
+        mine = [o for o in listed if o['chore_id'] in chore_ids]
+        ok &= check(status == 200 and sum(o['chore_id'] == weekly_chore for o in mine) == 9,
+                    "/api/schedules lists every weekly occurrence in the window")
+        ok &= check(sum(o['chore_id'] == bulk_chore for o in mine) == 2 and
+                    sum(o['chore_id'] == once_chore for o in mine) == 1, "monthly and single occurrences too")
+        ok &= check([o['starts_at'] for o in listed] == sorted(o['starts_at'] for o in listed), "soonest first")
+
+        # Reading past the horizon extends it
+        far = now + timedelta(days=300)
+        status, listed = window(client, far, far + timedelta(days=14))
+        ok &= check(status == 200 and sum(o['chore_id'] == weekly_chore for o in listed) == 2,
+                    "a window past the horizon is expanded on demand")
+        with app.app_context():
+            schedule = ChoreSchedule.query.filter_by(chore_id=weekly_chore).one()
+            ok &= check(schedule.expanded_until >= far + timedelta(days=14), "and expanded_until moves with it")
+
+            # Schedules inserted directly are expanded lazily, in batches of constant cost
+            direct = [ChoreSchedule(chore_id=once_chore, user_id=user_id, scheduled_at=now + timedelta(hours=h),
+                                    recurrence_freq='WEEKLY', recurrence_interval=1) for h in range(1, 51)]
+            db.session.add_all(direct)
+            db.session.commit()
+            added, statements = count_statements(lambda: ensure_expanded(now + timedelta(days=30), batch_size=50))
+            ok &= check(added >= 50 * 5 and statements <= 8,
+                        f"50 schedules expand in one batch: {added} occurrences, {statements} statements")
+            again, _ = count_statements(lambda: ensure_expanded(now + timedelta(days=30)))
+            ok &= check(again == 0, "a second call within the horizon does nothing")
+
+            # A concurrent expander working from the same stale read writes no duplicates
+            stale = db.session.query(ChoreSchedule).filter_by(chore_id=weekly_chore).one()
+            stale.expanded_until, target = now, far + timedelta(days=14)
+            db.session.expunge(stale)
+            expand_schedules([stale], target)
+            db.session.commit()
+            starts = [s for (s,) in db.session.query(ScheduleOccurrence.starts_at)
+                      .filter_by(schedule_id=stale.id)]
+            ok &= check(len(starts) == len(set(starts)), "overlapping expansions never duplicate an occurrence")
+
+        status, _ = window(client, now, now - timedelta(days=1))
+        ok &= check(status == 400, "to before from is rejected")
+        ok &= check(client.get('/api/schedules').status_code == 400, "from and to are required")
+        status, _ = window(client, now, now + timedelta(days=app.config['SCHEDULE_MAX_WINDOW_DAYS'] + 1))
+        ok &= check(status == 400, "windows longer than SCHEDULE_MAX_WINDOW_DAYS are rejected")
+        res = client.post(f'/api/chores/{weekly_chore}/invite', json={
+            'user_id': user_id, 'datetime': now.isoformat(), 'recurrence': 'daily'})
+        ok &= check(res.status_code == 400, "an unknown recurrence is rejected")
+    finally:
+        with app.app_context():
+            # Clean up
+            OutboundEmail.query.filter_by(recipient_email='occurrences@example.com').delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()
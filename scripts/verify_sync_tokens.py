@@ -0,0 +1,108 @@
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.migrations import init_db
+from app.extensions import db
+from app.models import Chore, User, ChoreLog, ChoreSchedule, DailyUserPoints, OutboundEmail, ScheduleOccurrence
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+# No look-back window, so each sync returns exactly what changed since the last one
+app = create_app({'LOGIN_DISABLED': True, 'SYNC_SAFETY_SECONDS': 0})
+with app.app_context():
+    init_db()
+
+BOARD_SIZE = 200
+
+def check(ok, message):
+    print(("SUCCESS: " if ok else "FAILURE: ") + message)
+    return ok
+
+def sync(client, url, token):
+    res = client.get(url, query_string={'since': token})
+    return res, res.get_json()
+
+def verify():
+    client = app.test_client()
+
+    with app.app_context():
+        user = User(username="SyncVerifier", email="sync@example.com")
+        chores = [Chore(title=f"Sync Chore {i}", points=5, is_recurring=True, recurrence_days=7)
+                  for i in range(BOARD_SIZE)]
+        db.session.add(user)
+        db.session.add_all(chores)
+        db.session.commit()
+        user_id = user.id
+        chore_ids = [c.id for c in chores]
+
+    ok = True
+    try:
+        full, body = sync(client, '/api/chores', '')
+        ok &= check(full.status_code == 200 and {'chores', 'deleted', 'sync_token'} <= set(body),
+                    "empty since= returns a full snapshot with a sync token")
+        ok &= check(set(chore_ids) <= {c['id'] for c in body['chores']}, "the snapshot holds every active chore")
+        token = body['sync_token']
+
+        res, body = sync(client, '/api/chores', token)
+        ok &= check(body['chores'] == [] and body['deleted'] == [], "nothing changed: an empty delta")
+        token = body['sync_token']
+
+        edited, completed, invited, deleted = chore_ids[:4]
+        client.put(f'/api/chores/{edited}', json={'points': 9})
+        client.post(f'/api/chores/{completed}/complete', json={'user_id': user_id})
+        client.post(f'/api/chores/{invited}/invite', json={
+            'user_id': user_id, 'datetime': (datetime.utcnow() + timedelta(days=2)).isoformat() + 'Z'})
+        client.delete(f'/api/chores/{deleted}')
+
+        res, body = sync(client, '/api/chores', token)
+        by_id = {c['id']: c for c in body['chores']}
+        ok &= check(set(by_id) == {edited, completed, invited},
+                    f"the delta holds exactly the edited, completed and invited chores ({sorted(by_id)})")
+        ok &= check(by_id.get(edited, {}).get('points') == 9, "edits are in the delta")
+        ok &= check(by_id.get(completed, {}).get('last_completed_at') is not None,
+                    "completions (bulk UPDATE) move updated_at")
+        ok &= check(len(by_id.get(invited, {}).get('schedules', [])) == 1, "a new schedule re-sends its chore")
+        ok &= check(body['deleted'] == [deleted], "soft-deleted chores come back as tombstones")
+        ok &= check(len(res.data) * 10 < len(full.data),
+                    f"delta is {len(res.data)} bytes against {len(full.data)} for the full board")
+
+        res, body = sync(client, '/api/users', '')
+        ok &= check(res.status_code == 200 and user_id in {u['id'] for u in body['users']},
+                    "/api/users?since= returns a full snapshot")
+        token = body['sync_token']
+        chore_token = sync(client, '/api/chores', '')[1]['sync_token']
+        client.put(f'/api/users/{user_id}', json={'first_name': 'Synced'})
+        res, body = sync(client, '/api/users', token)
+        ok &= check([u['first_name'] for u in body['users']] == ['Synced'], "user edits are in the users delta")
+        res, body = sync(client, '/api/chores', chore_token)
+        ok &= check([c['id'] for c in body['chores']] == [invited],
+                    "user edits re-send the chores their upcoming schedules are on")
+
+        ok &= check(client.get('/api/chores', query_string={'since': 'not a token'}).status_code == 400,
+                    "a malformed token is rejected with 400")
+        plain = client.get('/api/chores').get_json()
+        ok &= check(isinstance(plain, list), "without since= the list format is unchanged")
+
+        with app.app_context():
+            for table in ('chore', 'user'):
+                plan = ' '.join(str(r[-1]) for r in db.session.execute(text(
+                    f'EXPLAIN QUERY PLAN SELECT id FROM {table} WHERE updated_at > :t'), {'t': datetime.utcnow()}))
+                ok &= check(f'ix_{table}_updated_at' in plan, f"{table} deltas use ix_{table}_updated_at ({plan})")
+    finally:
+        with app.app_context():
+            # Clean up
+            OutboundEmail.query.filter_by(recipient_email='sync@example.com').delete(synchronize_session=False)
+            ScheduleOccurrence.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreSchedule.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            ChoreLog.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            DailyUserPoints.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Chore.query.filter(Chore.id.in_(chore_ids)).delete(synchronize_session=False)
+            User.query.filter_by(id=user_id).delete(synchronize_session=False)
+            db.session.commit()
+
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    verify()